@@ -0,0 +1,128 @@
+"""Latency of the finance dashboard queries over five years of payments.
+
+Seeds a throwaway SQLite database unless --url points somewhere else.
+Usage: python -m benchmarks.bench_analytics --leases 500 [--repeat 20] [--rollups]
+
+--rollups builds payment_rollups first, so reads go through the summary table.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from db.models import Base, Payment
+from resource.rollups import refresh
+from resource.analytics import (
+    add_derived,
+    overdue_stats,
+    revenue_by_type,
+    revenue_series,
+)
+
+PAYMENT_TYPES = ("cash", "bank_transfer", "credit_card", "check")
+STATUSES = ("paid", "paid", "paid", "partial", "pending", "overdue")
+# the indexes the migrations add, SQLite only gets what create_all makes
+INDEXES = (
+    "CREATE INDEX idx_payments_due_covering"
+    " ON payments (due_date, payment_type, amount_due, amount_paid)",
+    "CREATE INDEX idx_payments_status_due ON payments (status, due_date)",
+    "CREATE INDEX idx_payments_rollup_changed_at ON payments (rollup_changed_at)",
+    "CREATE INDEX idx_payment_rollups_grain_period ON payment_rollups (grain, period)",
+)
+
+
+def seed(engine, leases, months=60):
+    Base.metadata.create_all(engine)
+    start = datetime(2021, 1, 1)
+    with engine.begin() as conn:
+        for index in INDEXES:
+            conn.execute(text(index))
+        for lease in range(1, leases + 1):
+            due_dates = [
+                start + timedelta(days=30 * m + lease % 28) for m in range(months)
+            ]
+            conn.execute(
+                Payment.__table__.insert(),
+                [
+                    {
+                        "lease_id": lease,
+                        "amount_due": Decimal("12500.00"),
+                        "amount_paid": Decimal("12500.00"),
+                        "due_date": due,
+                        "payment_type": PAYMENT_TYPES[(lease + m) % 4],
+                        "status": STATUSES[(lease * m) % len(STATUSES)],
+                        # written when due, so almost all of it predates a refresh
+                        "rollup_changed_at": due,
+                    }
+                    for m, due in enumerate(due_dates)
+                ],
+            )
+
+
+def timed(label, fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(
+        f"{label:<22} median {statistics.median(samples):8.2f} ms"
+        f"   max {max(samples):8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leases", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--rollups", action="store_true")
+    args = parser.parse_args()
+
+    path = None
+    url = args.url
+    if url is None:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    start, end = datetime(2021, 1, 1), datetime(2026, 1, 1)
+    try:
+        if path:
+            print(f"seeding {args.leases * 60} payments...")
+            seed(engine, args.leases)
+        if args.rollups:
+            with engine.connect() as conn:
+                print(f"rollups: {refresh(conn, full=True)}")
+        with Session(engine) as session:
+            for granularity in ("week", "month", "year"):
+                timed(
+                    f"revenue/{granularity}",
+                    lambda: add_derived(
+                        revenue_series(session, start, end, granularity),
+                        ["rolling", "delta"],
+                        3,
+                    ),
+                    args.repeat,
+                )
+            timed(
+                "revenue/by-type",
+                lambda: revenue_by_type(session, start, end),
+                args.repeat,
+            )
+            timed("overdue", lambda: overdue_stats(session, end), args.repeat)
+    finally:
+        engine.dispose()
+        if path:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Auth performance suite: microbenchmarks plus a register -> logout load scenario.
+
+Times hash_password, generate_tokens_and_claims and JSON serialization, then
+runs virtual users through register -> login -> me -> refresh -> logout.
+Reports p50/p95/p99 and throughput for each, compares them against a stored
+baseline and exits non-zero when one regressed past the tolerance.
+
+The scenario drives the API in-process against the configured database (e.g.
+the MySQL container from docker compose), against a throwaway SQLite stand-in
+with --sqlite, or over HTTP against a running server with --url.
+Needs the same env as the API (.env), run it from server/.
+Usage:
+    python -m benchmarks.bench_auth --sqlite /tmp/bench_auth.db
+    python -m benchmarks.bench_auth --url http://127.0.0.1:5821 --users 16
+    python -m benchmarks.bench_auth --sqlite /tmp/bench_auth.db --update-baseline
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import sys
+import threading
+import time
+import uuid
+from functools import partial
+from http.cookies import SimpleCookie
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "bench_auth.json")
+# fewer calls than this and p95 isn't compared, it's too noisy
+MIN_TAIL_SAMPLES = 50
+# latency differences below this are scheduler noise, whatever the ratio
+NOISE_MS = 5.0
+STEPS = ("register", "login", "me", "refresh", "logout")
+PASSWORD = "benchmark-password"
+PROFILE = {"id": 1, "email": "bench@example.com", "username": "bench", "role": "tenant"}
+# a page the size the directory endpoints return
+PAGE = {
+    "tenants": [dict(PROFILE, id=i, full_name=f"Tenant {i}") for i in range(25)],
+    "next_cursor": "eyJuYW1lIjogIlRlbmFudCAyNCIsICJpZCI6IDI0fQ",
+    "has_more": True,
+}
+
+
+def percentile(sorted_samples, pct):
+    # nearest rank, so p99 of 100 samples is the 99th and not an interpolation
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples, wall_seconds):
+    """{"n", "p50_ms", "p95_ms", "p99_ms", "ops_per_sec"} of per-call seconds."""
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "ops_per_sec": round(len(ordered) / wall_seconds, 1),
+    }
+
+
+def time_calls(fn, iterations, repeat=5):
+    """Per-call stats of the fastest of ``repeat`` rounds, like timeit's min().
+
+    Other processes only ever add time, so the fastest round is the least noisy.
+    """
+    best = None
+    for _ in range(repeat):
+        samples = []
+        started = time.perf_counter()
+        for i in range(iterations):
+            call_started = time.perf_counter()
+            fn(i)
+            samples.append(time.perf_counter() - call_started)
+        wall = time.perf_counter() - started
+        if best is None or wall < best[1]:
+            best = samples, wall
+    return summarize(*best)
+
+
+def microbenchmarks(app, iterations, hash_iterations):
+    from flask import jsonify
+
+    from resource.auth import generate_tokens_and_claims
+    from resource.hashing import hash_password, hashing_pool
+
+    user = SimpleNamespace(id=1, role_id=1, email=PROFILE["email"], username="bench")
+    with app.app_context():
+        # the first calls load the role registry and spawn the hashing workers,
+        # keep both out of the numbers
+        generate_tokens_and_claims(user)
+        hashing_pool.warm()
+        return {
+            "hash_password": time_calls(
+                lambda i: hash_password(PASSWORD), hash_iterations, repeat=1
+            ),
+            "generate_tokens_and_claims": time_calls(
+                lambda i: generate_tokens_and_claims(user), iterations
+            ),
+            "json_profile": time_calls(lambda i: jsonify(PROFILE), iterations),
+            "json_page": time_calls(lambda i: jsonify(PAGE), iterations),
+        }
+
+
+class InProcessClient:
+    """One virtual user on the Flask test client, which keeps its cookies."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+    def cookie(self, name):
+        cookie = self.client.get_cookie(name)
+        return cookie.value if cookie else None
+
+
+class HttpClient:
+    """One virtual user on a keep-alive connection with a minimal cookie jar."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        self.cookies = {}
+
+    def request(self, method, path, body=None, headers=None):
+        # login only records a session for requests with a User-Agent, like browsers
+        headers = {"User-Agent": "bench_auth", **(headers or {})}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        payload = json.dumps(body) if body is not None else None
+        self.conn.request(method, path, body=payload, headers=headers)
+        response = self.conn.getresponse()
+        data = response.read()
+        for header in response.headers.get_all("Set-Cookie") or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+    def cookie(self, name):
+        return self.cookies.get(name) or None
+
+
+def run_scenario(client, email, record):
+    """register -> login -> me -> refresh -> logout, record(step, seconds, ok)."""
+
+    def step(name, expected, method, path, body=None, headers=None):
+        started = time.perf_counter()
+        status, data = client.request(method, path, body, headers)
+        record(name, time.perf_counter() - started, status == expected)
+        return data if status == expected else None
+
+    credentials = {"email": email, "password": PASSWORD}
+    if step("register", 201, "POST", "/auth/register", credentials) is None:
+        return
+    login = step("login", 200, "POST", "/auth/login", credentials)
+    if login is None:
+        return
+    bearer = {"Authorization": f"Bearer {login['access_token']}"}
+    step("me", 200, "GET", "/auth/me", headers=bearer)
+    # the refresh cookie is CSRF protected, echo its double-submit token
+    csrf = {"X-CSRF-TOKEN": client.cookie("csrf_refresh_token") or ""}
+    step("refresh", 200, "POST", "/auth/refresh", headers=csrf)
+    step("logout", 200, "POST", "/auth/logout", headers=csrf)
+
+
+def load_test(make_client, users, iterations):
+    """Every user runs the scenario ``iterations`` times, returns per-step stats."""
+    samples = {name: [] for name in STEPS}
+    errors = {name: 0 for name in STEPS}
+    lock = threading.Lock()
+    run_id = uuid.uuid4().hex[:8]
+
+    def record(name, seconds, ok):
+        with lock:
+            samples[name].append(seconds)
+            errors[name] += 0 if ok else 1
+
+    def user(n):
+        client = make_client()
+        for i in range(iterations):
+            run_scenario(client, f"bench-{run_id}-{n}-{i}@example.com", record)
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    results = {
+        f"load_{name}": dict(summarize(samples[name], wall), errors=errors[name])
+        for name in STEPS
+        if samples[name]
+    }
+    every = [seconds for name in STEPS for seconds in samples[name]]
+    results["load_all"] = dict(summarize(every, wall), errors=sum(errors.values()))
+    return results
+
+
+def use_sqlite(path):
+    """Point the app at a fresh SQLite file with the schema and roles in place."""
+    if os.path.exists(path):
+        os.remove(path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(path)}"
+    from sqlalchemy import insert
+
+    from db.create_schema import create_schema
+    from db.database import get_engine
+    from db.models import Role
+
+    create_schema()
+    with get_engine().begin() as conn:
+        conn.execute(insert(Role), [{"name": n} for n in ("admin", "tenant", "staff")])
+
+
+def compare(results, baseline, tolerance, noise_ms=NOISE_MS):
+    """Regressions: slower p50/p95 or lower throughput than the baseline allows.
+
+    A latency has to be both ``tolerance`` and ``noise_ms`` worse to count, a
+    2 ms call taking 5 ms once is scheduling, not a regression. p95 is only
+    compared with MIN_TAIL_SAMPLES or more calls, with fewer it is little more
+    than the single slowest one.
+    """
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        keys = ("p50_ms", "p95_ms") if base["n"] >= MIN_TAIL_SAMPLES else ("p50_ms",)
+        for key in keys:
+            worse = current[key] - base[key]
+            if worse > noise_ms and current[key] > base[key] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {key} {current[key]} vs baseline {base[key]}"
+                )
+        if current["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {current['ops_per_sec']}/s"
+                f" vs baseline {base['ops_per_sec']}/s"
+            )
+    for name, current in results.items():
+        if current.get("errors"):
+            regressions.append(f"{name}: {current['errors']} failed requests")
+    return regressions
+
+
+def print_results(results):
+    columns = ("n", "p50 ms", "p95 ms", "p99 ms", "ops/s", "errors")
+    print(f"{'benchmark':<28}" + "".join(f"{c:>9}" for c in columns))
+    for name, r in results.items():
+        print(
+            f"{name:<28}{r['n']:>9}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+            f"{r['p99_ms']:>9.2f}{r['ops_per_sec']:>9.1f}{r.get('errors', ''):>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--sqlite", metavar="PATH", help="fresh SQLite stand-in DB")
+    target.add_argument("--url", help="benchmark a running server over HTTP")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=5, help="scenarios per user")
+    parser.add_argument("--micro-iterations", type=int, default=2000)
+    parser.add_argument("--hash-iterations", type=int, default=10)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--noise-ms", type=float, default=NOISE_MS)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        use_sqlite(args.sqlite)
+    from main import create_app
+    from resource.hashing import BCRYPT_ROUNDS, hashing_pool
+
+    app = create_app()
+    config = {
+        "target": "http" if args.url else "sqlite" if args.sqlite else "database",
+        "users": args.users,
+        "iterations": args.iterations,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "cpus": os.cpu_count(),
+    }
+    if args.url:
+        make_client = partial(HttpClient, args.url)
+    else:
+        make_client = partial(InProcessClient, app)
+    try:
+        results = microbenchmarks(app, args.micro_iterations, args.hash_iterations)
+        results.update(load_test(make_client, args.users, args.iterations))
+    finally:
+        hashing_pool.shutdown()
+    print(", ".join(f"{key}={value}" for key, value in config.items()))
+    print_results(results)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, record one with --update-baseline")
+        sys.exit(1)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["config"] != config:
+        # numbers from another setup say nothing about a regression
+        print(f"baseline was recorded with {baseline['config']}, not {config}")
+        sys.exit(1)
+    regressions = compare(results, baseline["results"], args.tolerance, args.noise_ms)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if regressions:
+        sys.exit(1)
+    print(f"within {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Vacancy search latency, in-memory availability index vs the SQL anti-join.
+
+Seeds a throwaway SQLite database with rooms and years of leases.
+Usage: python -m benchmarks.bench_availability --rooms 2000 --leases-per-room 10
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from db.models import Base, Lease, Room
+from resource.availability import AvailabilityIndex, free_rooms_query
+
+ROOM_TYPES = ("studio", "1BR", "2BR", "3BR")
+# well before the run, so lookups time the steady state rather than the few
+# seconds after a bulk write, when every lookup re-reads the fresh rows
+SEEDED_AT = datetime(2020, 1, 1)
+
+
+def seed(engine, rooms, leases_per_room, rng):
+    Base.metadata.create_all(engine)
+    start = date(2020, 1, 1)
+    with engine.begin() as conn:
+        # same indexes the migrations give MySQL
+        conn.execute(
+            text(
+                "CREATE INDEX idx_leases_room_dates"
+                " ON leases (room_id, start_date, end_date)"
+            )
+        )
+        # each index lookup first asks for rows written since its last check
+        conn.execute(text("CREATE INDEX idx_leases_updated_at ON leases (updated_at)"))
+        conn.execute(text("CREATE INDEX idx_rooms_updated_at ON rooms (updated_at)"))
+        conn.execute(
+            Room.__table__.insert(),
+            [
+                {
+                    "id": i,
+                    "room_number": f"R{i:05d}",
+                    "floor": i % 20,
+                    "type": ROOM_TYPES[i % 4],
+                    "status": "vacant",
+                    "base_rent": Decimal(400 + rng.randrange(1600)),
+                    "updated_at": SEEDED_AT,
+                }
+                for i in range(1, rooms + 1)
+            ],
+        )
+        leases = []
+        for room_id in range(1, rooms + 1):
+            day = start
+            for _ in range(leases_per_room):
+                day += timedelta(days=rng.randrange(0, 60))
+                end = day + timedelta(days=rng.randrange(90, 365))
+                leases.append(
+                    {
+                        "tenant_id": 1,
+                        "room_id": room_id,
+                        "start_date": day,
+                        "end_date": end,
+                        "rent_amount": Decimal("1.00"),
+                        "is_active": 1,
+                        "updated_at": SEEDED_AT,
+                    }
+                )
+                day = end + timedelta(days=1)
+        conn.execute(Lease.__table__.insert(), leases)
+
+
+def timed(fn, queries):
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=2000)
+    parser.add_argument("--leases-per-room", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=25)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        seed(engine, args.rooms, args.leases_per_room, rng)
+        factory = sessionmaker(bind=engine)
+        index = AvailabilityIndex(session_factory=factory)
+        started = time.perf_counter()
+        index.load()
+        print(f"index built in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        queries = []
+        for _ in range(args.queries):
+            start = date(2022, 1, 1) + timedelta(days=rng.randrange(1500))
+            queries.append(
+                {
+                    "start": start,
+                    "end": start + timedelta(days=rng.randrange(7, 120)),
+                    "room_type": rng.choice(ROOM_TYPES),
+                    "max_rent": Decimal(rng.randrange(600, 2000)),
+                }
+            )
+        with factory() as session:
+
+            def sql(q):
+                stmt = free_rooms_query(**q).limit(args.limit)
+                return session.execute(stmt).all()
+
+            def indexed(q):
+                return index.free_rooms(**q, limit=args.limit)
+
+            for label, fn in (("sql anti-join", sql), ("interval index", indexed)):
+                median, p95 = timed(fn, queries)
+                print(f"{label:<16} median {median:8.3f} ms   p95 {p95:8.3f} ms")
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
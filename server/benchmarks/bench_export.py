@@ -0,0 +1,104 @@
+"""Rows/sec and peak memory of the streaming CSV export.
+
+Seeds a throwaway SQLite database unless --url points somewhere else.
+Usage: python -m benchmarks.bench_export --rows 1000000 [--gzip]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+
+from db.models import Base, Payment
+from resource.exports import PAYMENT_COLUMNS, csv_chunks, gzip_chunks
+from resource.exports import payments_export_query
+
+
+def peak_rss_mb():
+    # Linux only, VmHWM is the high-water mark of the resident set
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def seed(engine, rows, batch=10_000):
+    Base.metadata.create_all(engine)
+    start = datetime(2021, 1, 1)
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            conn.execute(
+                Payment.__table__.insert(),
+                [
+                    {
+                        "lease_id": i % 500 + 1,
+                        "amount_due": Decimal("12500.00"),
+                        "amount_paid": Decimal("12500.00"),
+                        "due_date": start + timedelta(days=i % 1825),
+                        "payment_type": "bank_transfer",
+                        "status": "paid",
+                    }
+                    for i in range(offset, min(offset + batch, rows))
+                ],
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--yield-per", type=int, default=1000)
+    args = parser.parse_args()
+
+    path = None
+    url = args.url
+    if url is None:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    try:
+        if path:
+            print(f"seeding {args.rows} payments...")
+            seed(engine, args.rows)
+        rss_before = peak_rss_mb()
+        tracemalloc.start()
+        started = time.perf_counter()
+        chunks = csv_chunks(
+            payments_export_query({}),
+            PAYMENT_COLUMNS,
+            bind=engine,
+            yield_per=args.yield_per,
+        )
+        out_bytes = 0
+        if args.gzip:
+            for data in gzip_chunks(chunks):
+                out_bytes += len(data)
+        else:
+            for chunk in chunks:
+                out_bytes += len(chunk.encode("utf-8"))
+        elapsed = time.perf_counter() - started
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"rows/sec        {args.rows / elapsed:12.0f}")
+        print(f"output MB       {out_bytes / 1024 / 1024:12.1f}")
+        print(f"python peak MB  {traced_peak / 1024 / 1024:12.1f}")
+        print(f"peak RSS MB     {peak_rss_mb():12.1f} (before export {rss_before:.1f})")
+    finally:
+        engine.dispose()
+        if path:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Logins/sec at each bcrypt cost factor through the hashing pool.
+
+Usage: python -m benchmarks.bench_hashing --rounds 10 11 12 13 --logins 64
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from resource.hashing import HashingPool, _checkpw, _hashpw
+
+
+def bench_rounds(pool, rounds, logins, concurrency):
+    hashed = _hashpw("benchmark-password", rounds)
+    started = time.perf_counter()
+    # request threads fan into the pool the same way concurrent /auth/login calls do
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        results = list(
+            clients.map(
+                lambda _: pool.run(_checkpw, hashed, "benchmark-password"),
+                range(logins),
+            )
+        )
+    elapsed = time.perf_counter() - started
+    assert all(results)
+    return logins / elapsed, elapsed / logins * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    pool_kwargs = {"queue_depth": args.concurrency}
+    if args.workers is not None:
+        pool_kwargs["workers"] = args.workers
+    pool = HashingPool(**pool_kwargs)
+    print(f"workers={pool.workers} concurrency={args.concurrency}")
+    # spawn the worker processes first, or the first cost factor pays for it
+    pool.warm()
+    print(f"{'rounds':>6} {'logins/sec':>12} {'ms/login':>10}")
+    try:
+        for rounds in args.rounds:
+            per_sec, ms_each = bench_rounds(pool, rounds, args.logins, args.concurrency)
+            print(f"{rounds:>6} {per_sec:>12.1f} {ms_each:>10.1f}")
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Login write path under concurrent logins: two commits vs one vs write-behind.
+
+Runs against the database configured in .env and cleans up after itself.
+Usage: python -m benchmarks.bench_login_writes --logins 2000 --threads 16
+"""
+
+import argparse
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+from db.database import db
+from db.models import AuthUser, RefreshToken, Session
+from resource.auth import create_session, record_login, store_jti
+from resource.session_writer import SessionWriteBehind
+
+
+def two_commits(user_id, jti, expires_at):
+    # the pre-unit-of-work login path
+    store_jti(user_id, jti, expires_at)
+    create_session(user_id, jti, "bench", "127.0.0.1", expires_at)
+
+
+def one_commit(user_id, jti, expires_at, writer):
+    record_login(user_id, jti, "bench", "127.0.0.1", expires_at, writer=writer)
+
+
+def run_mode(name, write, user_id, logins, threads, writer=None):
+    expires_at = datetime.now(timezone.utc) + timedelta(days=1)
+
+    def one_login(_):
+        try:
+            write(user_id, f"bench-{uuid.uuid4()}", expires_at)
+        finally:
+            db.remove()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one_login, range(logins)))
+    request_side = time.perf_counter() - started
+    if writer is not None:
+        writer.flush()
+    total = time.perf_counter() - started
+    print(
+        f"{name:<13} {logins / request_side:>10.1f} {logins / total:>10.1f}"
+        f" {request_side / logins * 1000:>8.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    user = AuthUser(
+        username=f"bench-{uuid.uuid4().hex[:8]}",
+        email=f"bench-{uuid.uuid4().hex[:8]}@example.com",
+        password_hash="x",
+        role_id=1,
+    )
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    print(f"{'mode':<13} {'req/sec':>10} {'durable/s':>10} {'ms/req':>8}")
+    # explicit writers, whatever SESSION_WRITE_MODE the env has
+    sync = SessionWriteBehind(mode="sync")
+    behind = SessionWriteBehind(mode="write_behind")
+    try:
+        run_mode("two_commits", two_commits, user_id, args.logins, args.threads)
+        one_sync = partial(one_commit, writer=sync)
+        run_mode("one_commit", one_sync, user_id, args.logins, args.threads)
+        one_behind = partial(one_commit, writer=behind)
+        run_mode("write_behind", one_behind, user_id, args.logins, args.threads, behind)
+    finally:
+        behind.stop()
+        db.query(Session).filter_by(user_id=user_id).delete()
+        db.query(RefreshToken).filter_by(user_id=user_id).delete()
+        db.query(AuthUser).filter_by(id=user_id).delete()
+        db.commit()
+        db.remove()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Requests/sec for / and /auth/me under gunicorn, as the worker count grows.
+
+Starts gunicorn.conf.py with 1, 2, 4, ... workers (up to the core count) and
+hammers each path from separate client processes over keep-alive connections.
+Both paths are DB-free (/auth/me answers from the token's claims), so the
+numbers show how serving scales across cores, not how MySQL does.
+Needs the same env as the API (.env), run it from server/.
+Usage: python -m benchmarks.bench_serving --duration 5 --concurrency 16
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+CLAIMS = {"role": "admin", "email": "bench@example.com", "username": "bench"}
+
+
+def access_token():
+    # signed with the API's secret, so the workers accept it as their own
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = os.environ["JWT_SECRET_KEY"]
+    JWTManager(app)
+    with app.app_context():
+        return create_access_token(identity="1", additional_claims=CLAIMS)
+
+
+def default_worker_counts():
+    counts, workers = [], 1
+    while workers < multiprocessing.cpu_count():
+        counts.append(workers)
+        workers *= 2
+    return counts + [multiprocessing.cpu_count()]
+
+
+def start_server(workers, threads, port):
+    env = os.environ | {
+        "GUNICORN_WORKERS": str(workers),
+        "GUNICORN_THREADS": str(threads),
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/healthz")
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("gunicorn did not come up, check the API env")
+
+
+def stop_server(server):
+    server.send_signal(signal.SIGTERM)
+    server.wait(timeout=30)
+
+
+def hammer(port, path, headers, duration):
+    """One client: back-to-back requests on a keep-alive connection."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    ok = failed = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        if response.status == 200:
+            ok += 1
+        else:
+            failed += 1
+    return ok, failed
+
+
+def requests_per_second(port, path, headers, duration, concurrency):
+    with multiprocessing.Pool(concurrency) as pool:
+        results = pool.starmap(hammer, [(port, path, headers, duration)] * concurrency)
+    ok = sum(r[0] for r in results)
+    failed = sum(r[1] for r in results)
+    return ok / duration, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workers", type=lambda s: [int(w) for w in s.split(",")], default=None
+    )
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=5899)
+    args = parser.parse_args()
+
+    paths = {
+        "/": {},
+        "/auth/me": {"Authorization": f"Bearer {access_token()}"},
+    }
+    print(f"{multiprocessing.cpu_count()} cores, {args.concurrency} clients")
+    print(f"{'workers':>7} {'path':<10} {'req/s':>9} {'errors':>7}")
+    for workers in args.workers or default_worker_counts():
+        server = start_server(workers, args.threads, args.port)
+        try:
+            for path, headers in paths.items():
+                rate, failed = requests_per_second(
+                    args.port, path, headers, args.duration, args.concurrency
+                )
+                print(f"{workers:>7} {path:<10} {rate:>9.0f} {failed:>7}")
+        finally:
+            stop_server(server)
+
+
+if __name__ == "__main__":
+    main()
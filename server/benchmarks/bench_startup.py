@@ -0,0 +1,69 @@
+"""Cold-start import cost of the API, read from python -X importtime.
+
+Imports the module in fresh interpreters with DB_HOST pointed at an unroutable
+address, so a run also shows that importing connects nowhere (it would stall on
+the connect timeout). Prints the slowest top-level imports and exits non-zero
+when the best run is over the budget.
+Usage: python -m benchmarks.bench_startup --module main --budget-ms 1500
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# TEST-NET-1, guaranteed not to answer
+UNROUTABLE_DB_HOST = "192.0.2.1"
+
+
+def importtime(module):
+    """[(depth, cumulative_us, name)] for every import of one cold run."""
+    env = os.environ | {"DB_HOST": UNROUTABLE_DB_HOST}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line.removeprefix("import time:").split("|")
+        # nested imports are indented two spaces per level under their parent
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, int(cumulative_us), name.strip()))
+    return rows
+
+
+def total_ms(rows):
+    return sum(us for depth, us, _ in rows if depth == 0) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    best = min((importtime(args.module) for _ in range(args.runs)), key=total_ms)
+    # direct imports of the roots, i.e. what main (and site) pulled in
+    children = sorted(
+        ((us, name) for depth, us, name in best if depth == 1), reverse=True
+    )
+    top = args.top
+    print(f"slowest imports under {args.module} (best of {args.runs}):")
+    for us, name in children[:top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+    print(f"total {total_ms(best):.1f} ms, budget {args.budget_ms:.0f} ms")
+    if total_ms(best) > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Per-login CPU spent minting tokens: decode-and-reparse vs mint_tokens.
+
+Usage: python -m benchmarks.bench_tokens --iterations 5000
+"""
+
+import argparse
+import time
+from datetime import datetime, timezone
+
+from flask import Flask
+from flask_jwt_extended import (
+    JWTManager,
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+)
+
+from resource.tokens import mint_tokens
+
+CLAIMS = {"role": "tenant", "email": "bench@example.com", "username": "bench"}
+
+
+def legacy_mint(identity):
+    # what generate_tokens_and_claims + store_jti used to do per login
+    access_token = create_access_token(identity=identity, additional_claims=CLAIMS)
+    refresh_token = create_refresh_token(identity=identity)
+    decoded = decode_token(refresh_token)
+    expires_at = datetime.fromtimestamp(decoded["exp"], timezone.utc)
+    expires_at_str = expires_at.strftime("%Y-%m-%d %H:%M:%S")
+    datetime.strptime(expires_at_str, "%Y-%m-%d %H:%M:%S")
+    return access_token, refresh_token, decoded["jti"], expires_at
+
+
+def current_mint(identity):
+    return mint_tokens(identity, CLAIMS)
+
+
+def time_per_call(fn, iterations):
+    started = time.process_time()
+    for i in range(iterations):
+        fn(str(i))
+    return (time.process_time() - started) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "benchmark-secret-key-with-32-chars!!"
+    JWTManager(app)
+    with app.app_context():
+        legacy_us = time_per_call(legacy_mint, args.iterations)
+        current_us = time_per_call(current_mint, args.iterations)
+    print(f"legacy  {legacy_us:8.1f} us/login")
+    print(f"mint    {current_us:8.1f} us/login")
+    print(f"saved   {legacy_us - current_us:8.1f} us/login")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,538 @@
+"""Bulk-load rooms, tenants or leases from a CSV or JSONL file.
+
+Usage:
+    python bulk_import.py rooms rooms.csv
+    python bulk_import.py tenants tenants.jsonl --chunk-size 500 --workers 8
+    python bulk_import.py leases leases.csv --rejects leases.rejects.jsonl
+
+Rows are validated as they stream in, tenant passwords are hashed across a
+process pool, and each chunk is inserted with executemany and one commit.
+Rows that fail go to the reject file, one {"line", "row", "error"} per line.
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Callable, NamedTuple
+
+from dotenv import load_dotenv
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from db.database import get_engine
+from db.models import AuthUser, Lease, Role, Room, Tenant
+from resource.auth import unpack_register_payload, validate_register
+from resource.hashing import HASH_WORKERS, hash_many, new_executor
+from resource.rooms import ROOM_STATUSES, ROOM_TYPES
+from resource.tenants import TENANT_STATUSES
+
+load_dotenv()
+
+# rows per executemany + commit
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+# processes hashing tenant passwords, 0 hashes inline
+IMPORT_HASH_WORKERS = int(os.getenv("IMPORT_HASH_WORKERS", str(HASH_WORKERS)))
+
+STAGES = ("read", "validate", "check", "hash", "insert")
+
+
+# === Reading ===
+
+
+def read_rows(path, fmt=None):
+    """Yield (line number, row dict, parse error) without loading the whole file."""
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, newline="", encoding="utf-8") as source:
+        if fmt == "csv":
+            # line 1 is the header
+            for line, row in enumerate(csv.DictReader(source), start=2):
+                # cells past the header land under the None key, as a list
+                extra = row.pop(None, None)
+                error = None
+                if extra:
+                    fields = len(row) + len(extra)
+                    error = f"row has {fields} fields, the header has {len(row)}"
+                yield line, {k: v.strip() for k, v in row.items() if v}, error
+            return
+        for line, text in enumerate(source, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as e:
+                yield line, {"raw": text.rstrip("\n")}, f"invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line, {"raw": row}, "each line must be a JSON object"
+                continue
+            yield line, row, None
+
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# === Validation ===
+
+
+def string(value):
+    # JSONL may carry numbers, lists or objects where a string belongs
+    if not isinstance(value, str):
+        raise TypeError(value)
+    return value
+
+
+def field(row, key, parse=string, required=False, default=None):
+    value = row.get(key)
+    if value is None or value == "":
+        if required:
+            raise ValueError(f"{key} is required")
+        return default
+    try:
+        return parse(value)
+    except (ValueError, TypeError, InvalidOperation):
+        raise ValueError(f"invalid {key}: {value!r}")
+
+
+def money(value):
+    amount = Decimal(str(value)).quantize(Decimal("0.01"))
+    if amount < 0:
+        raise ValueError("negative amount")
+    return amount
+
+
+def moment(value):
+    return datetime.fromisoformat(str(value))
+
+
+def flag(value):
+    return 1 if str(value).lower() in ("1", "true", "yes") else 0
+
+
+def one_of(choices):
+    def parse(value):
+        if value not in choices:
+            raise ValueError(value)
+        return value
+
+    return parse
+
+
+def unique(seen, key, value):
+    # duplicates inside the file, the database is checked per chunk
+    if value in seen.setdefault(key, set()):
+        raise ValueError(f"duplicate {key} in file: {value}")
+    seen[key].add(value)
+
+
+def validate_room(row, seen):
+    room = {
+        "room_number": field(row, "room_number", required=True),
+        "floor": field(row, "floor", int),
+        "type": field(row, "type", one_of(ROOM_TYPES), default="studio"),
+        "status": field(row, "status", one_of(ROOM_STATUSES), default="vacant"),
+        "base_rent": field(row, "base_rent", money, required=True),
+    }
+    unique(seen, "room_number", room["room_number"])
+    return room
+
+
+def validate_tenant(row, seen):
+    email, password, username, role = unpack_register_payload(row)
+    unpacked = {
+        "email": email,
+        "password": password,
+        "username": username,
+        "role": role,
+    }
+    for key, value in unpacked.items():
+        # a non-string password would only blow up later, in the hash stage
+        if not isinstance(value, str):
+            raise ValueError(f"{key} must be a string")
+    validate_register(email, password, role)
+    tenant = {
+        "email": email,
+        "password": password,
+        "username": username,
+        "role": role,
+        "full_name": field(row, "full_name", required=True),
+        "phone": field(row, "phone"),
+        "status": field(row, "status", one_of(TENANT_STATUSES), default="prospect"),
+    }
+    unique(seen, "email", email)
+    unique(seen, "username", username)
+    return tenant
+
+
+def validate_lease(row, seen):
+    lease = {
+        "tenant_id": field(row, "tenant_id", int),
+        "tenant_email": field(row, "tenant_email"),
+        "room_id": field(row, "room_id", int),
+        "room_number": field(row, "room_number"),
+        "start_date": field(row, "start_date", moment, required=True),
+        "end_date": field(row, "end_date", moment, required=True),
+        "rent_amount": field(row, "rent_amount", money, required=True),
+        "deposit_amount": field(row, "deposit_amount", money, default=Decimal("0.00")),
+        "is_active": field(row, "is_active", flag, default=1),
+    }
+    if lease["tenant_id"] is None and not lease["tenant_email"]:
+        raise ValueError("tenant_id or tenant_email is required")
+    if lease["room_id"] is None and not lease["room_number"]:
+        raise ValueError("room_id or room_number is required")
+    if lease["end_date"] <= lease["start_date"]:
+        raise ValueError("end_date must be after start_date")
+    return lease
+
+
+# === Checks against the database, one query per chunk ===
+
+
+def existing(connection, column, values):
+    values = list(values)
+    if not values:
+        return set()
+    return set(connection.execute(select(column).where(column.in_(values))).scalars())
+
+
+def check_rooms(connection, items, context, rejects):
+    taken = existing(
+        connection, Room.room_number, (c["room_number"] for *_, c in items)
+    )
+    return rejects.filter(
+        items, lambda c: c["room_number"] in taken and "room_number already exists"
+    )
+
+
+def check_tenants(connection, items, context, rejects):
+    emails = existing(connection, AuthUser.email, (c["email"] for *_, c in items))
+    names = existing(connection, AuthUser.username, (c["username"] for *_, c in items))
+
+    def reason(clean):
+        if clean["email"] in emails:
+            return "User already exists"
+        if clean["username"] in names:
+            return "username already exists"
+        if clean["role"] not in context["roles"]:
+            return f"role {clean['role']} does not exist"
+
+    return rejects.filter(items, reason)
+
+
+def check_leases(connection, items, context, rejects):
+    emails = {c["tenant_email"] for *_, c in items if c["tenant_id"] is None}
+    numbers = {c["room_number"] for *_, c in items if c["room_id"] is None}
+    tenant_ids = dict(
+        connection.execute(
+            select(AuthUser.email, Tenant.user_id)
+            .join(Tenant, Tenant.user_id == AuthUser.id)
+            .where(AuthUser.email.in_(emails))
+        ).all()
+    )
+    room_ids = dict(
+        connection.execute(
+            select(Room.room_number, Room.id).where(Room.room_number.in_(numbers))
+        ).all()
+    )
+    known_tenants = existing(
+        connection,
+        Tenant.user_id,
+        {c["tenant_id"] for *_, c in items if c["tenant_id"] is not None},
+    )
+    known_rooms = existing(
+        connection,
+        Room.id,
+        {c["room_id"] for *_, c in items if c["room_id"] is not None},
+    )
+    for *_, clean in items:
+        if clean["tenant_id"] is None:
+            clean["tenant_id"] = tenant_ids.get(clean["tenant_email"])
+        elif clean["tenant_id"] not in known_tenants:
+            clean["tenant_id"] = None
+        if clean["room_id"] is None:
+            clean["room_id"] = room_ids.get(clean["room_number"])
+        elif clean["room_id"] not in known_rooms:
+            clean["room_id"] = None
+
+    def reason(clean):
+        if clean["tenant_id"] is None:
+            return "tenant not found"
+        if clean["room_id"] is None:
+            return "room not found"
+
+    return rejects.filter(items, reason)
+
+
+# === Inserts, executemany per chunk ===
+
+
+def insert_rooms(connection, items, context):
+    connection.execute(insert(Room), [clean for *_, clean in items])
+
+
+def insert_tenants(connection, items, context):
+    now = datetime.now()
+    users = [
+        {
+            "username": c["username"],
+            "email": c["email"],
+            "password_hash": c["password_hash"],
+            "role_id": context["roles"][c["role"]],
+            "created_at": now,
+        }
+        for *_, c in items
+    ]
+    connection.execute(insert(AuthUser), users)
+    # executemany gives no ids back on every driver, so look them up by email
+    ids = dict(
+        connection.execute(
+            select(AuthUser.email, AuthUser.id).where(
+                AuthUser.email.in_([u["email"] for u in users])
+            )
+        ).all()
+    )
+    connection.execute(
+        insert(Tenant),
+        [
+            {
+                "user_id": ids[c["email"]],
+                "full_name": c["full_name"],
+                "phone": c["phone"],
+                "status": c["status"],
+            }
+            for *_, c in items
+        ],
+    )
+
+
+def insert_leases(connection, items, context):
+    columns = (
+        "tenant_id",
+        "room_id",
+        "start_date",
+        "end_date",
+        "rent_amount",
+        "deposit_amount",
+        "is_active",
+    )
+    connection.execute(insert(Lease), [{k: c[k] for k in columns} for *_, c in items])
+
+
+def tenant_context(connection):
+    return {"roles": dict(connection.execute(select(Role.name, Role.id)).all())}
+
+
+class Importer(NamedTuple):
+    validate: Callable
+    check: Callable
+    insert: Callable
+    context: Callable = lambda connection: {}
+    hashes: bool = False
+
+
+IMPORTERS = {
+    "rooms": Importer(validate_room, check_rooms, insert_rooms),
+    "tenants": Importer(
+        validate_tenant, check_tenants, insert_tenants, tenant_context, hashes=True
+    ),
+    "leases": Importer(validate_lease, check_leases, insert_leases),
+}
+
+
+# === Pipeline ===
+
+
+class Rejects:
+    """Reject file writer, one JSON object per rejected row."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.count = 0
+
+    def add(self, line, row, error):
+        self.sink.write(json.dumps({"line": line, "row": row, "error": error}) + "\n")
+        self.count += 1
+
+    def filter(self, items, reason_of):
+        """Keep the items whose reason_of(clean) is falsy, reject the rest."""
+        kept = []
+        for line, row, clean in items:
+            reason = reason_of(clean)
+            if reason:
+                self.add(line, row, reason)
+            else:
+                kept.append((line, row, clean))
+        return kept
+
+
+class StageStats:
+    def __init__(self):
+        self.rows = dict.fromkeys(STAGES, 0)
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+
+    def add(self, stage, rows, started):
+        self.rows[stage] += rows
+        self.seconds[stage] += time.perf_counter() - started
+
+    def summary(self):
+        return {
+            stage: {
+                "rows": self.rows[stage],
+                "seconds": round(self.seconds[stage], 3),
+                "rows_per_sec": (
+                    round(self.rows[stage] / self.seconds[stage], 1)
+                    if self.seconds[stage]
+                    else None
+                ),
+            }
+            for stage in STAGES
+        }
+
+
+def validated(rows, validate, stats, rejects):
+    seen = {}
+    rows = iter(rows)
+    while True:
+        started = time.perf_counter()
+        item = next(rows, None)
+        if item is None:
+            return
+        stats.add("read", 1, started)
+        line, row, error = item
+        started = time.perf_counter()
+        try:
+            if error:
+                raise ValueError(error)
+            clean = validate(row, seen)
+        except (ValueError, TypeError, KeyError) as e:
+            rejects.add(line, row, str(e))
+            continue
+        finally:
+            stats.add("validate", 1, started)
+        yield line, row, clean
+
+
+def load_chunk(connection, importer, items, context, rejects):
+    """executemany + one commit, row by row only if the chunk fails as a whole."""
+    try:
+        importer.insert(connection, items, context)
+        connection.commit()
+        return len(items)
+    except SQLAlchemyError:
+        connection.rollback()
+    loaded = 0
+    for item in items:
+        try:
+            importer.insert(connection, [item], context)
+            connection.commit()
+            loaded += 1
+        except SQLAlchemyError as e:
+            connection.rollback()
+            rejects.add(item[0], item[1], f"insert failed: {getattr(e, 'orig', e)}")
+    return loaded
+
+
+def run_import(
+    kind,
+    path,
+    bind=None,
+    chunk_size=IMPORT_CHUNK_SIZE,
+    rejects_path=None,
+    workers=IMPORT_HASH_WORKERS,
+    fmt=None,
+):
+    """Import one file, returns a summary with per-stage rows/sec."""
+    importer = IMPORTERS[kind]
+    stats = StageStats()
+    rejects_path = rejects_path or f"{path}.rejects.jsonl"
+    executor = new_executor(workers) if importer.hashes and workers > 0 else None
+    inserted = 0
+    bind = bind or get_engine()
+    started = time.perf_counter()
+    try:
+        with open(rejects_path, "w", encoding="utf-8") as sink, bind.connect() as conn:
+            rejects = Rejects(sink)
+            context = importer.context(conn)
+            rows = validated(read_rows(path, fmt), importer.validate, stats, rejects)
+            for chunk in chunked(rows, chunk_size):
+                stage_started = time.perf_counter()
+                chunk = importer.check(conn, chunk, context, rejects)
+                stats.add("check", len(chunk), stage_started)
+                if importer.hashes and chunk:
+                    stage_started = time.perf_counter()
+                    hashes = hash_many([c["password"] for *_, c in chunk], executor)
+                    for (*_, clean), hashed in zip(chunk, hashes):
+                        clean["password_hash"] = hashed
+                    stats.add("hash", len(chunk), stage_started)
+                if chunk:
+                    stage_started = time.perf_counter()
+                    loaded = load_chunk(conn, importer, chunk, context, rejects)
+                    stats.add("insert", loaded, stage_started)
+                    inserted += loaded
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+    elapsed = time.perf_counter() - started
+    return {
+        "kind": kind,
+        "inserted": inserted,
+        "rejected": rejects.count,
+        "rejects_file": rejects_path,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(inserted / elapsed, 1) if elapsed else None,
+        "stages": stats.summary(),
+    }
+
+
+def report(summary):
+    lines = [
+        f"import {summary['kind']}: inserted={summary['inserted']}"
+        f" rejected={summary['rejected']} in {summary['seconds']:.2f}s"
+        f" ({summary['rows_per_sec']} rows/sec)"
+    ]
+    for stage, numbers in summary["stages"].items():
+        if numbers["rows"]:
+            lines.append(
+                f"  {stage:<9} {numbers['rows']:>9} rows {numbers['seconds']:>9.3f}s"
+                f" {numbers['rows_per_sec'] or 0:>12.1f} rows/sec"
+            )
+    if summary["rejected"]:
+        lines.append(f"  rejects written to {summary['rejects_file']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default=None)
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--rejects", default=None, help="default: <path>.rejects.jsonl")
+    parser.add_argument("--workers", type=int, default=IMPORT_HASH_WORKERS)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    summary = run_import(
+        args.kind,
+        args.path,
+        chunk_size=args.chunk_size,
+        rejects_path=args.rejects,
+        workers=args.workers,
+        fmt=args.format,
+    )
+    print(json.dumps(summary) if args.json else report(summary))
+
+
+if __name__ == "__main__":
+    main()
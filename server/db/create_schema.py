@@ -0,0 +1,50 @@
+"""Create the tables from db/models.py that don't exist yet (opt-in, never at import).
+
+db/migrations is the real schema and MySQL applies it on a fresh volume; this
+is the shortcut for scratch databases and local test runs.
+
+Usage:
+    python -m db.create_schema          # CREATE TABLE for the missing tables
+    python -m db.create_schema --sql    # print MySQL DDL, no connection needed
+"""
+
+import argparse
+
+from sqlalchemy import inspect
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
+
+from db.database import get_engine
+from db.models import Base
+
+
+def schema_sql(dialect=None):
+    dialect = dialect or mysql.dialect()
+    return [
+        str(CreateTable(table).compile(dialect=dialect)).strip() + ";"
+        for table in Base.metadata.sorted_tables
+    ]
+
+
+def create_schema(bind=None):
+    """Create missing tables, returns the names of the ones it created."""
+    bind = bind or get_engine()
+    existing = set(inspect(bind).get_table_names())
+    Base.metadata.create_all(bind)
+    return [t.name for t in Base.metadata.sorted_tables if t.name not in existing]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sql", action="store_true", help="print DDL and exit")
+    args = parser.parse_args(argv)
+
+    if args.sql:
+        print("\n\n".join(schema_sql()))
+        return
+    created = create_schema()
+    print(f"created {len(created)} tables: {', '.join(created) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
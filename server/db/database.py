@@ -1,27 +1,149 @@
 import os
+import threading
+import time
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, exc
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from typing import Optional
 
 load_dotenv()
 
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT", "3306") # port already has a default value 
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_NAME = os.getenv("DB_NAME")
-
-missing_env_tuple = (("DB_HOST",DB_HOST),("DB_USER",DB_USER),("DB_NAME",DB_NAME))
-# cant continue if host, user, and db name is missing
-missing = [k for k,v in missing_env_tuple if not v]
-if missing:
-    raise RuntimeError(f"Missing required DB env vars: {', '.join(missing)}")
-
-# although password is optional
-auth = f"{DB_USER}:{DB_PASSWORD}@" if DB_PASSWORD else f"{DB_USER}@"
-DATABASE_URL = f"mysql+pymysql://{auth}{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine)
-db = SessionLocal()
\ No newline at end of file
+# pool tuning, every knob has a sane default so only DB_HOST/USER/NAME are required
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+
+REQUIRED_DB_VARS = ("DB_HOST", "DB_USER", "DB_NAME")
+
+
+def database_url():
+    """Built from the env when the engine is first needed, not at import."""
+    # a full URL wins, e.g. sqlite:///bench.db as a stand-in for benchmarks
+    if os.getenv("DATABASE_URL"):
+        return os.getenv("DATABASE_URL")
+    # cant continue if host, user, and db name is missing
+    missing = [k for k in REQUIRED_DB_VARS if not os.getenv(k)]
+    if missing:
+        raise RuntimeError(f"Missing required DB env vars: {', '.join(missing)}")
+    user, password = os.getenv("DB_USER"), os.getenv("DB_PASSWORD")
+    port = os.getenv("DB_PORT", "3306") # port already has a default value
+    # although password is optional
+    auth = f"{user}:{password}@" if password else f"{user}@"
+    return f"mysql+pymysql://{auth}{os.getenv('DB_HOST')}:{port}/{os.getenv('DB_NAME')}"
+
+
+class PoolMetrics:
+    """Thread-safe counters for how long requests wait to check out a connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            self.timeouts = 0
+
+    def observe(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self, pool: Optional[QueuePool] = None) -> dict:
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "timeouts": self.timeouts,
+            }
+        if pool is not None:
+            stats.update(
+                {
+                    "size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": pool.overflow(),
+                }
+            )
+        return stats
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.observe(time.perf_counter() - started)
+        return conn
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """The app's engine, created on first use.
+
+    Importing this module (or db.models) reads no DB env and opens nothing, so
+    test collection, CLIs and worker boots don't need MySQL until they query.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    database_url(),
+                    poolclass=TimedQueuePool,
+                    pool_size=DB_POOL_SIZE,
+                    max_overflow=DB_MAX_OVERFLOW,
+                    pool_timeout=DB_POOL_TIMEOUT,
+                    pool_recycle=DB_POOL_RECYCLE,
+                    pool_pre_ping=DB_POOL_PRE_PING,
+                )
+    return _engine
+
+
+class LazySession(Session):
+    """Session that binds itself to get_engine() the first time it needs a bind."""
+
+    def get_bind(self, mapper=None, **kw):
+        if self.bind is None:
+            self.bind = get_engine()
+        return super().get_bind(mapper, **kw)
+
+
+SessionLocal = sessionmaker(class_=LazySession)
+# one session per thread (i.e. per request under a threaded server), use like a Session
+db = scoped_session(SessionLocal)
+
+
+def init_app(app):
+    """Bind the session lifecycle to the Flask app so every request gets a clean one.
+
+    Also the app's DB init phase: the engine is built here, so a missing DB env
+    var fails create_app() rather than the first request. Still no connection.
+    """
+    get_engine()
+
+    @app.teardown_appcontext
+    def remove_session(exception=None):
+        # rolls back anything left uncommitted and hands the connection back to the pool
+        db.remove()
+
+    return app
@@ -0,0 +1,168 @@
+"""EXPLAIN every known hot query and fail if one of them has to scan a whole table.
+
+Usage:
+    python -m db.explain_check            # fail on full scans with no usable index
+    python -m db.explain_check --strict   # fail on any full scan (prod-sized data)
+
+On near-empty tables MySQL may pick a full scan even when a good index exists,
+so by default a full scan only fails the check when no candidate index exists
+(possible_keys is NULL). Use --strict against a database with realistic data.
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from db.database import get_engine
+
+# name -> (sql, sample params), keep in sync with the queries in resource/ and jobs
+HOT_QUERIES = {
+    "auth_user_by_email": (
+        "SELECT * FROM auth_users WHERE email = :email",
+        {"email": "someone@example.com"},
+    ),
+    "refresh_token_by_jti": (
+        "SELECT * FROM refresh_tokens WHERE token = :jti",
+        {"jti": "jti"},
+    ),
+    "revoke_session": (
+        "SELECT * FROM sessions WHERE session_id = :sid AND revoked = 0",
+        {"sid": "jti"},
+    ),
+    "user_sessions": (
+        "SELECT * FROM sessions WHERE user_id = :user_id AND revoked = 0",
+        {"user_id": 1},
+    ),
+    "denylist_warm_up": (
+        "SELECT token, expires_at FROM refresh_tokens"
+        " WHERE revoked = 1 AND expires_at > :now",
+        {"now": datetime(2026, 1, 1)},
+    ),
+    "reap_refresh_tokens": (
+        "SELECT id FROM refresh_tokens WHERE expires_at < :cutoff",
+        {"cutoff": datetime(2026, 1, 1)},
+    ),
+    "reap_sessions": (
+        "SELECT id FROM sessions WHERE expires_at < :cutoff",
+        {"cutoff": datetime(2026, 1, 1)},
+    ),
+    "reap_jwt_blacklist": (
+        "SELECT id FROM jwt_blacklist WHERE expires_at < :cutoff",
+        {"cutoff": datetime(2026, 1, 1)},
+    ),
+    "tenant_active_lease": (
+        "SELECT * FROM leases WHERE tenant_id = :tenant_id AND is_active = 1",
+        {"tenant_id": 1},
+    ),
+    "room_lease_overlap": (
+        "SELECT * FROM leases WHERE room_id = :room_id"
+        " AND start_date <= :end AND end_date >= :start",
+        {
+            "room_id": 1,
+            "start": datetime(2026, 1, 1),
+            "end": datetime(2026, 1, 1) + timedelta(days=30),
+        },
+    ),
+    "lease_ledger": (
+        "SELECT * FROM payments WHERE lease_id = :lease_id ORDER BY due_date",
+        {"lease_id": 1},
+    ),
+    "overdue_batch": (
+        "SELECT id, due_date FROM payments WHERE status = 'pending'"
+        " AND due_date < :today AND (due_date > :after"
+        " OR (due_date = :after AND id > :id)) ORDER BY due_date, id LIMIT 1000",
+        {"today": datetime(2026, 1, 1), "after": datetime(2025, 6, 1), "id": 1},
+    ),
+    "tenant_directory_page": (
+        "SELECT user_id, full_name FROM tenants WHERE full_name > :name"
+        " OR (full_name = :name AND user_id > :user_id)"
+        " ORDER BY full_name, user_id LIMIT 26",
+        {"name": "M", "user_id": 1},
+    ),
+    "payments_in_range": (
+        "SELECT * FROM payments WHERE due_date BETWEEN :start AND :end",
+        {"start": datetime(2026, 1, 1), "end": datetime(2026, 12, 31)},
+    ),
+    "revenue_by_month": (
+        "SELECT DATE_FORMAT(due_date, '%Y-%m') AS period, SUM(amount_due),"
+        " SUM(amount_paid), COUNT(*) FROM payments"
+        " WHERE due_date >= :start AND due_date < :end GROUP BY period",
+        {"start": datetime(2021, 1, 1), "end": datetime(2026, 1, 1)},
+    ),
+    "rollup_live_delta": (
+        "SELECT lease_id, payment_type, due_date FROM payments"
+        " WHERE rollup_changed_at >= :since LIMIT 1001",
+        {"since": datetime(2026, 1, 1)},
+    ),
+    "availability_touched": (
+        "SELECT id, room_id, updated_at FROM leases WHERE updated_at >= :since"
+        " UNION ALL SELECT id, id, updated_at FROM rooms WHERE updated_at >= :since",
+        {"since": datetime(2026, 1, 1)},
+    ),
+    "rollup_type_days": (
+        "SELECT period, SUM(amount_paid) FROM payment_rollups"
+        " WHERE grain = 'type_day' AND period >= :start AND period < :end"
+        " GROUP BY period",
+        {"start": datetime(2021, 1, 1), "end": datetime(2026, 1, 1)},
+    ),
+    "maintenance_triage_page": (
+        "SELECT * FROM maintenance_requests WHERE status = 'open'"
+        " AND priority = 'emergency' AND (request_date > :since"
+        " OR (request_date = :since AND id > :id)) ORDER BY request_date, id LIMIT 26",
+        {"since": datetime(2026, 1, 1), "id": 1},
+    ),
+    "overdue_aging": (
+        "SELECT COUNT(*), SUM(amount_due - amount_paid) FROM payments"
+        " WHERE status IN ('pending', 'partial', 'overdue') AND due_date < :today",
+        {"today": datetime(2026, 1, 1)},
+    ),
+}
+
+
+def find_full_scans(plan_rows, strict=False):
+    """Return the tables a plan reads with type=ALL that count as failures."""
+    failures = []
+    for row in plan_rows:
+        if row.get("type") != "ALL":
+            continue
+        if strict or not row.get("possible_keys"):
+            failures.append(row.get("table"))
+    return failures
+
+
+def explain(connection, sql, params):
+    result = connection.execute(text(f"EXPLAIN {sql}"), params)
+    return [dict(row._mapping) for row in result]
+
+
+def run_checks(connection, queries=HOT_QUERIES, strict=False):
+    """EXPLAIN each query, returns {name: [tables fully scanned]} for the failures."""
+    failures = {}
+    for name, (sql, params) in queries.items():
+        plan = explain(connection, sql, params)
+        scanned = find_full_scans(plan, strict=strict)
+        status = "FULL SCAN" if scanned else "ok"
+        keys = ", ".join(str(row.get("key")) for row in plan)
+        print(f"{name:<24} {status:<10} key={keys}")
+        if scanned:
+            failures[name] = scanned
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--strict", action="store_true")
+    args = parser.parse_args()
+
+    with get_engine().connect() as connection:
+        failures = run_checks(connection, strict=args.strict)
+    if failures:
+        print(f"{len(failures)} hot queries do full table scans: {', '.join(failures)}")
+        sys.exit(1)
+    print("All hot queries use an index.")
+
+
+if __name__ == "__main__":
+    main()
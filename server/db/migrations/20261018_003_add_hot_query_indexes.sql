@@ -0,0 +1,26 @@
+-- 11. Indexes for the hot auth and domain queries
+-- Each index names the query it serves. Indexes that lead with a FK column
+-- replace the single-column index InnoDB creates for that FK.
+-- sessions (session_id, revoked) is already served by the UNIQUE index on session_id.
+
+-- refresh_tokens: reaper (expires_at < ?) and denylist warm-up (revoked = 1 AND expires_at > ?)
+CREATE INDEX idx_refresh_tokens_expires_at ON refresh_tokens (expires_at);
+CREATE INDEX idx_refresh_tokens_revoked_expires ON refresh_tokens (revoked, expires_at);
+-- refresh_tokens: a user's tokens (logout everywhere, account views)
+CREATE INDEX idx_refresh_tokens_user_revoked ON refresh_tokens (user_id, revoked);
+
+-- sessions: a user's active sessions, and the reaper
+CREATE INDEX idx_sessions_user_revoked ON sessions (user_id, revoked);
+CREATE INDEX idx_sessions_expires_at ON sessions (expires_at);
+
+-- jwt_blacklist: reaper and denylist warm-up
+CREATE INDEX idx_jwt_blacklist_expires_at ON jwt_blacklist (expires_at);
+
+-- leases: a tenant's active lease, and date-overlap lookups per room
+CREATE INDEX idx_leases_tenant_active ON leases (tenant_id, is_active);
+CREATE INDEX idx_leases_room_dates ON leases (room_id, start_date, end_date);
+
+-- payments: a lease's ledger in due order, overdue sweeps, and date-range reports
+CREATE INDEX idx_payments_lease_due ON payments (lease_id, due_date);
+CREATE INDEX idx_payments_status_due ON payments (status, due_date);
+CREATE INDEX idx_payments_due_date ON payments (due_date);
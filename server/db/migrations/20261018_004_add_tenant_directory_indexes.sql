@@ -0,0 +1,6 @@
+-- 12. Tenant directory indexes
+-- Keyset pagination walks tenants in (full_name, user_id) order; InnoDB appends
+-- the PK to secondary indexes, so (full_name) already carries user_id.
+CREATE INDEX idx_tenants_full_name ON tenants (full_name);
+-- status filter keeps the same order, so a filtered page is still one range scan
+CREATE INDEX idx_tenants_status_name ON tenants (status, full_name);
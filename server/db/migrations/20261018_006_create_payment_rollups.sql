@@ -0,0 +1,29 @@
+-- 14. Payment rollups, maintained incrementally by rollup_refresher.py
+-- updated_at is the high-water mark: the refresher only recomputes the rollup
+-- partitions of payments written since its last run.
+ALTER TABLE payments
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ON UPDATE CURRENT_TIMESTAMP;
+CREATE INDEX idx_payments_updated_at ON payments (updated_at);
+
+-- one row per (lease_id, month) and per (payment_type, day)
+CREATE TABLE payment_rollups (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    grain ENUM('lease_month', 'type_day') NOT NULL,
+    lease_id INT NOT NULL DEFAULT 0,
+    payment_type VARCHAR(20) NOT NULL DEFAULT '',
+    period DATE NOT NULL,
+    amount_due DECIMAL(12, 2) NOT NULL,
+    amount_paid DECIMAL(12, 2) NOT NULL,
+    payment_count INT NOT NULL,
+    -- a lease's months, and the partition lookups the refresher deletes by
+    UNIQUE KEY uq_payment_rollups_partition (grain, lease_id, payment_type, period),
+    -- dashboard date ranges
+    KEY idx_payment_rollups_grain_period (grain, period)
+);
+
+CREATE TABLE rollup_state (
+    name VARCHAR(50) PRIMARY KEY,
+    high_water_mark DATETIME NULL,
+    refreshed_at DATETIME NULL
+);
@@ -0,0 +1,6 @@
+-- 15. Maintenance triage index
+-- The staff triage view reads one (status, priority) bucket at a time, oldest
+-- first, so each page is a range scan over (request_date, id) with no filesort.
+-- InnoDB appends the PK, id is listed anyway so the keyset order is explicit.
+CREATE INDEX idx_maintenance_triage
+    ON maintenance_requests (status, priority, request_date, id);
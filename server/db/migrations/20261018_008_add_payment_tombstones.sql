@@ -0,0 +1,26 @@
+-- 16. Payment tombstones, so deletes and moves reach the rollups
+-- A deleted payment has no updated_at left to find it by, and a payment moved
+-- to another lease, type or day only marks its new partition. These triggers
+-- record the partition it left; the refresher recomputes it like any other
+-- touched partition and prunes tombstones behind the high-water mark.
+CREATE TABLE payment_tombstones (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    lease_id INT NOT NULL,
+    payment_type VARCHAR(20) NULL,
+    due_date DATETIME NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_payment_tombstones_deleted_at (deleted_at)
+);
+
+CREATE TRIGGER trg_payments_tombstone_delete
+    AFTER DELETE ON payments FOR EACH ROW
+    INSERT INTO payment_tombstones (lease_id, payment_type, due_date)
+    VALUES (OLD.lease_id, OLD.payment_type, OLD.due_date);
+
+CREATE TRIGGER trg_payments_tombstone_move
+    AFTER UPDATE ON payments FOR EACH ROW
+    INSERT INTO payment_tombstones (lease_id, payment_type, due_date)
+    SELECT OLD.lease_id, OLD.payment_type, OLD.due_date FROM DUAL
+    WHERE NOT (OLD.lease_id <=> NEW.lease_id
+        AND OLD.payment_type <=> NEW.payment_type
+        AND OLD.due_date <=> NEW.due_date);
@@ -0,0 +1,14 @@
+-- 17. updated_at on leases and rooms, for the availability index
+-- Every API worker keeps its own in-memory availability index. A background
+-- poller re-reads the rooms whose room or lease rows were written since the
+-- index's high-water mark, so a lease booked through another worker, a cron
+-- job or a bulk import shows up within a poll instead of after the rebuild TTL.
+ALTER TABLE leases
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ON UPDATE CURRENT_TIMESTAMP;
+CREATE INDEX idx_leases_updated_at ON leases (updated_at);
+
+ALTER TABLE rooms
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ON UPDATE CURRENT_TIMESTAMP;
+CREATE INDEX idx_rooms_updated_at ON rooms (updated_at);
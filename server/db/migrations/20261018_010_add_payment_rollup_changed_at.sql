@@ -0,0 +1,19 @@
+-- 18. rollup_changed_at on payments, so only rollup inputs mark a partition
+-- updated_at moves on every write, including the status flips of the overdue
+-- job, which don't change any rollup total. The refresher and the live delta
+-- now follow rollup_changed_at instead, which the trigger bumps only when the
+-- lease, type, due date or an amount changes.
+ALTER TABLE payments
+    ADD COLUMN rollup_changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+-- keep updated_at as it was, and don't mark every payment as just changed
+UPDATE payments SET rollup_changed_at = updated_at, updated_at = updated_at;
+CREATE INDEX idx_payments_rollup_changed_at ON payments (rollup_changed_at);
+
+CREATE TRIGGER trg_payments_rollup_changed
+    BEFORE UPDATE ON payments FOR EACH ROW
+    SET NEW.rollup_changed_at = IF(OLD.lease_id <=> NEW.lease_id
+        AND OLD.payment_type <=> NEW.payment_type
+        AND OLD.due_date <=> NEW.due_date
+        AND OLD.amount_due <=> NEW.amount_due
+        AND OLD.amount_paid <=> NEW.amount_paid,
+        NEW.rollup_changed_at, CURRENT_TIMESTAMP);
@@ -1,10 +1,22 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Integer, String
+from decimal import Decimal
+from sqlalchemy import (
+    DDL,
+    Column,
+    Date,
+    DateTime,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    event,
+    func,
+    inspect,
+)
 from sqlalchemy.orm import declarative_base
-from db.database import engine
 
+# schema lives in db/migrations, `python -m db.create_schema` is the opt-in shortcut
 Base = declarative_base()
-Base.metadata.create_all(engine)
 
 
 class Role(Base):
@@ -42,7 +54,9 @@ class Room(Base):
     status = Column(
         String(12), default="vacant"
     )  # ENUM('vacant', 'occupied', 'maintenance')
-    base_rent = Column(String(10))
+    base_rent = Column(Numeric(10, 2), nullable=False)  # DECIMAL(10, 2)
+    # database clock, the availability index re-reads rooms written since its mark
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
 
 class Lease(Base):
@@ -52,17 +66,21 @@ class Lease(Base):
     room_id = Column(Integer, nullable=False)
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=False)
-    rent_amount = Column(String(10), nullable=False)
-    deposit_amount = Column(String(10), default="0.00")
+    rent_amount = Column(Numeric(10, 2), nullable=False)
+    deposit_amount = Column(
+        Numeric(10, 2), default=Decimal("0.00"), server_default="0.00"
+    )
     is_active = Column(Integer, default=1)  # BOOLEAN
+    # database clock, the availability index re-reads rooms written since its mark
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
 
 class Payment(Base):
     __tablename__ = "payments"
     id = Column(Integer, primary_key=True, autoincrement=True)
     lease_id = Column(Integer, nullable=False)
-    amount_due = Column(String(10), nullable=False)
-    amount_paid = Column(String(10), default="0.00")
+    amount_due = Column(Numeric(10, 2), nullable=False)
+    amount_paid = Column(Numeric(10, 2), default=Decimal("0.00"), server_default="0.00")
     due_date = Column(DateTime, nullable=False)
     paid_date = Column(DateTime)
     payment_type = Column(
@@ -71,6 +89,127 @@ class Payment(Base):
     status = Column(
         String(10), default="pending"
     )  # ENUM('pending', 'partial', 'paid', 'overdue')
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # last write to a rollup input (lease, type, due date, amounts), bumped by
+    # the trigger below so status-only updates leave it alone; database clock
+    # on purpose, the rollup high-water mark compares these
+    rollup_changed_at = Column(DateTime, server_default=func.now())
+
+
+class PaymentRollup(Base):
+    __tablename__ = "payment_rollups"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    grain = Column(String(12), nullable=False)  # ENUM('lease_month', 'type_day')
+    lease_id = Column(Integer, nullable=False, default=0)  # 0 on type_day rows
+    payment_type = Column(String(20), nullable=False, default="")  # '' on lease_month
+    period = Column(Date, nullable=False)  # first day of the month, or the day
+    amount_due = Column(Numeric(12, 2), nullable=False)
+    amount_paid = Column(Numeric(12, 2), nullable=False)
+    payment_count = Column(Integer, nullable=False)
+
+
+class PaymentTombstone(Base):
+    """The rollup partition a payment left, by being deleted or moved.
+
+    Written by the triggers below, so deletes from outside the API count too.
+    """
+
+    __tablename__ = "payment_tombstones"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    lease_id = Column(Integer, nullable=False)
+    payment_type = Column(String(20))
+    due_date = Column(DateTime, nullable=False)
+    # same clock as payments.rollup_changed_at, the high-water mark covers both
+    deleted_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+# mirrors db/migrations/20261018_008_add_payment_tombstones.sql for create_schema
+PAYMENT_TOMBSTONE_COLUMNS = "(lease_id, payment_type, due_date)"
+PAYMENT_TOMBSTONE_TRIGGERS = {
+    "mysql": [
+        "CREATE TRIGGER IF NOT EXISTS trg_payments_tombstone_delete"
+        " AFTER DELETE ON payments FOR EACH ROW"
+        f" INSERT INTO payment_tombstones {PAYMENT_TOMBSTONE_COLUMNS}"
+        " VALUES (OLD.lease_id, OLD.payment_type, OLD.due_date)",
+        "CREATE TRIGGER IF NOT EXISTS trg_payments_tombstone_move"
+        " AFTER UPDATE ON payments FOR EACH ROW"
+        f" INSERT INTO payment_tombstones {PAYMENT_TOMBSTONE_COLUMNS}"
+        " SELECT OLD.lease_id, OLD.payment_type, OLD.due_date FROM DUAL"
+        " WHERE NOT (OLD.lease_id <=> NEW.lease_id"
+        " AND OLD.payment_type <=> NEW.payment_type"
+        " AND OLD.due_date <=> NEW.due_date)",
+    ],
+    "sqlite": [
+        "CREATE TRIGGER IF NOT EXISTS trg_payments_tombstone_delete"
+        " AFTER DELETE ON payments FOR EACH ROW BEGIN"
+        f" INSERT INTO payment_tombstones {PAYMENT_TOMBSTONE_COLUMNS}"
+        " VALUES (OLD.lease_id, OLD.payment_type, OLD.due_date); END",
+        "CREATE TRIGGER IF NOT EXISTS trg_payments_tombstone_move"
+        " AFTER UPDATE ON payments FOR EACH ROW"
+        " WHEN OLD.lease_id IS NOT NEW.lease_id"
+        " OR OLD.payment_type IS NOT NEW.payment_type"
+        " OR OLD.due_date IS NOT NEW.due_date BEGIN"
+        f" INSERT INTO payment_tombstones {PAYMENT_TOMBSTONE_COLUMNS}"
+        " VALUES (OLD.lease_id, OLD.payment_type, OLD.due_date); END",
+    ],
+}
+
+
+# mirrors db/migrations/20261018_010_add_payment_rollup_changed_at.sql
+PAYMENT_ROLLUP_TRIGGERS = {
+    "mysql": [
+        "CREATE TRIGGER IF NOT EXISTS trg_payments_rollup_changed"
+        " BEFORE UPDATE ON payments FOR EACH ROW"
+        " SET NEW.rollup_changed_at = IF(OLD.lease_id <=> NEW.lease_id"
+        " AND OLD.payment_type <=> NEW.payment_type"
+        " AND OLD.due_date <=> NEW.due_date"
+        " AND OLD.amount_due <=> NEW.amount_due"
+        " AND OLD.amount_paid <=> NEW.amount_paid,"
+        " NEW.rollup_changed_at, CURRENT_TIMESTAMP)",
+    ],
+    "sqlite": [
+        "CREATE TRIGGER IF NOT EXISTS trg_payments_rollup_changed"
+        " AFTER UPDATE ON payments FOR EACH ROW"
+        " WHEN OLD.lease_id IS NOT NEW.lease_id"
+        " OR OLD.payment_type IS NOT NEW.payment_type"
+        " OR OLD.due_date IS NOT NEW.due_date"
+        " OR OLD.amount_due IS NOT NEW.amount_due"
+        " OR OLD.amount_paid IS NOT NEW.amount_paid BEGIN"
+        " UPDATE payments SET rollup_changed_at = CURRENT_TIMESTAMP"
+        " WHERE id = NEW.id; END",
+    ],
+}
+
+
+def tables_exist(*tables):
+    # create_all(tables=[...]) may build only some of the tables
+    def check(ddl, target, bind, **kw):
+        return all(inspect(bind).has_table(table) for table in tables)
+
+    return check
+
+
+for triggers, needs in (
+    (PAYMENT_TOMBSTONE_TRIGGERS, ("payments", "payment_tombstones")),
+    (PAYMENT_ROLLUP_TRIGGERS, ("payments",)),
+):
+    for dialect, statements in triggers.items():
+        for trigger in statements:
+            # on the metadata, so the tables are there whatever order they came in
+            event.listen(
+                Base.metadata,
+                "after_create",
+                DDL(trigger).execute_if(
+                    dialect=dialect, callable_=tables_exist(*needs)
+                ),
+            )
+
+
+class RollupState(Base):
+    __tablename__ = "rollup_state"
+    name = Column(String(50), primary_key=True)
+    high_water_mark = Column(DateTime)
+    refreshed_at = Column(DateTime)
 
 
 class MaintenanceRequest(Base):
@@ -78,7 +217,7 @@ class MaintenanceRequest(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     tenant_id = Column(Integer, nullable=False)
     room_id = Column(Integer, nullable=False)
-    description = Column(String)
+    description = Column(Text, nullable=False)
     priority = Column(
         String(10), default="medium"
     )  # ENUM('low', 'medium', 'high', 'emergency')
@@ -0,0 +1,54 @@
+"""gunicorn settings for the API, every knob overridable from the environment.
+
+Usage: gunicorn -c gunicorn.conf.py wsgi:app   (or: task serve)
+
+Reload: ``kill -HUP <master>`` re-reads this file and replaces the workers
+gracefully, in-flight requests finish first. With preload_app the code itself
+is only re-imported by a new master: ``kill -USR2 <master>`` starts one next to
+the old, then ``kill -QUIT <old master>`` once it is up.
+"""
+
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# one worker process per core by default, threads cover I/O waits
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count())))
+# an SSE stream or CSV export holds one thread for as long as it runs; together
+# they get at most GUNICORN_THREADS - STREAM_RESERVED_THREADS per worker (the
+# rest always serve ordinary requests) and get a 503 past that, see
+# resource/events.py. Raise both to allow more streams per worker.
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_class = "gthread"
+# bcrypt processes are per worker, split the cores between workers instead of
+# letting every worker spawn one per core (set before the preloaded app reads it)
+if not os.getenv("HASH_WORKERS"):
+    os.environ["HASH_WORKERS"] = str(max(1, multiprocessing.cpu_count() // workers))
+bind = os.getenv(
+    "GUNICORN_BIND",
+    f"{os.getenv('FLASK_API_HOST', '0.0.0.0')}:{os.getenv('FLASK_API_PORT', '5821')}",
+)
+# import the app (and warm its caches) once in the master, then fork
+preload_app = True
+# a gthread worker heartbeats from its main loop, so long SSE streams don't trip it
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# recycle workers now and then so slow leaks can't build up, jitter avoids a herd
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    from db.database import get_engine
+    from main import start_background_jobs
+
+    # drop any pooled connection inherited from the master without closing it
+    get_engine().dispose(close=False)
+    # threads don't survive fork, so jobs start in each worker, behind DB locks
+    start_background_jobs()
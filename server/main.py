@@ -4,29 +4,35 @@ from flask_cors import CORS
 
 import os
 from datetime import timedelta
+from resource.analytics import analytics_blueprint
 from resource.auth import auth_blueprint
+from resource.changes import changes_blueprint
+from resource.exports import exports_blueprint
+from resource.health import health_blueprint
+from resource.instrumentation import check_metrics_token, instrumentation_blueprint
+from resource.maintenance import maintenance_blueprint
+from resource.rooms import rooms_blueprint
+from resource.tenants import tenants_blueprint
+from db.database import get_engine, init_app as init_db, pool_metrics
+from resource.denylist import token_denylist
+from resource.roles import role_registry
+from resource.availability import (
+    availability_index,
+    start_poller as start_availability_poller,
+)
+from reaper import start_in_background as start_reaper
+from rollup_refresher import start_in_background as start_rollup_refresher
+from overdue_job import start_in_background as start_overdue_job
 from flask_jwt_extended import JWTManager
 
 load_dotenv()
 
-# the flask is flasking (Flask API initial config)
 REQUIRED_FLASK_VARS = [
     "FLASK_API_HOST",
     "FLASK_API_PORT",
     "FLASK_DEBUG",
     "FLASK_PERMANENT_SESSION_MINUTES",
 ]
-flask_env = {var: os.getenv(var) for var in REQUIRED_FLASK_VARS}
-missing = [k for k, v in flask_env.items() if not v]
-if missing:
-    raise ValueError(f"Missing required Flask API env vars: {', '.join(missing)}")
-app = Flask(__name__)
-app.config["DEBUG"] = os.getenv("FLASK_DEBUG")
-app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(
-    minutes=int(os.getenv("FLASK_PERMANENT_SESSION_MINUTES"))
-)
-
-# the jawot config (JWT config)
 REQUIRED_JWT_VARS = [
     "JWT_SECRET_KEY",
     "JWT_TOKEN_LOCATION",
@@ -34,53 +40,131 @@ REQUIRED_JWT_VARS = [
     "JWT_COOKIE_SAMESITE",
     "JWT_REFRESH_COOKIE_NAME",
 ]
-jwt_env = {var: os.getenv(var) for var in REQUIRED_JWT_VARS}
-missing = [k for k, v in jwt_env.items() if not v]
-if missing:
-    raise ValueError(f"Missing required JWT env vars: {', '.join(missing)}")
-app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
-app.config["JWT_TOKEN_LOCATION"] = os.getenv("JWT_TOKEN_LOCATION").split(",")
-app.config["JWT_COOKIE_SECURE"] = os.getenv("JWT_COOKIE_SECURE").lower() in (
-    "1",
-    "true",
-    "yes",
-)
-app.config["JWT_COOKIE_SAMESITE"] = os.getenv("JWT_COOKIE_SAMESITE")
-app.config["JWT_REFRESH_COOKIE_NAME"] = os.getenv("JWT_REFRESH_COOKIE_NAME")
-
-# stream corsonada by adie (CORS config)
-allowed_origins = os.environ.get("CORS_ALLOWED_ORIGINS").split(",")
-if allowed_origins is None:
-    raise ValueError(
-        "Missing allowed_origins environment variable (must at least be one)."
+
+
+def require_env(names, label):
+    env = {var: os.getenv(var) for var in names}
+    missing = [k for k, v in env.items() if not v]
+    if missing:
+        raise ValueError(f"Missing required {label} env vars: {', '.join(missing)}")
+    return env
+
+
+def is_truthy(value):
+    return value.lower() in ("1", "true", "yes")
+
+
+def register_jwt_callbacks(jwt):
+    @jwt.invalid_token_loader
+    def invalid_token_callback(error_string):
+        return jsonify({"error": "Invalid token"}), 401
+
+    @jwt.unauthorized_loader
+    def missing_token_callback(error_string):
+        return jsonify({"error": "Missing token"}), 401
+
+    @jwt.expired_token_loader
+    def expired_token_callback(jwt_header, jwt_payload):
+        return jsonify({"error": "Token has expired"}), 401
+
+    @jwt.token_in_blocklist_loader
+    def token_in_blocklist_callback(jwt_header, jwt_payload):
+        jti = jwt_payload.get("jti")
+        if token_denylist.is_revoked(jti):
+            return True
+        # refresh tokens live for days and any worker may have revoked one, so
+        # their (rare) uses pay one indexed lookup instead of trusting memory
+        if jwt_payload.get("type") == "refresh":
+            return token_denylist.is_revoked_in_db(jti)
+        return False
+
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({"error": "Token has been revoked"}), 401
+
+
+def create_app():
+    """Build a configured app. No DB reads and no threads, see start_services()."""
+    # the flask is flasking (Flask API initial config)
+    require_env(REQUIRED_FLASK_VARS, "Flask API")
+    app = Flask(__name__)
+    app.config["DEBUG"] = os.getenv("FLASK_DEBUG")
+    app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(
+        minutes=int(os.getenv("FLASK_PERMANENT_SESSION_MINUTES"))
     )
-CORS(app, supports_credentials=True, origins=allowed_origins)
 
-jwt = JWTManager(app)
+    # the jawot config (JWT config)
+    require_env(REQUIRED_JWT_VARS, "JWT")
+    app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
+    app.config["JWT_TOKEN_LOCATION"] = os.getenv("JWT_TOKEN_LOCATION").split(",")
+    app.config["JWT_COOKIE_SECURE"] = is_truthy(os.getenv("JWT_COOKIE_SECURE"))
+    app.config["JWT_COOKIE_SAMESITE"] = os.getenv("JWT_COOKIE_SAMESITE")
+    app.config["JWT_REFRESH_COOKIE_NAME"] = os.getenv("JWT_REFRESH_COOKIE_NAME")
+    # strict mode makes /auth/me and /auth/whoami always confirm the user in the DB
+    app.config["AUTH_STRICT_IDENTITY"] = is_truthy(
+        os.getenv("AUTH_STRICT_IDENTITY", "0")
+    )
+
+    # stream corsonada by adie (CORS config)
+    allowed_origins = os.environ.get("CORS_ALLOWED_ORIGINS")
+    if not allowed_origins:
+        raise ValueError(
+            "Missing allowed_origins environment variable (must at least be one)."
+        )
+    CORS(app, supports_credentials=True, origins=allowed_origins.split(","))
+
+    register_jwt_callbacks(JWTManager(app))
+
+    # first, so its timer starts before any other blueprint's hooks run
+    app.register_blueprint(instrumentation_blueprint)
+    app.register_blueprint(health_blueprint)
+    app.register_blueprint(auth_blueprint)
+    app.register_blueprint(tenants_blueprint)
+    app.register_blueprint(exports_blueprint)
+    app.register_blueprint(analytics_blueprint)
+    app.register_blueprint(rooms_blueprint)
+    app.register_blueprint(maintenance_blueprint)
+    app.register_blueprint(changes_blueprint)
+    init_db(app)
+
+    @app.route("/", methods=["GET"])
+    def index():
+        return jsonify({"message": "API running"}), 200
 
+    @app.route("/metrics/pool", methods=["GET"])
+    def pool_stats():
+        denied = check_metrics_token()
+        if denied:
+            return denied
+        return jsonify(pool_metrics.snapshot(get_engine().pool)), 200
 
-@jwt.invalid_token_loader
-def invalid_token_callback(error_string):
-    return jsonify({"error": "Invalid token"}), 401
+    return app
 
 
-@jwt.unauthorized_loader
-def missing_token_callback(error_string):
-    return jsonify({"error": "Missing token"}), 401
+def warm_caches():
+    """Fill the in-memory caches; under gunicorn this runs once, before fork."""
+    role_registry.warm()
+    token_denylist.warm()
+    availability_index.warm()
 
 
-@jwt.expired_token_loader
-def expired_token_callback(jwt_header, jwt_payload):
-    return jsonify({"error": "Token has expired"}), 401
+def start_background_jobs():
+    """Start the interval jobs, per process; their DB locks keep one run at a time."""
+    start_reaper()
+    start_rollup_refresher()
+    start_overdue_job()
+    start_availability_poller()
 
 
-app.register_blueprint(auth_blueprint)
+def start_services():
+    warm_caches()
+    start_background_jobs()
 
 
-@app.route("/", methods=["GET"])
-def index():
-    return jsonify({"message": "API running"}), 200
+app = create_app()
 
 
 if __name__ == "__main__":
+    # the single-process dev server, production runs gunicorn (see wsgi.py)
+    start_services()
     app.run(host=os.getenv("FLASK_API_HOST"), port=os.getenv("FLASK_API_PORT"))
@@ -0,0 +1,182 @@
+"""Move pending and partial payments past their due date to overdue.
+
+Usage:
+    python overdue_job.py                  # one pass, prints leases affected
+    python overdue_job.py --json           # same, as one JSON object
+    python overdue_job.py --every 3600     # keep running, one pass an hour
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import select, update
+
+from db.database import get_engine
+from db.models import Payment
+from reaper import acquire_lock, release_lock
+from resource.pagination import keyset_after
+
+load_dotenv()
+
+# rows updated per statement, small batches keep row locks short
+OVERDUE_BATCH_SIZE = int(os.getenv("OVERDUE_BATCH_SIZE", "1000"))
+# 0 keeps the job out of the API process, run the CLI from cron instead
+OVERDUE_INTERVAL_SECONDS = int(os.getenv("OVERDUE_INTERVAL_SECONDS", "0"))
+# how far ahead "nearing their payment deadline" looks
+OVERDUE_NOTICE_DAYS = int(os.getenv("OVERDUE_NOTICE_DAYS", "7"))
+OVERDUE_LOCK_NAME = "qualisync_overdue"
+
+OPEN_STATUSES = ("pending", "partial")
+
+
+def start_of_today():
+    return datetime.combine(date.today(), datetime.min.time())
+
+
+def mark_overdue(connection, today, batch_size=OVERDUE_BATCH_SIZE):
+    """Flip open payments due before today to overdue, one committed batch at a time.
+
+    Batches walk idx_payments_status_due in its own order, one status at a
+    time with a keyset on (due_date, id). InnoDB keeps the primary key at the
+    end of every secondary index, so each batch is a range read of the next
+    batch_size entries, with no filesort and no walk of the primary key. Rows
+    are UPDATEd by primary key, so a statement locks at most batch_size rows,
+    and rows the UPDATE skipped (settled in between) are not read again. Returns
+    (rows, lease ids), counting only the payments this pass flipped.
+    """
+    marked, lease_ids = 0, set()
+    keys = [(Payment.due_date, False), (Payment.id, False)]
+    for status in OPEN_STATUSES:
+        after = None
+        while True:
+            stmt = select(Payment.id, Payment.due_date).where(
+                Payment.status == status, Payment.due_date < today
+            )
+            if after is not None:
+                stmt = stmt.where(keyset_after(keys, after))
+            rows = connection.execute(
+                stmt.order_by(Payment.due_date, Payment.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            ids = [row.id for row in rows]
+            # status re-checked so a payment settled in between is left alone
+            connection.execute(
+                update(Payment)
+                .where(Payment.id.in_(ids), Payment.status.in_(OPEN_STATUSES))
+                .values(status="overdue")
+            )
+            # only this job writes overdue and it holds the lock, so these are
+            # the rows the UPDATE just changed
+            flipped = connection.execute(
+                select(Payment.lease_id).where(
+                    Payment.id.in_(ids), Payment.status == "overdue"
+                )
+            ).all()
+            connection.commit()
+            marked += len(flipped)
+            lease_ids.update(row.lease_id for row in flipped)
+            if len(rows) < batch_size:
+                break
+            after = (rows[-1].due_date, rows[-1].id)
+    return marked, lease_ids
+
+
+def nearing_deadline(connection, today, days=OVERDUE_NOTICE_DAYS):
+    """Lease ids with an open payment due within the next ``days`` days."""
+    return (
+        connection.execute(
+            select(Payment.lease_id)
+            .where(
+                Payment.status.in_(OPEN_STATUSES),
+                Payment.due_date >= today,
+                Payment.due_date < today + timedelta(days=days),
+            )
+            .distinct()
+            .order_by(Payment.lease_id)
+        )
+        .scalars()
+        .all()
+    )
+
+
+def run_once(bind=None, batch_size=OVERDUE_BATCH_SIZE, today=None):
+    """One pass, returns a summary dict, or None if another replica has it."""
+    today = today or start_of_today()
+    bind = bind or get_engine()
+    with bind.connect() as connection:
+        if not acquire_lock(connection, OVERDUE_LOCK_NAME):
+            return None
+        try:
+            marked, lease_ids = mark_overdue(connection, today, batch_size)
+            nearing = nearing_deadline(connection, today)
+        finally:
+            release_lock(connection, OVERDUE_LOCK_NAME)
+    return {
+        "marked": marked,
+        "overdue_lease_ids": sorted(lease_ids),
+        "nearing_deadline_lease_ids": list(nearing),
+    }
+
+
+def report(summary, elapsed):
+    if summary is None:
+        return "overdue: skipped, another replica holds the lock"
+    return (
+        f"overdue: marked={summary['marked']}"
+        f" leases={summary['overdue_lease_ids']}"
+        f" nearing={summary['nearing_deadline_lease_ids']} ({elapsed:.2f}s)"
+    )
+
+
+def run_and_report(batch_size=OVERDUE_BATCH_SIZE, as_json=False):
+    started = time.perf_counter()
+    try:
+        summary = run_once(batch_size=batch_size)
+    except Exception as e:
+        print("Overdue job failed: ", e)
+        return None
+    if as_json:
+        print(json.dumps(summary))
+    else:
+        print(report(summary, time.perf_counter() - started))
+    return summary
+
+
+def start_in_background(interval=OVERDUE_INTERVAL_SECONDS):
+    """Run the job inside the API process every interval seconds (0 disables it)."""
+    if interval <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            run_and_report()
+
+    thread = threading.Thread(target=loop, name="overdue-job", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=OVERDUE_BATCH_SIZE)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument(
+        "--every", type=int, default=0, help="seconds between runs, 0 runs once"
+    )
+    args = parser.parse_args()
+
+    run_and_report(args.batch_size, args.json)
+    while args.every > 0:
+        time.sleep(args.every)
+        run_and_report(args.batch_size, args.json)
+
+
+if __name__ == "__main__":
+    main()
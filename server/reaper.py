@@ -0,0 +1,142 @@
+"""Purge expired rows from refresh_tokens, sessions and jwt_blacklist.
+
+Usage:
+    python reaper.py                 # one pass, prints rows purged per table
+    python reaper.py --every 300     # keep running, one pass every 5 minutes
+"""
+
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, select, text
+
+from db.database import get_engine
+from db.models import JWTBlacklist, RefreshToken, Session
+
+load_dotenv()
+
+# rows deleted per statement, small batches keep row locks short
+REAPER_BATCH_SIZE = int(os.getenv("REAPER_BATCH_SIZE", "1000"))
+# 0 keeps the reaper out of the API process, run the CLI from cron instead
+REAPER_INTERVAL_SECONDS = int(os.getenv("REAPER_INTERVAL_SECONDS", "0"))
+REAPER_LOCK_NAME = "qualisync_reaper"
+
+# revoked refresh tokens are kept until they expire, the denylist warms from them
+REAP_TARGETS = (
+    RefreshToken.__table__,
+    Session.__table__,
+    JWTBlacklist.__table__,
+)
+
+
+def utc_now():
+    # expiry columns hold naive UTC datetimes
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def acquire_lock(connection, name=REAPER_LOCK_NAME):
+    """Only one replica runs a job at a time, the others skip instead of waiting."""
+    if connection.dialect.name != "mysql":
+        return True
+    got = connection.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": name})
+    return got.scalar() == 1
+
+
+def release_lock(connection, name=REAPER_LOCK_NAME):
+    if connection.dialect.name == "mysql":
+        connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+
+
+def purge_expired(connection, table, cutoff, batch_size=REAPER_BATCH_SIZE):
+    """Delete rows with expires_at before cutoff, one committed batch at a time."""
+    purged = 0
+    while True:
+        ids = (
+            connection.execute(
+                select(table.c.id)
+                .where(table.c.expires_at < cutoff)
+                .order_by(table.c.id)
+                .limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            break
+        result = connection.execute(delete(table).where(table.c.id.in_(ids)))
+        connection.commit()
+        purged += result.rowcount
+        if len(ids) < batch_size:
+            break
+    return purged
+
+
+def run_once(bind=None, batch_size=REAPER_BATCH_SIZE, cutoff=None):
+    """One pass, returns {table: rows purged}, or None if another replica has it."""
+    cutoff = cutoff or utc_now()
+    bind = bind or get_engine()
+    with bind.connect() as connection:
+        if not acquire_lock(connection):
+            return None
+        try:
+            return {
+                table.name: purge_expired(connection, table, cutoff, batch_size)
+                for table in REAP_TARGETS
+            }
+        finally:
+            release_lock(connection)
+
+
+def report(purged, elapsed):
+    if purged is None:
+        return "reaper: skipped, another replica holds the lock"
+    counts = " ".join(f"{name}={count}" for name, count in purged.items())
+    return f"reaper: {counts} ({elapsed:.2f}s)"
+
+
+def run_and_report(batch_size=REAPER_BATCH_SIZE):
+    started = time.perf_counter()
+    try:
+        purged = run_once(batch_size=batch_size)
+    except Exception as e:
+        print("Reaper run failed: ", e)
+        return None
+    print(report(purged, time.perf_counter() - started))
+    return purged
+
+
+def start_in_background(interval=REAPER_INTERVAL_SECONDS):
+    """Run the reaper inside the API process every interval seconds (0 disables it)."""
+    if interval <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            run_and_report()
+
+    thread = threading.Thread(target=loop, name="reaper", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=REAPER_BATCH_SIZE)
+    parser.add_argument(
+        "--every", type=int, default=0, help="seconds between runs, 0 runs once"
+    )
+    args = parser.parse_args()
+
+    run_and_report(args.batch_size)
+    while args.every > 0:
+        time.sleep(args.every)
+        run_and_report(args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
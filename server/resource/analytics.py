@@ -0,0 +1,347 @@
+from datetime import datetime, time, timedelta
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import case, func, select
+
+from db.database import db
+from db.models import Payment, PaymentRollup
+from resource.auth import roles_required
+from resource.exports import parse_date_range
+from resource.rollups import (
+    LEASE_MONTH,
+    TYPE_DAY,
+    live_since,
+    payment_type_expr,
+    rollup_totals,
+)
+
+try:
+    import numpy as np
+except ImportError:  # optional, derived series fall back to pure Python
+    np = None
+
+# === BLUEPRINT DECLARATION ===
+analytics_blueprint = Blueprint("analytics", __name__, url_prefix="/analytics")
+
+GRANULARITIES = ("week", "month", "year")
+# how far back a dashboard looks when no ?from= is given
+DEFAULT_SPAN_DAYS = {"week": 7 * 26, "month": 365, "year": 365 * 5}
+DERIVED_SERIES = ("rolling", "delta")
+DEFAULT_WINDOW = 3
+OPEN_STATUSES = ("pending", "partial", "overdue")
+AGING_BUCKETS = ("0-30", "31-60", "61-90", "90+")
+
+# === HELPER FUNCTIONS ===
+
+
+def parse_granularity(args):
+    granularity = args.get("granularity", "month")
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    return granularity
+
+
+def analytics_range(args, granularity="month", now=None):
+    """Half-open [start, end) on due_date, so it maps onto idx_payments_due_*.
+
+    ``to`` is an inclusive day, as in the payments export: end is the day after.
+    """
+    start, end = parse_date_range(args)
+    end = end or (now or datetime.now()).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    end += timedelta(days=1)
+    start = start or end - timedelta(days=DEFAULT_SPAN_DAYS[granularity])
+    if start >= end:
+        raise ValueError("from must be before to")
+    return start, end
+
+
+def parse_derive(args):
+    derive = [d for d in args.get("derive", "").split(",") if d]
+    if any(d not in DERIVED_SERIES for d in derive):
+        raise ValueError(f"derive must be one of {', '.join(DERIVED_SERIES)}")
+    try:
+        window = int(args.get("window", DEFAULT_WINDOW))
+    except ValueError:
+        raise ValueError("window must be an integer")
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    return derive, window
+
+
+def period_expr(column, granularity, dialect):
+    """SQL expression labelling a row with its period, evaluated by the database.
+
+    Weeks are labelled by their Monday (YYYY-MM-DD), months YYYY-MM, years YYYY.
+    """
+    if dialect == "mysql":
+        if granularity == "week":
+            return func.date(func.subdate(column, func.weekday(column)))
+        return func.date_format(column, "%Y-%m" if granularity == "month" else "%Y")
+    if granularity == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    return func.strftime("%Y-%m" if granularity == "month" else "%Y", column)
+
+
+def period_keys(start, end, granularity):
+    """Every period label in [start, end), so empty periods show up as zeros."""
+    last = end - timedelta(microseconds=1)
+    if granularity == "week":
+        day = start.date() - timedelta(days=start.weekday())
+        keys = []
+        while day <= last.date():
+            keys.append(day.isoformat())
+            day += timedelta(days=7)
+        return keys
+    if granularity == "year":
+        return [f"{year:04d}" for year in range(start.year, last.year + 1)]
+    first, final = start.year * 12 + start.month - 1, last.year * 12 + last.month - 1
+    return [f"{m // 12:04d}-{m % 12 + 1:02d}" for m in range(first, final + 1)]
+
+
+def period_label(day, granularity):
+    """Python twin of period_expr, for rows patched in outside SQL."""
+    if granularity == "week":
+        return (day - timedelta(days=day.weekday())).isoformat()
+    if granularity == "month":
+        return f"{day.year:04d}-{day.month:02d}"
+    return f"{day.year:04d}"
+
+
+def money(value):
+    # columnar series are for charts, plain numbers rounded to cents
+    return round(float(value or 0), 2)
+
+
+def due_between(start, end):
+    return (Payment.due_date >= start, Payment.due_date < end)
+
+
+def rolled_up_between(start, end):
+    return (PaymentRollup.period >= start.date(), PaymentRollup.period < end.date())
+
+
+def day_aligned(*moments):
+    # type_day rollups can only answer ranges that start and end at midnight
+    return all(moment.time() == time.min for moment in moments)
+
+
+def live_totals(session, label_expr, *where):
+    """{label: [due, paid, count]} straight from payments."""
+    stmt = (
+        select(
+            label_expr,
+            func.sum(Payment.amount_due),
+            func.sum(Payment.amount_paid),
+            func.count(Payment.id),
+        )
+        .where(*where)
+        .group_by(label_expr)
+    )
+    return {
+        str(label): [float(due or 0), float(paid or 0), count]
+        for label, due, paid, count in session.execute(stmt)
+    }
+
+
+def totals_by(session, grain, rollup_label, row_label, live_label, scope):
+    """Rollups plus the live delta when they have been built, else payments."""
+    rollup_scope, payment_scope = scope
+    since = live_since(session)
+    if since is not None:
+        totals = rollup_totals(
+            session,
+            grain,
+            rollup_label,
+            row_label,
+            since,
+            rollup_where=rollup_scope,
+            payment_where=payment_scope,
+        )
+        if totals is not None:
+            return totals
+    return live_totals(session, live_label, *payment_scope)
+
+
+def columns_of(totals, keys):
+    empty = (0.0, 0.0, 0)
+    return {
+        "due": [money(totals.get(k, empty)[0]) for k in keys],
+        "paid": [money(totals.get(k, empty)[1]) for k in keys],
+        "count": [totals.get(k, empty)[2] for k in keys],
+    }
+
+
+def revenue_series(session, start, end, granularity):
+    """Amount due/paid and payment count per period, grouped in the database."""
+    dialect = session.get_bind().dialect.name
+    live_label = period_expr(Payment.due_date, granularity, dialect).label("period")
+    if day_aligned(start, end):
+        totals = totals_by(
+            session,
+            TYPE_DAY,
+            period_expr(PaymentRollup.period, granularity, dialect).label("period"),
+            lambda row: period_label(row["period"], granularity),
+            live_label,
+            (rolled_up_between(start, end), due_between(start, end)),
+        )
+    else:
+        totals = live_totals(session, live_label, *due_between(start, end))
+    keys = period_keys(start, end, granularity)
+    return {"period": keys} | columns_of(totals, keys)
+
+
+def revenue_by_type(session, start, end):
+    if day_aligned(start, end):
+        totals = totals_by(
+            session,
+            TYPE_DAY,
+            PaymentRollup.payment_type,
+            lambda row: row["payment_type"],
+            payment_type_expr(),
+            (rolled_up_between(start, end), due_between(start, end)),
+        )
+    else:
+        totals = live_totals(session, payment_type_expr(), *due_between(start, end))
+    keys = sorted(k for k, total in totals.items() if total[2])
+    return {"payment_type": keys} | columns_of(totals, keys)
+
+
+def lease_ledger(session, lease_id):
+    """A lease's months with a running balance, from the lease_month rollups."""
+    dialect = session.get_bind().dialect.name
+    totals = totals_by(
+        session,
+        LEASE_MONTH,
+        period_expr(PaymentRollup.period, "month", dialect).label("period"),
+        lambda row: period_label(row["period"], "month"),
+        period_expr(Payment.due_date, "month", dialect).label("period"),
+        ((PaymentRollup.lease_id == lease_id,), (Payment.lease_id == lease_id,)),
+    )
+    keys = sorted(k for k, total in totals.items() if total[2])
+    series = {"period": keys} | columns_of(totals, keys)
+    balance, running = [], 0.0
+    for due, paid in zip(series["due"], series["paid"]):
+        running += due - paid
+        balance.append(round(running, 2))
+    return series | {"lease_id": lease_id, "balance": balance}
+
+
+def overdue_stats(session, today):
+    """Open payments past due, aged into 30-day buckets in a single GROUP BY."""
+    bucket = case(
+        (Payment.due_date >= today - timedelta(days=30), AGING_BUCKETS[0]),
+        (Payment.due_date >= today - timedelta(days=60), AGING_BUCKETS[1]),
+        (Payment.due_date >= today - timedelta(days=90), AGING_BUCKETS[2]),
+        else_=AGING_BUCKETS[3],
+    ).label("bucket")
+    stmt = (
+        select(
+            bucket,
+            func.count(Payment.id),
+            func.sum(Payment.amount_due - Payment.amount_paid),
+        )
+        .where(Payment.status.in_(OPEN_STATUSES), Payment.due_date < today)
+        .group_by(bucket)
+    )
+    rows = {row[0]: row for row in session.execute(stmt).all()}
+    counts = [rows[b][1] if b in rows else 0 for b in AGING_BUCKETS]
+    outstanding = [money(rows[b][2]) if b in rows else 0.0 for b in AGING_BUCKETS]
+    return {
+        "bucket": list(AGING_BUCKETS),
+        "count": counts,
+        "outstanding": outstanding,
+        "total_count": sum(counts),
+        "total_outstanding": money(sum(outstanding)),
+    }
+
+
+def rolling_mean(values, window):
+    """Trailing mean over ``window`` periods, None until the window is full."""
+    if window > len(values):
+        return [None] * len(values)
+    if np is not None:
+        sums = np.cumsum(np.insert(np.asarray(values, dtype=float), 0, 0.0))
+        means = (sums[window:] - sums[:-window]) / window
+        return [None] * (window - 1) + [round(float(v), 2) for v in means]
+    means, total = [], 0.0
+    for i, value in enumerate(values):
+        total += value
+        if i >= window:
+            total -= values[i - window]
+        means.append(round(total / window, 2) if i >= window - 1 else None)
+    return means
+
+
+def deltas(values):
+    """Change from the previous period (month-over-month for monthly series)."""
+    if not values:
+        return []
+    if np is not None:
+        diffs = np.diff(np.asarray(values, dtype=float))
+        return [None] + [round(float(v), 2) for v in diffs]
+    return [None] + [round(b - a, 2) for a, b in zip(values, values[1:])]
+
+
+def add_derived(series, derive, window, column="paid"):
+    if "rolling" in derive:
+        series[f"{column}_rolling"] = rolling_mean(series[column], window)
+    if "delta" in derive:
+        series[f"{column}_delta"] = deltas(series[column])
+    return series
+
+
+# === ROUTES ===
+
+
+@analytics_blueprint.route("/revenue", methods=["GET"])
+@roles_required("admin", "staff")
+def revenue():
+    try:
+        granularity = parse_granularity(request.args)
+        start, end = analytics_range(request.args, granularity)
+        derive, window = parse_derive(request.args)
+        series = revenue_series(db, start, end, granularity)
+        return jsonify(
+            add_derived(series, derive, window) | {"granularity": granularity}
+        )
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@analytics_blueprint.route("/revenue/by-type", methods=["GET"])
+@roles_required("admin", "staff")
+def revenue_per_type():
+    try:
+        start, end = analytics_range(request.args)
+        return jsonify(revenue_by_type(db, start, end))
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@analytics_blueprint.route("/overdue", methods=["GET"])
+@roles_required("admin", "staff")
+def overdue():
+    try:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return jsonify(overdue_stats(db, today))
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@analytics_blueprint.route("/leases/<int:lease_id>", methods=["GET"])
+@roles_required("admin", "staff")
+def lease_balance(lease_id):
+    try:
+        return jsonify(lease_ledger(db, lease_id))
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
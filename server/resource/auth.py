@@ -1,43 +1,54 @@
-from datetime import datetime, timezone
-import bcrypt
-from flask import Blueprint, jsonify, make_response, request
+import os
+from datetime import datetime, timedelta
+from functools import wraps
+from dotenv import load_dotenv
+from flask import Blueprint, current_app, jsonify, make_response, request
 from flask_jwt_extended import (
     create_access_token,
-    create_refresh_token,
-    decode_token,
     get_jwt,
     get_jwt_identity,
+    get_jwt_request_location,
     jwt_required,
     set_refresh_cookies,
     unset_refresh_cookies,
     verify_jwt_in_request,
 )
 
-from db.models import AuthUser, RefreshToken, Role, Session
+from db.models import AuthUser, RefreshToken, Session
 from db.database import db
+from resource.hashing import HashingQueueFull, hash_password, verify_password
+from resource.denylist import token_denylist
+from resource.roles import role_registry
+from resource.session_writer import session_writer
+from resource.tokens import mint_tokens
+from resource.instrumentation import query_budget
+
+load_dotenv()
 
 # === BLUEPRINT DECLARATION ===
 auth_blueprint = Blueprint("auth", __name__, url_prefix="/auth")
 
-# === HELPER FUNCTIONS ===
-
+# claims every access token carries, enough to answer /auth/me without MySQL
+IDENTITY_CLAIMS = ("email", "username", "role")
+# lifetime of the tokens SSE routes take in ?jwt=, long enough to open a stream
+STREAM_TOKEN_SECONDS = int(os.getenv("STREAM_TOKEN_SECONDS", "60"))
+STREAM_SCOPE = "stream"
 
-def hash_password(password):
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+# === HELPER FUNCTIONS ===
 
 
-def verify_password(hashed, password):
-    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+def hashing_busy_response(error):
+    resp = make_response(jsonify({"error": str(error)}), 503)
+    resp.headers["Retry-After"] = str(error.retry_after)
+    return resp
 
 
-def store_jti(user_id, jti, expires_at_str):
-    token = RefreshToken(
-        user_id=user_id,
-        token=jti,
-        expires_at=datetime.strptime(expires_at_str, "%Y-%m-%d %H:%M:%S"),
-    )
+def store_jti(user_id, jti, expires_at, commit=True):
+    token = RefreshToken(user_id=user_id, token=jti, expires_at=expires_at)
     db.add(token)
-    db.commit()
+    if commit:
+        db.commit()
+    return token
 
 
 def revoke_jti(jti):
@@ -45,6 +56,7 @@ def revoke_jti(jti):
     if token:
         token.revoked = 1
         db.commit()
+        token_denylist.add(jti, token.expires_at)
         return True
     return False
 
@@ -53,23 +65,53 @@ def find_by_jti(jti):
     return db.query(RefreshToken).filter_by(token=jti).first()
 
 
-def create_session(user_id, session_id, user_agent, ip_address, expires_at):
+def session_values(user_id, session_id, user_agent, ip_address, expires_at):
     if not all([user_id, session_id, user_agent, ip_address, expires_at]):
         raise ValueError("All parameters are required for session creation")
+    return {
+        "user_id": user_id,
+        "session_id": session_id,
+        "user_agent": user_agent,
+        "ip_address": ip_address,
+        "created_at": datetime.now(),
+        "expires_at": expires_at,
+        "revoked": 0,
+    }
+
+
+def create_session(
+    user_id, session_id, user_agent, ip_address, expires_at, commit=True
+):
     new_session = Session(
-        user_id=user_id,
-        session_id=session_id,
-        user_agent=user_agent,
-        ip_address=ip_address,
-        created_at=datetime.now(),
-        expires_at=expires_at,
-        revoked=0,
+        **session_values(user_id, session_id, user_agent, ip_address, expires_at)
     )
     db.add(new_session)
-    db.commit()
+    if commit:
+        db.commit()
     return new_session
 
 
+def record_login(user_id, jti, user_agent, ip_address, expires_at, writer=None):
+    """Unit of work for a login: refresh token and session row land in one commit.
+
+    In write-behind mode only the refresh token is committed here, the session
+    row is handed to the background writer and group-committed shortly after.
+    """
+    writer = writer or session_writer
+    values = session_values(user_id, jti, user_agent, ip_address, expires_at)
+    write_behind = writer.write_behind
+    try:
+        store_jti(user_id, jti, expires_at, commit=False)
+        if not write_behind:
+            db.add(Session(**values))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if write_behind:
+        writer.enqueue(values)
+
+
 def revoke_session(session_id):
     sess = db.query(Session).filter_by(session_id=session_id, revoked=0).first()
     if sess:
@@ -116,28 +158,81 @@ def validate_login(email, password):
     return []
 
 
+def identity_from_claims(identity, claims, fields=IDENTITY_CLAIMS):
+    """Build the /me payload from verified JWT claims, or None if we must ask the DB."""
+    if current_app.config.get("AUTH_STRICT_IDENTITY"):
+        return None
+    if not all(claims.get(field) for field in fields):
+        return None
+    profile = {"id": int(identity)}
+    profile.update({field: claims[field] for field in fields})
+    return profile
+
+
+def identity_from_db(identity):
+    user = db.query(AuthUser).filter_by(id=identity).first()
+    if not user:
+        return None
+    return {
+        "id": user.id,
+        "email": user.email,
+        "username": user.username,
+        "role": role_registry.name_for(user.role_id),
+    }
+
+
+def current_role():
+    """Role of the caller, from the access token when it carries one."""
+    role = get_jwt().get("role")
+    if role:
+        return role
+    profile = identity_from_db(get_jwt_identity())
+    return profile["role"] if profile else None
+
+
+def roles_required(*roles, stream=False):
+    """Like @jwt_required(), but also 403s callers whose role isn't listed.
+
+    ``stream=True`` is for SSE routes. A browser EventSource can't send an
+    Authorization header, so these also take a stream token (POST
+    /auth/stream-token) in the ?jwt= query string. Only a stream token: a
+    regular access token in a URL would end up in access logs and history.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            locations = None
+            if stream:
+                locations = current_app.config["JWT_TOKEN_LOCATION"] + ["query_string"]
+            verify_jwt_in_request(locations=locations)
+            in_url = get_jwt_request_location() == "query_string"
+            # stream tokens open streams, and are no good for anything else
+            if in_url != (get_jwt().get("scope") == STREAM_SCOPE):
+                return jsonify({"error": "Invalid token"}), 401
+            if current_role() not in roles:
+                return jsonify({"error": "Unauthorized"}), 403
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 def generate_tokens_and_claims(user):
     if not user or not hasattr(user, "id") or user.id is None:
         raise ValueError("Invalid user object for token generation")
     try:
         identity = str(user.id)
-        role_obj = db.query(Role).filter_by(id=user.role_id).first()
         additional_claims = {
-            "role": role_obj.name if role_obj else "tenant",
+            "role": role_registry.name_for(user.role_id, "tenant"),
             "email": user.email,
+            "username": user.username,
         }
-        access_token = create_access_token(
-            identity=identity, additional_claims=additional_claims
-        )
-        refresh_token = create_refresh_token(identity=identity)
-        decoded = decode_token(refresh_token)
-        jti = decoded.get("jti")
-        exp = decoded.get("exp")
-        if not all([access_token, refresh_token, jti, exp]):
+        tokens = mint_tokens(identity, additional_claims)
+        if not all(tokens):
             raise ValueError("Token generation failed: missing values")
-        expires_at = datetime.fromtimestamp(exp, timezone.utc)
-        expires_at_str = expires_at.strftime("%Y-%m-%d %H:%M:%S")
-        return access_token, refresh_token, jti, expires_at, expires_at_str
+        return tokens
     except Exception as e:
         raise ValueError(f"Token generation failed: {e}")
 
@@ -146,6 +241,7 @@ def generate_tokens_and_claims(user):
 
 
 @auth_blueprint.route("/register", methods=["POST"])
+@query_budget(4)
 def register():
     try:
         payload = request.get_json() or {}
@@ -161,8 +257,7 @@ def register():
 
         # Hash the password and create the user
         pw_hash = hash_password(password)
-        role_obj = db.query(Role).filter_by(name=role).first()
-        role_id = role_obj.id if role_obj else 1
+        role_id = role_registry.id_for(role, 1)
         user = AuthUser(
             username=username,
             email=email,
@@ -174,6 +269,8 @@ def register():
         db.commit()
 
         return jsonify({"id": user.id}), 201  # Return 201 Created
+    except HashingQueueFull as e:
+        return hashing_busy_response(e)
     except (ValueError, TypeError, KeyError) as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -182,6 +279,7 @@ def register():
 
 
 @auth_blueprint.route("/login", methods=["POST"])
+@query_budget(3)
 def login():
     try:
         payload = request.get_json() or {}
@@ -192,14 +290,11 @@ def login():
         user = db.query(AuthUser).filter_by(email=email).first()
         if not user or not verify_password(user.password_hash, password):
             return jsonify({"error": "invalid credentials"}), 401
-        access_token, refresh_token, jti, expires_at, expires_at_str = (
-            generate_tokens_and_claims(user)
-        )
+        access_token, refresh_token, jti, expires_at = generate_tokens_and_claims(user)
         try:
-            store_jti(user.id, jti, expires_at_str)
             user_agent = request.headers.get("User-Agent", "")
             ip_address = request.remote_addr or ""
-            create_session(user.id, jti, user_agent, ip_address, expires_at)
+            record_login(user.id, jti, user_agent, ip_address, expires_at)
         except Exception as e:
             print("Session logging error: ", e)
         resp = make_response(
@@ -207,6 +302,8 @@ def login():
         )
         set_refresh_cookies(resp, refresh_token)
         return resp
+    except HashingQueueFull as e:
+        return hashing_busy_response(e)
     except (ValueError, TypeError, KeyError) as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -214,11 +311,15 @@ def login():
 
 
 @auth_blueprint.route("/refresh", methods=["POST"])
+@query_budget(1)
 @jwt_required(refresh=True, locations=["cookies"])
 def refresh():
     try:
         identity = get_jwt_identity()
-        new_access = create_access_token(identity=identity)
+        # carry the identity claims over so /auth/me stays on the fast path
+        refresh_claims = get_jwt()
+        claims = {k: refresh_claims[k] for k in IDENTITY_CLAIMS if k in refresh_claims}
+        new_access = create_access_token(identity=identity, additional_claims=claims)
         return jsonify({"access_token": new_access})
     except (ValueError, TypeError, KeyError) as e:
         return jsonify({"error": str(e)}), 400
@@ -226,7 +327,30 @@ def refresh():
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 
+@auth_blueprint.route("/stream-token", methods=["POST"])
+@query_budget(1)
+@jwt_required()
+def stream_token():
+    try:
+        claims = get_jwt()
+        # a stream token can't mint its own successor
+        if claims.get("scope") == STREAM_SCOPE:
+            return jsonify({"error": "Invalid token"}), 401
+        carried = {k: claims[k] for k in IDENTITY_CLAIMS if k in claims}
+        token = create_access_token(
+            identity=get_jwt_identity(),
+            additional_claims=carried | {"scope": STREAM_SCOPE},
+            expires_delta=timedelta(seconds=STREAM_TOKEN_SECONDS),
+        )
+        return jsonify({"stream_token": token, "expires_in": STREAM_TOKEN_SECONDS})
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
 @auth_blueprint.route("/logout", methods=["POST"])
+@query_budget(6)
 @jwt_required(refresh=True, locations=["cookies"])
 def logout():
     try:
@@ -236,7 +360,13 @@ def logout():
             print("No JTI in JWT payload")
             return jsonify({"error": "Invalid token"}), 400
         affected = revoke_jti(jti)
+        if session_writer.write_behind:
+            # the session row may still be sitting in the write-behind queue
+            session_writer.flush()
         session_revoked = revoke_session(jti)
+        if not session_revoked and session_writer.write_behind:
+            # or in another worker's queue, its flush sees the revoked token
+            session_revoked = affected
         resp = jsonify({"revoked": bool(affected and session_revoked)})
         unset_refresh_cookies(resp)
         return resp, 200 if affected and session_revoked else 400
@@ -247,6 +377,7 @@ def logout():
 
 
 @auth_blueprint.route("/session", methods=["GET"])
+@query_budget(2)
 @jwt_required(refresh=True, locations=["cookies"])
 def session_info():
     try:
@@ -255,14 +386,13 @@ def session_info():
         if not user:
             print("No user found, returning 401")
             return jsonify({"authenticated": False}), 401
-        role_obj = db.query(Role).filter_by(id=user.role_id).first()
         resp = {
             "authenticated": True,
             "user": {
                 "id": user.id,
                 "email": user.email,
                 "username": user.username,
-                "role": role_obj.name if role_obj else None,
+                "role": role_registry.name_for(user.role_id),
             },
         }
         return jsonify(resp)
@@ -273,22 +403,36 @@ def session_info():
 
 
 @auth_blueprint.route("/me", methods=["GET"])
+@query_budget(1)
 @jwt_required()
 def me():
     try:
         identity = get_jwt_identity()
-        user = db.query(AuthUser).filter_by(id=identity).first()
-        if not user:
-            return jsonify({"authenticated": False}), 401
-        role_obj = db.query(Role).filter_by(id=user.role_id).first()
-        return jsonify(
-            {
-                "id": user.id,
-                "email": user.email,
-                "username": user.username,
-                "role": role_obj.name if role_obj else None,
-            }
+        profile = identity_from_claims(identity, get_jwt()) or identity_from_db(
+            identity
         )
+        if not profile:
+            return jsonify({"authenticated": False}), 401
+        return jsonify(profile)
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@auth_blueprint.route("/whoami", methods=["GET"])
+@query_budget(1)
+@jwt_required()
+def whoami():
+    try:
+        identity = get_jwt_identity()
+        profile = identity_from_claims(identity, get_jwt(), fields=("role",))
+        if not profile:
+            user = identity_from_db(identity)
+            if not user:
+                return jsonify({"authenticated": False}), 401
+            profile = {"id": user["id"], "role": user["role"]}
+        return jsonify(profile)
     except (ValueError, TypeError, KeyError) as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -330,8 +474,7 @@ def delete_user():
         identity = get_jwt_identity()
 
         if str(user.id) != identity:
-            role_obj = db.query(Role).filter_by(id=user.role_id).first()
-            if not role_obj or role_obj.name != "admin":
+            if role_registry.name_for(user.role_id) != "admin":
                 return jsonify({"error": "Unauthorized"}), 403
 
         db.delete(user)
@@ -339,6 +482,8 @@ def delete_user():
         msg = {"message": f"User with email {email} deleted successfully"}
         return jsonify(msg), 200
 
+    except HashingQueueFull as e:
+        return hashing_busy_response(e)
     except (ValueError, TypeError, KeyError) as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
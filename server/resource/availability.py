@@ -0,0 +1,363 @@
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from dotenv import load_dotenv
+from sqlalchemy import event, exists, func, inspect, literal, select, union_all
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm import object_session
+
+from db.database import SessionLocal
+from db.models import Lease, Room
+from resource.instrumentation import off_budget
+
+load_dotenv()
+
+# full rebuild interval, catches what updated_at can't see (deleted rows)
+AVAILABILITY_TTL_SECONDS = int(os.getenv("AVAILABILITY_TTL_SECONDS", "300"))
+# re-read rows this far behind the high-water mark, covers transactions that
+# committed out of order and the one-second resolution of updated_at
+AVAILABILITY_LAG_SECONDS = int(os.getenv("AVAILABILITY_LAG_SECONDS", "5"))
+# how often the poller picks up rows other processes wrote (0 = off, then only
+# this process's own writes and nothing after the TTL reach the index)
+AVAILABILITY_POLL_SECONDS = float(os.getenv("AVAILABILITY_POLL_SECONDS", "1"))
+UNAVAILABLE_STATUSES = ("maintenance",)
+_DIRTY_KEY = "availability_dirty_rooms"
+
+
+class RoomSlot(NamedTuple):
+    id: int
+    room_number: str
+    floor: int
+    type: str
+    status: str
+    base_rent: object
+
+
+def as_date(value):
+    # DATE comes back as date from MySQL, DateTime columns as datetime elsewhere
+    return value.date() if isinstance(value, datetime) else value
+
+
+def calendar_of(intervals):
+    """(starts, running max of ends) for one room's leases, sorted by start."""
+    intervals = sorted((as_date(s), as_date(e)) for s, e in intervals)
+    starts, max_ends, furthest = [], [], date.min
+    for start, end in intervals:
+        furthest = max(furthest, end)
+        starts.append(start)
+        max_ends.append(furthest)
+    return starts, max_ends
+
+
+def overlaps(calendar, start, end):
+    """Does any lease (inclusive dates) touch [start, end]? O(log leases)."""
+    starts, max_ends = calendar
+    # leases starting on or before the last requested day...
+    i = bisect_right(starts, end)
+    # ...clash if the furthest-reaching of them ends on or after the first day
+    return i > 0 and max_ends[i - 1] >= start
+
+
+class AvailabilityIndex:
+    """In-memory interval index of active leases per room.
+
+    Holds every room plus a sorted calendar of its active leases, so a vacancy
+    search is a bisect per candidate room instead of an anti-join over leases.
+    Lookups only read the current snapshot, they never wait on the database
+    (except for the very first load). Rooms written through this process's ORM
+    are reloaded right after the commit; a poller reloads the rooms whose room
+    or lease rows any process wrote since its previous tick, going by
+    updated_at, and rebuilds everything after the TTL. One thread refreshes at
+    a time. If a reload fails the previous index keeps serving.
+    """
+
+    def __init__(self, ttl=AVAILABILITY_TTL_SECONDS, session_factory=SessionLocal):
+        self.ttl = ttl
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        # rooms, calendars, by_type, swapped as one tuple so readers need no lock
+        self._state = ({}, {}, {})
+        self._dirty = set()
+        self._loaded_at = None
+        # database clock at the last check, and the rows inside the lag window
+        # already applied ({(table, id): updated_at}) so they aren't reloaded
+        self._checked_at = None
+        self._seen = {}
+
+    def _fetch(self, room_ids=None):
+        session = self.session_factory()
+        try:
+            rooms = select(
+                Room.id,
+                Room.room_number,
+                Room.floor,
+                Room.type,
+                Room.status,
+                Room.base_rent,
+            )
+            leases = select(Lease.room_id, Lease.start_date, Lease.end_date).where(
+                Lease.is_active == 1
+            )
+            if room_ids is not None:
+                rooms = rooms.where(Room.id.in_(room_ids))
+                leases = leases.where(Lease.room_id.in_(room_ids))
+            return session.execute(rooms).all(), session.execute(leases).all()
+        finally:
+            session.close()
+
+    def _fetch_written(self, since=None):
+        """Database clock now, plus (table, id, room id, updated_at) of the lease
+        and room rows written at or after ``since``, in one round trip. Only the
+        clock when ``since`` is None.
+
+        A lease moved or deleted by another process only shows up on its new
+        room; its old room reads as busy until the TTL, never as wrongly free.
+        """
+        stmt = select(literal("clock"), literal(0), literal(0), func.now())
+        if since is not None:
+            leases = select(
+                literal("lease"), Lease.id, Lease.room_id, Lease.updated_at
+            ).where(Lease.updated_at >= since)
+            rooms = select(literal("room"), Room.id, Room.id, Room.updated_at).where(
+                Room.updated_at >= since
+            )
+            stmt = union_all(leases, rooms, stmt)
+        session = self.session_factory()
+        try:
+            rows = session.execute(stmt).all()
+        finally:
+            session.close()
+        now = next(row[3] for row in rows if row[0] == "clock")
+        return now, [row for row in rows if row[0] != "clock"]
+
+    def load(self):
+        dirty = set(self._dirty)
+        # read before the fetch, writes racing it are re-read on the next lookup
+        checked_at, _ = self._fetch_written()
+        rooms, leases = self._fetch()
+        self.set_data(rooms, leases)
+        with self._lock:
+            # rooms dirtied during the fetch stay queued
+            self._dirty -= dirty
+            self._checked_at, self._seen = checked_at, {}
+
+    def set_data(self, rooms, leases, room_ids=None):
+        """Swap in rooms and their leases, only ``room_ids`` when it is given."""
+        intervals = {}
+        for room_id, start, end in leases:
+            intervals.setdefault(room_id, []).append((start, end))
+        with self._lock:
+            old_rooms, old_calendars, _ = self._state
+            if room_ids is None:
+                all_rooms, calendars = {}, {}
+            else:
+                all_rooms, calendars = dict(old_rooms), dict(old_calendars)
+                for room_id in room_ids:
+                    all_rooms.pop(room_id, None)
+                    calendars.pop(room_id, None)
+            for row in rooms:
+                all_rooms[row[0]] = RoomSlot(*row)
+                calendars[row[0]] = calendar_of(intervals.get(row[0], ()))
+            self._state = (all_rooms, calendars, self._group_by_type(all_rooms))
+            if room_ids is None:
+                self._loaded_at = time.monotonic()
+
+    @staticmethod
+    def _group_by_type(rooms):
+        """{type: rooms sorted by rent}, key None holds every room."""
+        groups = {None: []}
+        for room in rooms.values():
+            groups[None].append(room)
+            groups.setdefault(room.type, []).append(room)
+        by_type = {}
+        for room_type, members in groups.items():
+            members.sort(key=lambda room: (room.base_rent, room.id))
+            by_type[room_type] = ([room.base_rent for room in members], members)
+        return by_type
+
+    def warm(self):
+        """Load at startup, but don't take the app down if the DB isn't up yet."""
+        try:
+            self.load()
+        except Exception as e:
+            print("Availability index warm-up failed: ", e)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def mark_dirty(self, room_ids):
+        with self._lock:
+            self._dirty.update(room_ids)
+
+    def is_stale(self):
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > self.ttl
+
+    def _reload_written(self):
+        """Reload rooms written since the last check by any process, and dirty ones."""
+        lag = timedelta(seconds=AVAILABILITY_LAG_SECONDS)
+        checked_at, written = self._fetch_written(self._checked_at - lag)
+        written = [row for row in written if self._seen.get(row[:2]) != row[3]]
+        dirty = set(self._dirty)
+        room_ids = dirty | {row[2] for row in written}
+        if room_ids:
+            rooms, leases = self._fetch(room_ids)
+            self.set_data(rooms, leases, room_ids)
+        with self._lock:
+            # only now, a failed reload leaves them queued for the next lookup
+            self._dirty -= dirty
+            self._seen.update((row[:2], row[3]) for row in written)
+            self._checked_at = checked_at
+            horizon = checked_at - lag
+            self._seen = {key: at for key, at in self._seen.items() if at >= horizon}
+
+    def _ensure_fresh(self):
+        # only a lookup that finds nothing loaded yet (warm-up failed) waits on
+        # the database, every later change arrives through apply_dirty/refresh
+        if self._checked_at is not None:
+            return
+        with self._refresh_lock:
+            if self._checked_at is None:
+                self.load()
+
+    def refresh(self):
+        """Poller tick: rebuild after the TTL, else catch up on written rows."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            if self.is_stale() or self._checked_at is None:
+                self.load()
+            else:
+                self._reload_written()
+        except Exception as e:
+            print("Availability index refresh failed, serving stale data: ", e)
+        finally:
+            self._refresh_lock.release()
+
+    def apply_dirty(self):
+        """Reload the rooms this process just committed, so its writer sees them."""
+        # nothing to patch before the first load, and a running refresh (or the
+        # next poller tick) takes whatever is still queued
+        if not self._dirty or self._checked_at is None:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            dirty = set(self._dirty)
+            rooms, leases = self._fetch(dirty)
+            self.set_data(rooms, leases, dirty)
+            with self._lock:
+                self._dirty -= dirty
+        except Exception as e:
+            print("Availability index reload failed, left to the poller: ", e)
+        finally:
+            self._refresh_lock.release()
+
+    def is_free(self, room_id, start, end):
+        self._ensure_fresh()
+        calendar = self._state[1].get(room_id)
+        return calendar is not None and not overlaps(calendar, start, end)
+
+    def free_rooms(
+        self, start, end, room_type=None, max_rent=None, floor=None, limit=None
+    ):
+        """Rooms with no active lease touching [start, end], cheapest first."""
+        self._ensure_fresh()
+        _, calendars, by_type = self._state
+        rents, members = by_type.get(room_type, ((), ()))
+        stop = len(members) if max_rent is None else bisect_right(rents, max_rent)
+        found = []
+        for room in members[:stop]:
+            if floor is not None and room.floor != floor:
+                continue
+            if room.status in UNAVAILABLE_STATUSES:
+                continue
+            if overlaps(calendars[room.id], start, end):
+                continue
+            found.append(room)
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+
+
+def free_rooms_query(start, end, room_type=None, max_rent=None, floor=None):
+    """Same search in plain SQL, an anti-join over leases."""
+    busy = exists().where(
+        Lease.room_id == Room.id,
+        Lease.is_active == 1,
+        Lease.start_date <= end,
+        Lease.end_date >= start,
+    )
+    stmt = select(
+        Room.id, Room.room_number, Room.floor, Room.type, Room.status, Room.base_rent
+    ).where(~busy, Room.status.not_in(UNAVAILABLE_STATUSES))
+    if room_type is not None:
+        stmt = stmt.where(Room.type == room_type)
+    if max_rent is not None:
+        stmt = stmt.where(Room.base_rent <= max_rent)
+    if floor is not None:
+        stmt = stmt.where(Room.floor == floor)
+    return stmt.order_by(Room.base_rent, Room.id)
+
+
+availability_index = AvailabilityIndex()
+
+
+def start_poller(interval=AVAILABILITY_POLL_SECONDS):
+    """Refresh the index every interval seconds, per process (0 disables it)."""
+    if interval <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            availability_index.refresh()
+
+    thread = threading.Thread(target=loop, name="availability-poller", daemon=True)
+    thread.start()
+    return thread
+
+
+# ORM writes queue their rooms on the session, applied only once committed
+@event.listens_for(Lease, "after_insert")
+@event.listens_for(Lease, "after_update")
+@event.listens_for(Lease, "after_delete")
+def _track_lease_write(mapper, connection, target):
+    room_ids = {target.room_id}
+    # a lease moved to another room frees the old one
+    room_ids.update(inspect(target).attrs.room_id.history.deleted or ())
+    _queue_rooms(target, room_ids)
+
+
+@event.listens_for(Room, "after_insert")
+@event.listens_for(Room, "after_update")
+@event.listens_for(Room, "after_delete")
+def _track_room_write(mapper, connection, target):
+    _queue_rooms(target, {target.id})
+
+
+def _queue_rooms(target, room_ids):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_DIRTY_KEY, set()).update(room_ids)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _apply_committed_rooms(session):
+    room_ids = session.info.pop(_DIRTY_KEY, None)
+    if room_ids:
+        availability_index.mark_dirty(room_ids)
+        # the writer pays for the reload, not the route's query budget
+        with off_budget():
+            availability_index.apply_dirty()
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _drop_rolled_back_rooms(session):
+    session.info.pop(_DIRTY_KEY, None)
@@ -0,0 +1,119 @@
+from flask import Blueprint, jsonify, request
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm import object_session
+
+from db.models import Lease, MaintenanceRequest, Payment
+from resource.auth import roles_required
+from resource.events import TooManySubscribers, event_bus, sse_response
+
+# === BLUEPRINT DECLARATION ===
+changes_blueprint = Blueprint("changes", __name__, url_prefix="/events")
+
+PAYMENT_RECORDED = "payment.recorded"
+LEASE_CREATED = "lease.created"
+MAINTENANCE_FILED = "maintenance.filed"
+CHANGE_TOPICS = (PAYMENT_RECORDED, LEASE_CREATED, MAINTENANCE_FILED)
+_PENDING_KEY = "pending_change_events"
+
+# === HELPER FUNCTIONS ===
+
+
+def parse_topics(args):
+    topics = [t for t in args.get("topics", "").split(",") if t]
+    if any(t not in CHANGE_TOPICS for t in topics):
+        raise ValueError(f"topics must be among {', '.join(CHANGE_TOPICS)}")
+    return topics or list(CHANGE_TOPICS)
+
+
+# payloads are ids plus what a dashboard needs to patch a row in place
+def payment_change(payment):
+    return {
+        "id": payment.id,
+        "lease_id": payment.lease_id,
+        "amount_due": payment.amount_due,
+        "amount_paid": payment.amount_paid,
+        "status": payment.status,
+    }
+
+
+def lease_change(lease):
+    return {
+        "id": lease.id,
+        "tenant_id": lease.tenant_id,
+        "room_id": lease.room_id,
+        "start_date": lease.start_date,
+        "end_date": lease.end_date,
+    }
+
+
+def maintenance_change(maintenance_request):
+    return {
+        "id": maintenance_request.id,
+        "tenant_id": maintenance_request.tenant_id,
+        "room_id": maintenance_request.room_id,
+        "priority": maintenance_request.priority,
+        "status": maintenance_request.status,
+    }
+
+
+# ORM writes queue their events on the session, published only once committed.
+# Core bulk inserts (bulk_import.py) and other processes bypass these hooks.
+@event.listens_for(Payment, "after_insert")
+def _payment_inserted(mapper, connection, target):
+    _queue_change(target, PAYMENT_RECORDED, payment_change(target))
+
+
+@event.listens_for(Payment, "after_update")
+def _payment_updated(mapper, connection, target):
+    # status flips from the overdue job are not money coming in
+    if inspect(target).attrs.amount_paid.history.has_changes():
+        _queue_change(target, PAYMENT_RECORDED, payment_change(target))
+
+
+@event.listens_for(Lease, "after_insert")
+def _lease_inserted(mapper, connection, target):
+    _queue_change(target, LEASE_CREATED, lease_change(target))
+
+
+@event.listens_for(MaintenanceRequest, "after_insert")
+def _maintenance_inserted(mapper, connection, target):
+    _queue_change(target, MAINTENANCE_FILED, maintenance_change(target))
+
+
+def _queue_change(target, topic, data):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, []).append((topic, data))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _publish_committed_changes(session):
+    for topic, data in session.info.pop(_PENDING_KEY, ()):
+        event_bus.publish(topic, data)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _drop_rolled_back_changes(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# === ROUTES ===
+
+
+@changes_blueprint.route("/stream", methods=["GET"])
+@roles_required("admin", "staff", stream=True)
+def change_stream():
+    try:
+        topics = parse_topics(request.args)
+        # EventSource resends the last id it saw when it reconnects
+        subscription, resumed = event_bus.subscribe(
+            topics, last_event_id=request.headers.get("Last-Event-ID")
+        )
+        return sse_response(event_bus, subscription, resumed)
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except TooManySubscribers as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
@@ -0,0 +1,153 @@
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import or_
+
+from db.database import SessionLocal, db
+from db.models import JWTBlacklist, RefreshToken
+
+
+def to_timestamp(expires_at):
+    """DB datetimes are naive UTC, a missing expiry means revoked for good."""
+    if expires_at is None:
+        return math.inf
+    if isinstance(expires_at, (int, float)):
+        return float(expires_at)
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at.timestamp()
+
+
+class LocalChannel:
+    """In-process stand-in for a pub/sub broker between API replicas.
+
+    Only reaches denylists in the same process; across gunicorn workers the
+    refresh-token check goes to the DB instead (see is_revoked_in_db). A broker
+    with the same ``publish`` and ``subscribe`` methods can still be attached
+    to spread revocations of other tokens.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def publish(self, jti, expires_at):
+        for callback in list(self._subscribers):
+            callback(jti, expires_at)
+
+
+class TokenDenylist:
+    """Revoked jtis kept in memory until they would have expired anyway.
+
+    Lookups are a dict get; expired entries are dropped lazily on lookup and in a
+    sweep every ``sweep_every`` additions so memory tracks live revocations only.
+    """
+
+    def __init__(self, channel=None, clock=time.time, sweep_every=1024):
+        self.clock = clock
+        self.sweep_every = sweep_every
+        self.channel = None
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._adds_since_sweep = 0
+        if channel is not None:
+            self.attach(channel)
+
+    def attach(self, channel):
+        self.channel = channel
+        channel.subscribe(self._receive)
+
+    def _receive(self, jti, exp):
+        # our own publishes come back through the channel too, skip those
+        if jti not in self._entries:
+            self.add(jti, exp, publish=False)
+
+    def add(self, jti, expires_at=None, publish=True):
+        exp = to_timestamp(expires_at)
+        with self._lock:
+            self._entries[jti] = exp
+            self._adds_since_sweep += 1
+            sweep = self._adds_since_sweep >= self.sweep_every
+        if sweep:
+            self.evict_expired()
+        if publish and self.channel is not None:
+            self.channel.publish(jti, exp)
+
+    def is_revoked(self, jti):
+        exp = self._entries.get(jti)
+        if exp is None:
+            return False
+        if exp <= self.clock():
+            with self._lock:
+                self._entries.pop(jti, None)
+            return False
+        return True
+
+    def is_revoked_in_db(self, jti, session=None):
+        """Ask refresh_tokens, the one place every worker process sees revocations.
+
+        The in-memory entries only hold what this process revoked or loaded at
+        startup; a logout served by another gunicorn worker shows up here. A
+        revoked answer is remembered, a live one can't be (it may change).
+        """
+        row = (
+            (session or db)
+            .query(RefreshToken.revoked, RefreshToken.expires_at)
+            .filter_by(token=jti)
+            .first()
+        )
+        if row is None or not row.revoked:
+            return False
+        self.add(jti, row.expires_at, publish=False)
+        return True
+
+    def evict_expired(self):
+        now = self.clock()
+        with self._lock:
+            expired = [jti for jti, exp in self._entries.items() if exp <= now]
+            for jti in expired:
+                del self._entries[jti]
+            self._adds_since_sweep = 0
+        return len(expired)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, session_factory=SessionLocal):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        session = session_factory()
+        try:
+            revoked = (
+                session.query(RefreshToken.token, RefreshToken.expires_at)
+                .filter(RefreshToken.revoked == 1, RefreshToken.expires_at > now)
+                .all()
+            )
+            blacklisted = (
+                session.query(JWTBlacklist.token, JWTBlacklist.expires_at)
+                .filter(
+                    or_(
+                        JWTBlacklist.expires_at.is_(None), JWTBlacklist.expires_at > now
+                    )
+                )
+                .all()
+            )
+        finally:
+            session.close()
+        for jti, expires_at in revoked + blacklisted:
+            self.add(jti, expires_at, publish=False)
+        return len(revoked) + len(blacklisted)
+
+    def warm(self):
+        """Load at startup, but don't take the app down if the DB isn't up yet."""
+        try:
+            self.load()
+        except Exception as e:
+            print("Token denylist warm-up failed: ", e)
+
+
+# no channel by default, refresh tokens are checked against the DB per use
+token_denylist = TokenDenylist()
@@ -0,0 +1,295 @@
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+from dotenv import load_dotenv
+from flask import Response
+
+load_dotenv()
+
+# events a slow client may fall behind by before the oldest ones are dropped
+EVENT_BUFFER_SIZE = int(os.getenv("EVENT_BUFFER_SIZE", "100"))
+# recent events kept for clients reconnecting with Last-Event-ID
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "256"))
+# worker threads per process, gunicorn.conf.py reads the same variable
+GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", "8"))
+# threads an open stream can never take, so ordinary requests still get served
+STREAM_RESERVED_THREADS = int(os.getenv("STREAM_RESERVED_THREADS", "4"))
+# threads SSE streams and CSV exports may hold at once, per process
+STREAM_THREADS = max(1, GUNICORN_THREADS - STREAM_RESERVED_THREADS)
+# open event streams per process, each one holds a worker thread until the
+# client goes away, so this is capped at the threads left after the reserve
+EVENT_MAX_SUBSCRIBERS = min(
+    int(os.getenv("EVENT_MAX_SUBSCRIBERS", str(STREAM_THREADS))), STREAM_THREADS
+)
+# idle streams send a comment this often so proxies don't cut them
+SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+
+class TooManyStreams(Exception):
+    pass
+
+
+class TooManySubscribers(TooManyStreams):
+    pass
+
+
+class StreamSlots:
+    """Worker threads long-lived responses may hold at once, in this process.
+
+    SSE streams and CSV exports both keep a gthread thread busy until they
+    end; sharing one count keeps them together below the thread pool size.
+    """
+
+    def __init__(self, size=STREAM_THREADS):
+        self.size = size
+        self._lock = threading.Lock()
+        self._used = 0
+
+    def acquire(self, what="streams"):
+        with self._lock:
+            if self._used >= self.size:
+                raise TooManyStreams(f"Too many open {what}")
+            self._used += 1
+
+    def release(self):
+        with self._lock:
+            self._used = max(0, self._used - 1)
+
+    def in_use(self):
+        with self._lock:
+            return self._used
+
+
+class Event:
+    __slots__ = ("id", "topic", "data", "at")
+
+    def __init__(self, id, topic, data, at=None):
+        self.id = id
+        self.topic = topic
+        self.data = data
+        self.at = at if at is not None else time.time()
+
+
+class LocalBroker:
+    """In-process stand-in for a pub/sub broker between API replicas.
+
+    A real deployment swaps this for anything with the same ``publish`` and
+    ``subscribe`` methods (Redis pub/sub, NATS, ...); tests use it to wire
+    several event buses together. Messages are plain dicts so they can be
+    serialized by whatever sits in between.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def publish(self, message):
+        for callback in list(self._subscribers):
+            callback(message)
+
+
+class Subscription:
+    """One client's bounded buffer of events for the topics it asked for.
+
+    A full buffer drops its oldest event rather than blocking the publisher,
+    and remembers how many were lost so the client can be told to refetch.
+    """
+
+    def __init__(self, topics, maxsize=EVENT_BUFFER_SIZE):
+        self.topics = frozenset(topics)
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def offer(self, event):
+        with self._lock:
+            while True:
+                try:
+                    self._queue.put_nowait(event)
+                    return
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def get(self, timeout=None):
+        """Next event, or None if nothing arrived within timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def take_dropped(self):
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class EventBus:
+    """In-process fan-out of events to subscriptions, publish never blocks.
+
+    With a broker attached, events published here are forwarded to the other
+    replicas and theirs are delivered here, so a client sees every replica's
+    writes whichever one it is connected to. Event ids are "<origin>-<seq>",
+    unique across replicas, which is what lets Last-Event-ID resume anywhere.
+    """
+
+    def __init__(
+        self,
+        broker=None,
+        history_size=EVENT_HISTORY_SIZE,
+        max_subscribers=EVENT_MAX_SUBSCRIBERS,
+        slots=None,
+    ):
+        self.origin = uuid.uuid4().hex[:8]
+        self.max_subscribers = max_subscribers
+        self.slots = slots
+        self.broker = None
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._history = deque(maxlen=history_size)
+        self._seq = itertools.count(1)
+        if broker is not None:
+            self.attach(broker)
+
+    def attach(self, broker):
+        self.broker = broker
+        broker.subscribe(self._receive)
+
+    def _receive(self, message):
+        # our own publishes come back through the broker too, skip those
+        if message["origin"] != self.origin:
+            self._deliver(Event(message["id"], message["topic"], message["data"]))
+
+    def subscribe(self, topics, maxsize=EVENT_BUFFER_SIZE, last_event_id=None):
+        """New subscription, pre-filled with what it missed since ``last_event_id``.
+
+        Returns (subscription, resumed). ``resumed`` is False when the id has
+        already left the history, the client should refetch instead.
+        """
+        subscription = Subscription(topics, maxsize)
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscribers:
+                raise TooManySubscribers("Too many open event streams")
+            if self.slots is not None:
+                try:
+                    self.slots.acquire("event streams")
+                except TooManyStreams as e:
+                    raise TooManySubscribers(str(e))
+            self._subscriptions.add(subscription)
+            missed = self._since(last_event_id) if last_event_id else []
+        for event in missed or ():
+            if event.topic in subscription.topics:
+                subscription.offer(event)
+        return subscription, missed is not None
+
+    def _since(self, last_event_id):
+        history = list(self._history)
+        for i, event in enumerate(history, start=1):
+            if event.id == last_event_id:
+                return history[i:]
+        return None
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription not in self._subscriptions:
+                return
+            self._subscriptions.discard(subscription)
+            if self.slots is not None:
+                self.slots.release()
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscriptions)
+
+    def publish(self, topic, data):
+        event = Event(f"{self.origin}-{next(self._seq)}", topic, data)
+        self._deliver(event)
+        if self.broker is not None:
+            try:
+                self.broker.publish(
+                    {
+                        "origin": self.origin,
+                        "id": event.id,
+                        "topic": topic,
+                        "data": data,
+                    }
+                )
+            except Exception as e:
+                # other replicas miss it, local clients already have it
+                print("Event broker publish failed: ", e)
+        return event
+
+    def _deliver(self, event):
+        with self._lock:
+            self._history.append(event)
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if event.topic in subscription.topics:
+                subscription.offer(event)
+
+
+def sse_format(event=None, name=None, data=None, comment=None):
+    """One Server-Sent Events frame."""
+    if comment is not None:
+        return f": {comment}\n\n"
+    if event is not None:
+        name, data = event.topic, event.data
+        head = f"id: {event.id}\n"
+    else:
+        head = ""
+    return f"{head}event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_stream(bus, subscription, heartbeat=SSE_HEARTBEAT_SECONDS, resumed=True):
+    """Yield SSE frames for a subscription until the client goes away.
+
+    Dropped events (a full buffer, or a resume point too old to replay) are
+    reported as a ``resync`` event, the client's cue to refetch its lists.
+    """
+    try:
+        yield sse_format(comment="connected")
+        if not resumed:
+            yield sse_format(name="resync", data={"reason": "history"})
+        while True:
+            event = subscription.get(timeout=heartbeat)
+            dropped = subscription.take_dropped()
+            if dropped:
+                yield sse_format(
+                    name="resync", data={"reason": "overflow", "dropped": dropped}
+                )
+            if event is None:
+                yield sse_format(comment="keep-alive")
+            else:
+                yield sse_format(event)
+    finally:
+        # runs when the WSGI server closes the generator on disconnect
+        bus.unsubscribe(subscription)
+
+
+def sse_response(bus, subscription, resumed=True):
+    response = Response(
+        sse_stream(bus, subscription, resumed=resumed),
+        mimetype="text/event-stream",
+        # no caching, and no buffering in an nginx in front of us
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # a generator closed before its first frame never runs its finally
+    response.call_on_close(lambda: bus.unsubscribe(subscription))
+    return response
+
+
+# shared by every long-lived response of this process
+stream_slots = StreamSlots()
+# no broker by default, multi-replica deployments attach one at startup
+event_bus = EventBus(slots=stream_slots)
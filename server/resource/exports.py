@@ -0,0 +1,192 @@
+import csv
+import io
+import os
+import zlib
+from datetime import date, datetime, timedelta
+
+from dotenv import load_dotenv
+from flask import Blueprint, Response, jsonify, request
+from sqlalchemy import select
+
+from db.database import get_engine
+from db.models import Lease, Payment
+from resource.auth import roles_required
+from resource.events import TooManyStreams, stream_slots
+from resource.tenants import directory_query, parse_directory_filters
+
+load_dotenv()
+
+# rows fetched per round-trip from the server-side cursor, and rows per HTTP chunk
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))
+
+# === BLUEPRINT DECLARATION ===
+exports_blueprint = Blueprint("exports", __name__, url_prefix="/exports")
+
+# same order as the columns directory_query selects
+TENANT_COLUMNS = [
+    "id",
+    "full_name",
+    "phone",
+    "status",
+    "email",
+    "room_number",
+    "floor",
+    "lease_end",
+]
+PAYMENT_COLUMNS = [
+    "id",
+    "lease_id",
+    "amount_due",
+    "amount_paid",
+    "due_date",
+    "paid_date",
+    "payment_type",
+    "status",
+]
+LEASE_COLUMNS = [
+    "id",
+    "tenant_id",
+    "room_id",
+    "start_date",
+    "end_date",
+    "rent_amount",
+    "deposit_amount",
+    "is_active",
+]
+
+# === HELPER FUNCTIONS ===
+
+
+def csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(stmt, header, bind=None, yield_per=EXPORT_YIELD_PER):
+    """Yield CSV text ``yield_per`` rows at a time straight off a server-side cursor.
+
+    Uses its own connection rather than the request session, so nothing but the
+    current chunk is ever held in memory and the request session stays free.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    bind = bind or get_engine()
+    with bind.connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, yield_per=yield_per
+        ).execute(stmt)
+        for partition in result.partitions():
+            writer.writerows([csv_value(v) for v in row] for row in partition)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def csv_response(stmt, header, filename):
+    """Streamed CSV, holding one of the process's stream slots until it ends."""
+    chunks = csv_chunks(stmt, header)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if request.args.get("gzip", "0").lower() in ("1", "true", "yes"):
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_chunks(chunks)
+    else:
+        body = (chunk.encode("utf-8") for chunk in chunks)
+    # the export keeps a worker thread busy for as long as the download runs
+    stream_slots.acquire("exports")
+    response = Response(body, mimetype="text/csv", headers=headers)
+    response.call_on_close(stream_slots.release)
+    return response
+
+
+def parse_date_range(args):
+    bounds = []
+    for key in ("from", "to"):
+        raw = args.get(key)
+        try:
+            bounds.append(datetime.fromisoformat(raw) if raw else None)
+        except ValueError:
+            raise ValueError(f"{key} must be an ISO date")
+    return bounds
+
+
+def tenants_export_query(args):
+    return directory_query(parse_directory_filters(args))
+
+
+def payments_export_query(args):
+    """``to`` is an inclusive day, so due_date gets the half-open [from, to + 1 day)."""
+    start, end = parse_date_range(args)
+    stmt = select(*(getattr(Payment, c) for c in PAYMENT_COLUMNS))
+    if start:
+        stmt = stmt.where(Payment.due_date >= start)
+    if end:
+        stmt = stmt.where(Payment.due_date < end + timedelta(days=1))
+    return stmt.order_by(Payment.id)
+
+
+def leases_export_query(args):
+    stmt = select(*(getattr(Lease, c) for c in LEASE_COLUMNS))
+    active = args.get("active")
+    if active is not None:
+        stmt = stmt.where(Lease.is_active == (1 if active in ("1", "true") else 0))
+    return stmt.order_by(Lease.id)
+
+
+# === ROUTES ===
+
+
+@exports_blueprint.route("/tenants.csv", methods=["GET"])
+@roles_required("admin", "staff")
+def export_tenants():
+    try:
+        stmt = tenants_export_query(request.args)
+        return csv_response(stmt, TENANT_COLUMNS, "tenants.csv")
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except TooManyStreams as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@exports_blueprint.route("/payments.csv", methods=["GET"])
+@roles_required("admin", "staff")
+def export_payments():
+    try:
+        stmt = payments_export_query(request.args)
+        return csv_response(stmt, PAYMENT_COLUMNS, "payments.csv")
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except TooManyStreams as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@exports_blueprint.route("/leases.csv", methods=["GET"])
+@roles_required("admin", "staff")
+def export_leases():
+    try:
+        stmt = leases_export_query(request.args)
+        return csv_response(stmt, LEASE_COLUMNS, "leases.csv")
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except TooManyStreams as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
@@ -0,0 +1,152 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import bcrypt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# bcrypt cost factor, every +1 doubles the time per hash/verify
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# concurrent hashes actually running per process, 0 runs them inline on the request
+# thread; gunicorn.conf.py defaults it to cores // workers so workers share the host
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+# extra requests allowed to wait for a worker before we start shedding with 503s
+HASH_QUEUE_DEPTH = int(os.getenv("HASH_QUEUE_DEPTH", "32"))
+HASH_RETRY_AFTER_SECONDS = int(os.getenv("HASH_RETRY_AFTER_SECONDS", "1"))
+# process (default) or thread, threads are mostly handy for tests and local dev
+HASH_EXECUTOR = os.getenv("HASH_EXECUTOR", "process")
+
+
+class HashingQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is already full."""
+
+    def __init__(self, retry_after=HASH_RETRY_AFTER_SECONDS):
+        super().__init__("Hashing queue is full, try again later")
+        self.retry_after = retry_after
+
+
+# these run inside the worker processes, so they must stay module-level
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode(
+        "utf-8"
+    )
+
+
+def _checkpw(hashed, password):
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def new_executor(workers, kind=HASH_EXECUTOR):
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    # spawn, because forking a multi-threaded server process is unsafe
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+class HashingPool:
+    """Bounded executor for bcrypt work with non-blocking admission control.
+
+    At most ``workers + queue_depth`` calls are admitted at once; anything beyond
+    that fails fast with ``HashingQueueFull`` instead of queueing more latency.
+    The executor itself is created lazily on first use so importing this module
+    never forks or spawns anything.
+    """
+
+    def __init__(
+        self, workers=HASH_WORKERS, queue_depth=HASH_QUEUE_DEPTH, kind=HASH_EXECUTOR
+    ):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.kind = kind
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_depth)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._in_flight = 0
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Call ``callback(seconds)`` after every run, queue wait included."""
+        self._listeners.append(callback)
+
+    def _notify(self, started):
+        elapsed = time.perf_counter() - started
+        for callback in self._listeners:
+            callback(elapsed)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = new_executor(self.workers, self.kind)
+            return self._executor
+
+    def run(self, fn, *args):
+        started = time.perf_counter()
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._notify(started)
+        if not self._slots.acquire(blocking=False):
+            raise HashingQueueFull()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            self._notify(started)
+
+    def warm(self):
+        """Start the worker processes now, so no caller pays for spawning them."""
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        # cheapest cost factor, one per worker so each one gets started
+        jobs = [executor.submit(_hashpw, "warm-up", 4) for _ in range(self.workers)]
+        for job in jobs:
+            job.result()
+
+    def depth(self):
+        """Calls currently running or waiting for a worker."""
+        with self._lock:
+            return self._in_flight
+
+    def capacity(self):
+        """Calls admitted at once before HashingQueueFull, 0 when hashing inline."""
+        return max(self.workers, 1) + self.queue_depth if self.workers > 0 else 0
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+hashing_pool = HashingPool()
+
+
+def hash_password(password, rounds=None):
+    return hashing_pool.run(_hashpw, password, rounds or BCRYPT_ROUNDS)
+
+
+def verify_password(hashed, password):
+    return hashing_pool.run(_checkpw, hashed, password)
+
+
+def hash_many(passwords, executor=None, rounds=None):
+    """Hash a batch of passwords in order, spread over ``executor`` if given.
+
+    For bulk jobs that own their executor, requests go through hashing_pool.
+    """
+    rounds = rounds or BCRYPT_ROUNDS
+    if executor is None:
+        return [_hashpw(password, rounds) for password in passwords]
+    return list(executor.map(_hashpw, passwords, [rounds] * len(passwords)))
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+
+from db.database import DB_MAX_OVERFLOW, get_engine
+from resource.hashing import hashing_pool
+from resource.instrumentation import query_budget
+
+load_dotenv()
+
+# probes within this many seconds share one DB ping, per process
+HEALTH_DB_PING_TTL_SECONDS = float(os.getenv("HEALTH_DB_PING_TTL_SECONDS", "5"))
+# /readyz says 503 once this share of DB connections / hashing slots is taken
+READY_MAX_POOL_SATURATION = float(os.getenv("READY_MAX_POOL_SATURATION", "0.9"))
+READY_MAX_HASH_SATURATION = float(os.getenv("READY_MAX_HASH_SATURATION", "0.9"))
+READY_RETRY_AFTER_SECONDS = int(os.getenv("READY_RETRY_AFTER_SECONDS", "5"))
+
+# === BLUEPRINT DECLARATION ===
+health_blueprint = Blueprint("health", __name__)
+
+# === HELPER FUNCTIONS ===
+
+
+class DbProbe:
+    """``SELECT 1`` at most once per ``ttl`` seconds, every other probe reads the cache.
+
+    Only one thread pings at a time; while it waits (e.g. on a DB that stopped
+    answering) the others get the previous result instead of piling up.
+    """
+
+    def __init__(self, ttl=HEALTH_DB_PING_TTL_SECONDS, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        # (checked_at, result) in one attribute, so readers never see half an update
+        self._last = None
+
+    def _ping(self):
+        started = time.perf_counter()
+        try:
+            with get_engine().connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception as e:
+            print(f"Readiness DB ping failed: {e}")
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    def check(self):
+        now, last = self.clock(), self._last
+        fresh = last is not None and now - last[0] < self.ttl
+        if fresh or not self._lock.acquire(blocking=last is None):
+            checked_at, result = last
+            return dict(result, age=round(now - checked_at, 1))
+        try:
+            result = self._ping()
+            self._last = (self.clock(), result)
+        finally:
+            self._lock.release()
+        return dict(result, age=0.0)
+
+    def reset(self):
+        with self._lock:
+            self._last = None
+
+
+db_probe = DbProbe()
+
+
+def saturation(used, capacity):
+    return round(used / capacity, 3) if capacity else 0.0
+
+
+def pool_check():
+    pool = get_engine().pool
+    checked_out = pool.checkedout()
+    # the pool may grow to size + max_overflow before checkouts start to wait
+    capacity = pool.size() + DB_MAX_OVERFLOW
+    level = saturation(checked_out, capacity)
+    return {
+        "ok": level < READY_MAX_POOL_SATURATION,
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": level,
+    }
+
+
+def hashing_check():
+    depth, capacity = hashing_pool.depth(), hashing_pool.capacity()
+    level = saturation(depth, capacity)
+    return {
+        "ok": level < READY_MAX_HASH_SATURATION,
+        "in_flight": depth,
+        "capacity": capacity,
+        "saturation": level,
+    }
+
+
+def readiness():
+    checks = {"pool": pool_check(), "hashing": hashing_check()}
+    # an exhausted pool would make the ping itself wait, the pool check says enough
+    if checks["pool"]["ok"]:
+        checks["db"] = db_probe.check()
+    return all(check["ok"] for check in checks.values()), checks
+
+
+# === ROUTES ===
+
+
+@health_blueprint.route("/healthz", methods=["GET"])
+@query_budget(0)
+def healthz():
+    # liveness: the process answers, no I/O so it can't fail because of the DB
+    return jsonify({"status": "ok"}), 200
+
+
+@health_blueprint.route("/readyz", methods=["GET"])
+@query_budget(1)
+def readyz():
+    try:
+        ready, checks = readiness()
+        if not ready:
+            return (
+                jsonify({"status": "unavailable", "checks": checks}),
+                503,
+                {"Retry-After": str(READY_RETRY_AFTER_SECONDS)},
+            )
+        return jsonify({"status": "ready", "checks": checks}), 200
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
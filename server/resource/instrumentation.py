@@ -0,0 +1,496 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+from dotenv import load_dotenv
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    g,
+    has_request_context,
+    jsonify,
+    request,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from db.database import get_engine, pool_metrics
+from resource.hashing import hashing_pool
+
+load_dotenv()
+
+# Server-Timing on every response, turn off to keep timings away from browsers
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "1").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# /metrics* want "Authorization: Bearer <token>" (e.g. from Prometheus), unset = off
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# what a route over its @query_budget (or an N+1 pattern) does: off, log or raise
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "log").lower()
+# the same statement this many times in one request looks like N+1 (0 = off)
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+# statements at least this slow get logged with their EXPLAIN plan (0 = off)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "50"))
+# distinct statements whose plans are remembered, least recently seen go first
+SLOW_QUERY_PLAN_CACHE_SIZE = int(os.getenv("SLOW_QUERY_PLAN_CACHE_SIZE", "256"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "<unmatched>"
+
+# === BLUEPRINT DECLARATION ===
+instrumentation_blueprint = Blueprint("instrumentation", __name__)
+
+# === HELPER FUNCTIONS ===
+
+
+class Histogram:
+    """Prometheus-style histogram, one set of bucket counts per label combination.
+
+    Lives in process memory, so under gunicorn each worker exposes its own
+    numbers; Prometheus sums them when it scrapes each worker as a target.
+    """
+
+    def __init__(self, name, help, buckets, labels=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        # index of the first bucket the value fits in, +Inf is the last slot
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                ]
+            series[0][slot] += 1
+            series[1] += value
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: (list(v[0]), v[1]) for k, v in self._series.items()}
+        for label_values, (counts, total) in sorted(series.items()):
+            labels = [
+                f'{name}="{escape_label(value)}"'
+                for name, value in zip(self.labels, label_values)
+            ]
+            running = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                running += count
+                le = ",".join(labels + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {running}")
+            suffix = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total:.6f}")
+            lines.append(f"{self.name}_count{suffix} {running}")
+        return lines
+
+
+class Counter:
+    """Prometheus-style counter, one running total per label combination."""
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def inc(self, *label_values):
+        with self._lock:
+            self._totals[label_values] = self._totals.get(label_values, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._totals = {}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            totals = dict(self._totals)
+        for label_values, total in sorted(totals.items()):
+            labels = ",".join(
+                f'{name}="{escape_label(value)}"'
+                for name, value in zip(self.labels, label_values)
+            )
+            suffix = "{" + labels + "}" if labels else ""
+            lines.append(f"{self.name}_total{suffix} {total}")
+        return lines
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Wall time per request until the response is handed to the server.",
+    LATENCY_BUCKETS,
+    ("method", "route", "status"),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time per request spent executing SQL.",
+    LATENCY_BUCKETS,
+    ("route",),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_queries",
+    "SQL statements executed per request.",
+    QUERY_BUCKETS,
+    ("route",),
+)
+HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "bcrypt hash/verify time, waiting for a hashing worker included.",
+    LATENCY_BUCKETS,
+)
+HISTOGRAMS = (REQUEST_SECONDS, REQUEST_DB_SECONDS, REQUEST_QUERIES, HASH_SECONDS)
+BUDGET_EXCEEDED = Counter(
+    "http_query_budget_exceeded",
+    "Requests over their query budget or repeating one statement N+1 style.",
+    ("route",),
+)
+SLOW_QUERIES = Counter(
+    "db_slow_queries", "Statements slower than SLOW_QUERY_MS.", ("route",)
+)
+COUNTERS = (BUDGET_EXCEEDED, SLOW_QUERIES)
+
+
+class RequestStats:
+    __slots__ = (
+        "started",
+        "db_seconds",
+        "queries",
+        "hash_seconds",
+        "statements",
+        "off_budget",
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.hash_seconds = 0.0
+        # statement text -> times run, same text with new params is the N+1 shape
+        self.statements = {}
+        # > 0 while running SQL the route didn't ask for, see off_budget()
+        self.off_budget = 0
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request ran more SQL than its route allows (QUERY_BUDGET_MODE=raise)."""
+
+
+def query_budget(limit):
+    """Declare the most statements a route may run per request, e.g. /auth/me <= 1.
+
+    Goes under the @route decorator; it only tags the view, record_request
+    does the checking once the response is ready.
+    """
+
+    def decorator(fn):
+        fn.query_budget = limit
+        return fn
+
+    return decorator
+
+
+def budget_for_request():
+    view = current_app.view_functions.get(request.endpoint)
+    return getattr(view, "query_budget", None)
+
+
+def query_problems(stats, budget, threshold=None):
+    """Human readable reasons this request's SQL looks wrong, empty when it's fine."""
+    threshold = N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+    problems = []
+    if budget is not None and stats.queries > budget:
+        problems.append(f"ran {stats.queries} queries, budget is {budget}")
+    if threshold:
+        for statement, count in stats.statements.items():
+            if count >= threshold:
+                problems.append(f"ran {count}x (N+1?): {shorten(statement)}")
+    return problems
+
+
+def shorten(statement, limit=200):
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+def report_query_problems(route, problems):
+    BUDGET_EXCEEDED.inc(route)
+    message = f"{request.method} {route} " + "; ".join(problems)
+    if QUERY_BUDGET_MODE == "raise":
+        raise QueryBudgetExceeded(message)
+    print(f"Query budget: {message}")
+
+
+def is_explainable(statement, executemany):
+    # batched writes have no single plan, and EXPLAIN must not capture itself
+    return not executemany and not statement.lstrip().upper().startswith("EXPLAIN")
+
+
+def explain_plan(engine, statement, parameters):
+    """EXPLAIN a captured statement on its own connection, None if it can't be."""
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    prefix = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+    with engine.connect() as conn:
+        result = conn.exec_driver_sql(f"{prefix} {statement}", parameters)
+        return [dict(row) for row in result.mappings()]
+
+
+class SlowQueryLog:
+    """The last few statements slower than SLOW_QUERY_MS, with their EXPLAIN plans.
+
+    Plans are fetched by one background thread on a separate connection, so the
+    slow request doesn't pay for them and a streaming cursor is never disturbed.
+    Each distinct statement is explained once per process, as long as it stays
+    among the ``plans`` most recently seen ones (IN lists of every length make
+    new statement texts, so the cache can't grow with them).
+    """
+
+    def __init__(self, size=SLOW_QUERY_LOG_SIZE, plans=SLOW_QUERY_PLAN_CACHE_SIZE):
+        self._entries = deque(maxlen=size)
+        self._plans = OrderedDict()
+        self._max_plans = plans
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def record(self, engine, statement, parameters, seconds, route):
+        entry = {
+            "statement": shorten(statement, limit=2000),
+            "ms": round(seconds * 1000, 1),
+            "route": route,
+            "at": datetime.now().isoformat(),
+        }
+        with self._lock:
+            explained = statement in self._plans
+            entry["plan"] = self._plans.get(statement)
+            self._entries.append(entry)
+            self._remember(statement, entry["plan"])
+        print(f"Slow query ({entry['ms']} ms) on {route}: {shorten(statement)}")
+        if explained:
+            return None
+        return self._pool().submit(self._explain, entry, engine, statement, parameters)
+
+    def _pool(self):
+        # a pool copied into a forked gunicorn worker has no thread behind it
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(1, "slow-query-explain")
+                self._pid = os.getpid()
+            return self._executor
+
+    def _explain(self, entry, engine, statement, parameters):
+        try:
+            plan = explain_plan(engine, statement, parameters)
+        except Exception as e:
+            print(f"Error explaining slow query: {e}")
+            return None
+        with self._lock:
+            self._remember(statement, plan)
+            entry["plan"] = plan
+        return plan
+
+    def _remember(self, statement, plan):
+        # caller holds the lock
+        self._plans[statement] = plan
+        self._plans.move_to_end(statement)
+        while len(self._plans) > self._max_plans:
+            self._plans.popitem(last=False)
+
+    def entries(self):
+        with self._lock:
+            return list(self._entries)
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+def current_stats():
+    """Stats of the request being served on this thread, None outside requests."""
+    if not has_request_context():
+        return None
+    return g.get("request_stats")
+
+
+@contextmanager
+def off_budget():
+    """Don't count the statements run inside against the route's query budget.
+
+    For shared caches whose refresh lands on whichever request finds them stale;
+    the time still shows up as db time, only the budget and N+1 counts skip it.
+    """
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+    stats.off_budget += 1
+    try:
+        yield
+    finally:
+        stats.off_budget -= 1
+
+
+def route_label():
+    # the rule, not the path, so /maintenance/<int:request_id> is one series
+    return request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+
+
+def server_timing(stats, total):
+    entries = [
+        f"app;dur={total * 1000:.1f}",
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"',
+    ]
+    if stats.hash_seconds:
+        entries.append(f"hash;dur={stats.hash_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def pool_lines():
+    stats = pool_metrics.snapshot(get_engine().pool)
+    lines = []
+    for key, kind in (
+        ("checkouts", "counter"),
+        ("wait_seconds_total", "counter"),
+        ("timeouts", "counter"),
+        ("checked_out", "gauge"),
+        ("overflow", "gauge"),
+    ):
+        name = f"db_pool_{key}"
+        lines += [f"# TYPE {name} {kind}", f"{name} {stats[key]}"]
+    return lines
+
+
+def render_metrics():
+    lines = []
+    for metric in HISTOGRAMS + COUNTERS:
+        lines += metric.render()
+    lines += pool_lines()
+    lines.append(f"hashing_in_flight {hashing_pool.depth()}")
+    return "\n".join(lines) + "\n"
+
+
+# every engine, including ones created later, times its statements
+@event.listens_for(Engine, "before_cursor_execute")
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info["statement_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("statement_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = current_stats()
+    if stats is not None:
+        stats.db_seconds += elapsed
+        if not stats.off_budget:
+            stats.queries += 1
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+    slow = SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS
+    if slow and is_explainable(statement, executemany):
+        # background jobs have no route, their slow statements still get logged
+        route = route_label() if stats is not None else "<background>"
+        SLOW_QUERIES.inc(route)
+        slow_query_log.record(conn.engine, statement, parameters, elapsed, route)
+
+
+def _hash_finished(seconds):
+    HASH_SECONDS.observe(seconds)
+    stats = current_stats()
+    if stats is not None:
+        stats.hash_seconds += seconds
+
+
+hashing_pool.add_listener(_hash_finished)
+
+
+@instrumentation_blueprint.before_app_request
+def start_request_timer():
+    g.request_stats = RequestStats()
+
+
+@instrumentation_blueprint.after_app_request
+def record_request(response):
+    stats = g.pop("request_stats", None)
+    if stats is None:
+        return response
+    # streamed bodies (CSV exports, SSE) are timed up to their first byte
+    total = time.perf_counter() - stats.started
+    route = route_label()
+    REQUEST_SECONDS.observe(total, request.method, route, str(response.status_code))
+    REQUEST_DB_SECONDS.observe(stats.db_seconds, route)
+    REQUEST_QUERIES.observe(stats.queries, route)
+    if SERVER_TIMING_ENABLED:
+        response.headers["Server-Timing"] = server_timing(stats, total)
+    if QUERY_BUDGET_MODE != "off":
+        problems = query_problems(stats, budget_for_request())
+        if problems:
+            report_query_problems(route, problems)
+    return response
+
+
+def check_metrics_token():
+    # statements, plans and pool state are not for the public, so no token = no metrics
+    if not METRICS_TOKEN:
+        return jsonify({"error": "Metrics are disabled, set METRICS_TOKEN"}), 404
+    if request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        return jsonify({"error": "Unauthorized"}), 401
+    return None
+
+
+# === ROUTES ===
+
+
+@instrumentation_blueprint.route("/metrics", methods=["GET"])
+def metrics():
+    try:
+        denied = check_metrics_token()
+        if denied:
+            return denied
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@instrumentation_blueprint.route("/metrics/slow-queries", methods=["GET"])
+def slow_queries():
+    try:
+        denied = check_metrics_token()
+        if denied:
+            return denied
+        return jsonify(
+            {"threshold_ms": SLOW_QUERY_MS, "queries": slow_query_log.entries()}
+        )
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
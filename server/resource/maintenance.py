@@ -0,0 +1,243 @@
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import select
+
+from db.database import db
+from db.models import Lease, MaintenanceRequest
+from resource.auth import current_role, roles_required
+from resource.events import TooManySubscribers, event_bus, sse_response
+from resource.pagination import decode_cursor, keyset_after, page_of, parse_limit
+from resource.instrumentation import query_budget
+
+# === BLUEPRINT DECLARATION ===
+maintenance_blueprint = Blueprint("maintenance", __name__, url_prefix="/maintenance")
+
+# triage order, most urgent first
+PRIORITIES = ("emergency", "high", "medium", "low")
+MAINTENANCE_STATUSES = ("open", "in progress", "closed")
+TRIAGE_STATUSES = ("open", "in progress")
+# within one priority, backed by idx_maintenance_triage (status, priority, ...)
+AGE_ORDER = [(MaintenanceRequest.request_date, False), (MaintenanceRequest.id, False)]
+EMERGENCY_TOPIC = "maintenance.emergency"
+
+# === HELPER FUNCTIONS ===
+
+
+def parse_priority(value, default=None):
+    priority = value if value is not None else default
+    if priority not in PRIORITIES:
+        raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+    return priority
+
+
+def parse_triage_status(args):
+    status = args.get("status", "open")
+    if status not in TRIAGE_STATUSES:
+        raise ValueError(f"status must be one of {', '.join(TRIAGE_STATUSES)}")
+    return status
+
+
+def parse_triage_cursor(cursor):
+    """(priority, request_date, id) of the last row on the previous page."""
+    if not cursor:
+        return None
+    after = decode_cursor(cursor, 3)
+    if after[0] not in PRIORITIES or not isinstance(after[1], datetime):
+        raise ValueError("Invalid cursor")
+    return after
+
+
+def active_room_of(session, tenant_id):
+    return session.execute(
+        select(Lease.room_id).where(Lease.tenant_id == tenant_id, Lease.is_active == 1)
+    ).scalar()
+
+
+def parse_new_request(data, role, identity, session):
+    """Column values for a new request; tenants file against their own room."""
+    description = (data.get("description") or "").strip()
+    if not description:
+        raise ValueError("description is required")
+    priority = parse_priority(data.get("priority"), default="medium")
+    if role == "tenant":
+        tenant_id = int(identity)
+        room_id = active_room_of(session, tenant_id)
+        if room_id is None:
+            raise ValueError("No active lease to file a request against")
+        if data.get("room_id") is not None and int(data["room_id"]) != room_id:
+            raise ValueError("Tenants can only file requests for their own room")
+    else:
+        if data.get("tenant_id") is None or data.get("room_id") is None:
+            raise ValueError("tenant_id and room_id are required")
+        tenant_id, room_id = int(data["tenant_id"]), int(data["room_id"])
+    return {
+        "tenant_id": tenant_id,
+        "room_id": room_id,
+        "description": description,
+        "priority": priority,
+    }
+
+
+def triage_columns():
+    return (
+        MaintenanceRequest.id,
+        MaintenanceRequest.tenant_id,
+        MaintenanceRequest.room_id,
+        MaintenanceRequest.description,
+        MaintenanceRequest.priority,
+        MaintenanceRequest.status,
+        MaintenanceRequest.request_date,
+        MaintenanceRequest.resolved_date,
+    )
+
+
+def triage_rows(session, status, limit, after=None):
+    """Up to ``limit`` requests in triage order, most urgent then oldest first.
+
+    Walks one priority at a time: each step is an equality on (status, priority)
+    and a range on (request_date, id), an index range scan with no sort. A single
+    ORDER BY priority can't do that portably, MySQL orders the ENUM by position
+    but compares it against string literals alphabetically.
+    """
+    rows = []
+    first = PRIORITIES.index(after[0]) if after is not None else 0
+    for priority in PRIORITIES[first:]:
+        stmt = select(*triage_columns()).where(
+            MaintenanceRequest.status == status,
+            MaintenanceRequest.priority == priority,
+        )
+        if after is not None and priority == after[0]:
+            stmt = stmt.where(keyset_after(AGE_ORDER, after[1:]))
+        stmt = stmt.order_by(*(column for column, _ in AGE_ORDER))
+        rows.extend(session.execute(stmt.limit(limit - len(rows))).all())
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def request_card(row):
+    return {
+        "id": row.id,
+        "tenant_id": row.tenant_id,
+        "room_id": row.room_id,
+        "description": row.description,
+        "priority": row.priority,
+        "status": row.status,
+        "request_date": row.request_date.isoformat() if row.request_date else None,
+        "resolved_date": row.resolved_date.isoformat() if row.resolved_date else None,
+    }
+
+
+def apply_update(maintenance_request, data, now=None):
+    """Apply a staff PATCH, returns True if it escalated the request to emergency."""
+    if "priority" not in data and "status" not in data:
+        raise ValueError("Nothing to update, send priority and/or status")
+    escalated = False
+    if "priority" in data:
+        priority = parse_priority(data["priority"])
+        escalated = (
+            priority == "emergency" and maintenance_request.priority != "emergency"
+        )
+        maintenance_request.priority = priority
+    if "status" in data:
+        status = data["status"]
+        if status not in MAINTENANCE_STATUSES:
+            raise ValueError(f"status must be one of {', '.join(MAINTENANCE_STATUSES)}")
+        maintenance_request.status = status
+        # reopening a request clears its resolution
+        maintenance_request.resolved_date = (
+            (now or datetime.now()) if status == "closed" else None
+        )
+    return escalated and maintenance_request.status != "closed"
+
+
+# === ROUTES ===
+
+
+@maintenance_blueprint.route("", methods=["POST"])
+@query_budget(3)
+@roles_required("admin", "staff", "tenant")
+def file_request():
+    try:
+        values = parse_new_request(
+            request.get_json() or {}, current_role(), get_jwt_identity(), db
+        )
+        maintenance_request = MaintenanceRequest(**values, request_date=datetime.now())
+        db.add(maintenance_request)
+        db.commit()
+        card = request_card(maintenance_request)
+        # only after the commit, so staff are never paged about a rolled-back row
+        if card["priority"] == "emergency":
+            event_bus.publish(EMERGENCY_TOPIC, card)
+        return jsonify(card), 201
+    except (ValueError, TypeError, KeyError) as e:
+        db.rollback()
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.rollback()
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@maintenance_blueprint.route("/triage", methods=["GET"])
+@query_budget(4)
+@roles_required("admin", "staff")
+def triage():
+    try:
+        limit = parse_limit(request.args)
+        status = parse_triage_status(request.args)
+        after = parse_triage_cursor(request.args.get("cursor"))
+        # one extra row tells us whether there is a next page without a COUNT(*)
+        rows = triage_rows(db, status, limit + 1, after)
+        rows, next_cursor, has_more = page_of(
+            rows, limit, lambda row: (row.priority, row.request_date, row.id)
+        )
+        return jsonify(
+            {
+                "requests": [request_card(row) for row in rows],
+                "next_cursor": next_cursor,
+                "has_more": has_more,
+            }
+        )
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@maintenance_blueprint.route("/<int:request_id>", methods=["PATCH"])
+@query_budget(3)
+@roles_required("admin", "staff")
+def update_request(request_id):
+    try:
+        maintenance_request = db.get(MaintenanceRequest, request_id)
+        if maintenance_request is None:
+            return jsonify({"error": "Maintenance request not found"}), 404
+        escalated = apply_update(maintenance_request, request.get_json() or {})
+        db.commit()
+        card = request_card(maintenance_request)
+        if escalated:
+            event_bus.publish(EMERGENCY_TOPIC, card)
+        return jsonify(card)
+    except (ValueError, TypeError, KeyError) as e:
+        db.rollback()
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.rollback()
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@maintenance_blueprint.route("/emergencies/stream", methods=["GET"])
+@roles_required("admin", "staff", stream=True)
+def emergency_stream():
+    try:
+        # one subscription per connection, dropped when the client disconnects
+        subscription, resumed = event_bus.subscribe(
+            [EMERGENCY_TOPIC], last_event_id=request.headers.get("Last-Event-ID")
+        )
+        return sse_response(event_bus, subscription, resumed)
+    except TooManySubscribers as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+def parse_limit(args, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    raw = args.get("limit", default)
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1 or limit > maximum:
+        raise ValueError(f"limit must be between 1 and {maximum}")
+    return limit
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values):
+    """Opaque cursor for the sort key of the last row on a page."""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return [_decode_value(v) for v in values]
+
+
+def keyset_after(keys, values):
+    """WHERE clause for rows strictly after ``values`` in the order given by ``keys``.
+
+    ``keys`` is a list of ``(column, descending)`` pairs matching the ORDER BY.
+    Expanded into ORs of equalities rather than a row constructor, so MySQL can
+    turn it into an index range scan.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        prefix = [col == val for (col, _), val in zip(keys[:i], values[:i])]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*prefix, step))
+    return or_(*clauses)
+
+
+def page_of(rows, limit, cursor_key):
+    """Trim the limit+1 probe row and build the next cursor from the last row kept."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(cursor_key(rows[-1])) if has_more and rows else None
+    return rows, next_cursor, has_more
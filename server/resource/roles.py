@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+from db.database import SessionLocal
+from db.models import Role
+from resource.instrumentation import off_budget
+
+load_dotenv()
+
+# roles barely ever change, so a few minutes of staleness across replicas is fine
+ROLE_CACHE_TTL_SECONDS = int(os.getenv("ROLE_CACHE_TTL_SECONDS", "300"))
+# after a failed refresh the stale roles are served this long before the next
+# try, doubling per consecutive failure up to the TTL
+ROLE_CACHE_RETRY_SECONDS = int(os.getenv("ROLE_CACHE_RETRY_SECONDS", "5"))
+
+
+class RoleRegistry:
+    """In-process id<->name map of the ``roles`` table with TTL refresh.
+
+    Lookups never hit the database unless the cache is empty or older than the
+    TTL. One thread refreshes at a time, the others keep reading the current
+    maps. If a refresh fails the previous maps are kept and the next try backs
+    off, so a DB outage neither turns every authenticated request into an error
+    nor makes each of them wait out a connect timeout.
+    """
+
+    def __init__(
+        self,
+        ttl=ROLE_CACHE_TTL_SECONDS,
+        session_factory=SessionLocal,
+        retry=ROLE_CACHE_RETRY_SECONDS,
+    ):
+        self.ttl = ttl
+        self.session_factory = session_factory
+        self.retry = retry
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._id_to_name = {}
+        self._name_to_id = {}
+        self._loaded_at = None
+        self._failures = 0
+
+    def load(self):
+        session = self.session_factory()
+        try:
+            rows = session.query(Role.id, Role.name).all()
+        finally:
+            session.close()
+        self.set_roles(rows)
+
+    def set_roles(self, rows):
+        id_to_name = {role_id: name for role_id, name in rows}
+        with self._lock:
+            self._id_to_name = id_to_name
+            self._name_to_id = {name: role_id for role_id, name in id_to_name.items()}
+            self._loaded_at = time.monotonic()
+            self._failures = 0
+
+    def warm(self):
+        """Load at startup, but don't take the app down if the DB isn't up yet."""
+        try:
+            self.load()
+        except Exception as e:
+            print("Role registry warm-up failed: ", e)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def is_stale(self):
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > self.ttl
+
+    def _back_off(self):
+        # stale again once the delay is up, not on the very next lookup
+        with self._lock:
+            self._failures += 1
+            delay = min(self.retry * 2 ** (self._failures - 1), self.ttl)
+            self._loaded_at = time.monotonic() - self.ttl + delay
+
+    def _ensure_fresh(self):
+        if not self.is_stale():
+            return
+        # only an empty cache makes readers wait, otherwise whoever refreshes
+        # does it alone and everyone else reads the current maps
+        if not self._refresh_lock.acquire(blocking=not self._id_to_name):
+            return
+        try:
+            if not self.is_stale():
+                return
+            # once per TTL on some request, not something its route's budget covers
+            with off_budget():
+                self.load()
+        except Exception as e:
+            if not self._id_to_name:
+                raise
+            self._back_off()
+            print("Role registry refresh failed, serving stale roles: ", e)
+        finally:
+            self._refresh_lock.release()
+
+    def name_for(self, role_id, default=None):
+        self._ensure_fresh()
+        return self._id_to_name.get(role_id, default)
+
+    def id_for(self, name, default=None):
+        self._ensure_fresh()
+        return self._name_to_id.get(name, default)
+
+
+role_registry = RoleRegistry()
+
+
+# any role write made through the ORM in this process drops the cache right away
+@event.listens_for(Role, "after_insert")
+@event.listens_for(Role, "after_update")
+@event.listens_for(Role, "after_delete")
+def _invalidate_on_role_write(mapper, connection, target):
+    role_registry.invalidate()
@@ -0,0 +1,312 @@
+import os
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, delete, func, or_, select, union_all
+
+from db.models import Payment, PaymentRollup, PaymentTombstone, RollupState
+
+load_dotenv()
+
+# re-read payments this far behind the high-water mark, covers transactions that
+# committed out of order and the one-second resolution of rollup_changed_at
+ROLLUP_LAG_SECONDS = int(os.getenv("ROLLUP_LAG_SECONDS", "5"))
+# partitions recomputed per statement
+ROLLUP_BATCH_SIZE = int(os.getenv("ROLLUP_BATCH_SIZE", "500"))
+# past this many payments written since the last refresh, reads skip the rollups
+ROLLUP_MAX_LIVE_ROWS = int(os.getenv("ROLLUP_MAX_LIVE_ROWS", "1000"))
+ROLLUP_STATE_NAME = "payment_rollups"
+
+LEASE_MONTH = "lease_month"
+TYPE_DAY = "type_day"
+GRAINS = (LEASE_MONTH, TYPE_DAY)
+
+
+def payment_type_expr():
+    return func.coalesce(Payment.payment_type, "unknown")
+
+
+def month_start_expr(column, dialect):
+    if dialect == "mysql":
+        return func.date_format(column, "%Y-%m-01")
+    return func.date(column, "start of month")
+
+
+def dialect_of(executor):
+    # works for both a Connection and a Session
+    dialect = getattr(executor, "dialect", None) or executor.get_bind().dialect
+    return dialect.name
+
+
+def to_day(value):
+    # DATE comes back as date from MySQL, as a string from SQLite
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def partition_key(grain, lease_id, payment_type, due_date):
+    """(lease_id, payment_type, period) of the rollup row a payment lands in."""
+    day = to_day(due_date)
+    if grain == LEASE_MONTH:
+        return (lease_id, "", day.replace(day=1))
+    return (0, payment_type or "unknown", day)
+
+
+def partition_bounds(grain, period):
+    start = datetime.combine(period, time.min)
+    if grain == TYPE_DAY:
+        return start, start + timedelta(days=1)
+    month = period.year * 12 + period.month  # the next month, zero-based
+    return start, datetime(month // 12, month % 12 + 1, 1)
+
+
+def payments_in(grain, keys):
+    """WHERE clause for the payments behind the given partitions, as index ranges."""
+    clauses = []
+    for lease_id, payment_type, period in keys:
+        start, end = partition_bounds(grain, period)
+        in_range = and_(Payment.due_date >= start, Payment.due_date < end)
+        if grain == LEASE_MONTH:
+            clauses.append(and_(Payment.lease_id == lease_id, in_range))
+        else:
+            clauses.append(and_(payment_type_expr() == payment_type, in_range))
+    return or_(*clauses)
+
+
+def rollups_in(grain, keys):
+    return and_(
+        PaymentRollup.grain == grain,
+        or_(
+            *(
+                and_(
+                    PaymentRollup.lease_id == lease_id,
+                    PaymentRollup.payment_type == payment_type,
+                    PaymentRollup.period == period,
+                )
+                for lease_id, payment_type, period in keys
+            )
+        ),
+    )
+
+
+def batches(items, size=ROLLUP_BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        stop = start + size
+        yield items[start:stop]
+
+
+def aggregate(connection, grain, *where):
+    """GROUP BY payments into rollup rows, optionally only the given partitions."""
+    if grain == LEASE_MONTH:
+        month = month_start_expr(Payment.due_date, dialect_of(connection))
+        group = (Payment.lease_id, month)
+    else:
+        group = (payment_type_expr(), func.date(Payment.due_date))
+    stmt = (
+        select(
+            *group,
+            func.sum(Payment.amount_due),
+            func.sum(Payment.amount_paid),
+            func.count(Payment.id),
+        )
+        .where(*where)
+        .group_by(*group)
+    )
+    rows = []
+    for key, period, amount_due, amount_paid, count in connection.execute(stmt):
+        lease_id, payment_type = (key, "") if grain == LEASE_MONTH else (0, key)
+        rows.append(
+            {
+                "grain": grain,
+                "lease_id": lease_id,
+                "payment_type": payment_type,
+                "period": to_day(period),
+                "amount_due": amount_due or 0,
+                "amount_paid": amount_paid or 0,
+                "payment_count": count,
+            }
+        )
+    return rows
+
+
+def touched_partitions(connection, grain, since, limit=None):
+    """Partitions holding payments whose rollup inputs were written, or left by
+    payments deleted or moved, at or after ``since``. Status-only updates don't
+    count, they change no total.
+
+    With ``limit``, returns None once there are more than that many payments to
+    look at, the caller should stop trying to patch the rollups.
+    """
+    stmt = union_all(
+        select(Payment.lease_id, payment_type_expr(), Payment.due_date).where(
+            Payment.rollup_changed_at >= since
+        ),
+        select(
+            PaymentTombstone.lease_id,
+            func.coalesce(PaymentTombstone.payment_type, "unknown"),
+            PaymentTombstone.due_date,
+        ).where(PaymentTombstone.deleted_at >= since),
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+    rows = connection.execute(stmt).all()
+    if limit is not None and len(rows) > limit:
+        return None
+    return {partition_key(grain, *row) for row in rows}
+
+
+def latest_write(connection):
+    """Newest rollup input write or tombstone, the next high-water mark."""
+    marks = [
+        connection.execute(select(func.max(column))).scalar()
+        for column in (Payment.rollup_changed_at, PaymentTombstone.deleted_at)
+    ]
+    marks = [mark for mark in marks if mark is not None]
+    return max(marks) if marks else None
+
+
+def high_water_mark(connection):
+    return connection.execute(
+        select(RollupState.high_water_mark).where(RollupState.name == ROLLUP_STATE_NAME)
+    ).scalar()
+
+
+def save_high_water_mark(connection, mark, refreshed_at):
+    values = {"high_water_mark": mark, "refreshed_at": refreshed_at}
+    table = RollupState.__table__
+    updated = connection.execute(
+        table.update().where(table.c.name == ROLLUP_STATE_NAME).values(**values)
+    )
+    if not updated.rowcount:
+        connection.execute(table.insert().values(name=ROLLUP_STATE_NAME, **values))
+
+
+def rebuild_partitions(connection, grain, keys=None):
+    """Recompute rollup rows from payments, every partition when ``keys`` is None."""
+    table = PaymentRollup.__table__
+    if keys is None:
+        connection.execute(delete(table).where(table.c.grain == grain))
+        rows = aggregate(connection, grain)
+        for batch in batches(rows):
+            connection.execute(table.insert(), batch)
+        return len(rows)
+    written = 0
+    for batch in batches(keys):
+        # recompute rather than add, so updated payments come out right and a
+        # partition whose last payment was deleted loses its row
+        connection.execute(delete(table).where(rollups_in(grain, batch)))
+        rows = aggregate(connection, grain, payments_in(grain, batch))
+        if rows:
+            connection.execute(table.insert(), rows)
+        written += len(rows)
+    return written
+
+
+def refresh(connection, full=False, now=None):
+    """Bring payment_rollups up to date, returns {grain: rows written}.
+
+    Only partitions touched since the stored high-water mark are recomputed,
+    unless ``full`` is set or the rollups have never been built. Commits once
+    at the end so readers never see a half-applied refresh.
+    """
+    mark = None if full else high_water_mark(connection)
+    new_mark = latest_write(connection)
+    written = {}
+    for grain in GRAINS:
+        if mark is None:
+            written[grain] = rebuild_partitions(connection, grain)
+        else:
+            since = mark - timedelta(seconds=ROLLUP_LAG_SECONDS)
+            keys = touched_partitions(connection, grain, since)
+            written[grain] = rebuild_partitions(connection, grain, keys)
+    new_mark = new_mark or mark
+    save_high_water_mark(connection, new_mark, now or datetime.now())
+    if new_mark is not None:
+        # readers and the next refresh only look back to new_mark - lag
+        horizon = new_mark - timedelta(seconds=ROLLUP_LAG_SECONDS)
+        connection.execute(
+            delete(PaymentTombstone).where(PaymentTombstone.deleted_at < horizon)
+        )
+    connection.commit()
+    return written
+
+
+def live_since(session):
+    """Payments written at or after this are not (reliably) in the rollups yet.
+
+    None when the rollups have never been built.
+    """
+    mark = high_water_mark(session)
+    if mark is None:
+        return None
+    return mark - timedelta(seconds=ROLLUP_LAG_SECONDS)
+
+
+def rollup_totals(
+    session, grain, label_expr, label_of, since, rollup_where=(), payment_where=()
+):
+    """{label: [due, paid, count]} read from the rollups plus a live delta.
+
+    ``label_expr`` groups rollup rows in SQL, ``label_of(row)`` labels a single
+    rollup row dict the same way in Python. Partitions with payments written
+    since the high-water mark are swapped for live aggregates, so reads cost
+    O(periods) + O(recent writes) instead of O(history). Returns None when the
+    backlog of unrefreshed partitions is too big to patch.
+    """
+    # out-of-scope keys are harmless, the stale and live lookups below are scoped
+    keys = touched_partitions(session, grain, since, limit=ROLLUP_MAX_LIVE_ROWS)
+    if keys is None:
+        return None
+    totals = defaultdict(lambda: [0.0, 0.0, 0])
+    stmt = (
+        select(
+            label_expr,
+            func.sum(PaymentRollup.amount_due),
+            func.sum(PaymentRollup.amount_paid),
+            func.sum(PaymentRollup.payment_count),
+        )
+        .where(PaymentRollup.grain == grain, *rollup_where)
+        .group_by(label_expr)
+    )
+    for label, amount_due, amount_paid, count in session.execute(stmt):
+        add_to(totals[str(label)], amount_due, amount_paid, count)
+    columns = (
+        PaymentRollup.lease_id,
+        PaymentRollup.payment_type,
+        PaymentRollup.period,
+        PaymentRollup.amount_due,
+        PaymentRollup.amount_paid,
+        PaymentRollup.payment_count,
+    )
+    for batch in batches(keys):
+        stale = session.execute(
+            select(*columns).where(rollups_in(grain, batch), *rollup_where)
+        )
+        for row in stale:
+            row = dict(row._mapping) | {"period": to_day(row.period)}
+            add_to(
+                totals[label_of(row)],
+                row["amount_due"],
+                row["amount_paid"],
+                row["payment_count"],
+                sign=-1,
+            )
+        for row in aggregate(session, grain, payments_in(grain, batch), *payment_where):
+            add_to(
+                totals[label_of(row)],
+                row["amount_due"],
+                row["amount_paid"],
+                row["payment_count"],
+            )
+    return totals
+
+
+def add_to(total, amount_due, amount_paid, count, sign=1):
+    total[0] += sign * float(amount_due or 0)
+    total[1] += sign * float(amount_paid or 0)
+    total[2] += sign * int(count or 0)
@@ -0,0 +1,79 @@
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from flask import Blueprint, jsonify, request
+
+from resource.auth import roles_required
+from resource.availability import availability_index
+from resource.pagination import parse_limit
+
+# === BLUEPRINT DECLARATION ===
+rooms_blueprint = Blueprint("rooms", __name__, url_prefix="/rooms")
+
+ROOM_TYPES = ("studio", "1BR", "2BR", "3BR", "commercial")
+ROOM_STATUSES = ("vacant", "occupied", "maintenance")
+
+# === HELPER FUNCTIONS ===
+
+
+def parse_availability_query(args):
+    try:
+        start = date.fromisoformat(args.get("start", ""))
+        end = date.fromisoformat(args.get("end", ""))
+    except ValueError:
+        raise ValueError("start and end must be ISO dates")
+    if end < start:
+        raise ValueError("end must not be before start")
+    room_type = args.get("type")
+    if room_type is not None and room_type not in ROOM_TYPES:
+        raise ValueError("invalid room type")
+    max_rent = args.get("max_rent")
+    if max_rent is not None:
+        try:
+            max_rent = Decimal(max_rent)
+        except InvalidOperation:
+            raise ValueError("max_rent must be a number")
+        # NaN and Infinity parse, but can't be compared against rents
+        if not max_rent.is_finite():
+            raise ValueError("max_rent must be a number")
+    floor = args.get("floor")
+    if floor is not None:
+        try:
+            floor = int(floor)
+        except ValueError:
+            raise ValueError("floor must be an integer")
+    return {
+        "start": start,
+        "end": end,
+        "room_type": room_type,
+        "max_rent": max_rent,
+        "floor": floor,
+    }
+
+
+def room_card(room):
+    return {
+        "id": room.id,
+        "room_number": room.room_number,
+        "floor": room.floor,
+        "type": room.type,
+        "status": room.status,
+        "base_rent": str(room.base_rent),
+    }
+
+
+# === ROUTES ===
+
+
+@rooms_blueprint.route("/availability", methods=["GET"])
+@roles_required("admin", "staff")
+def room_availability():
+    try:
+        query = parse_availability_query(request.args)
+        limit = parse_limit(request.args)
+        rooms = availability_index.free_rooms(**query, limit=limit)
+        return jsonify({"rooms": [room_card(room) for room in rooms]})
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
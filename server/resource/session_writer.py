@@ -0,0 +1,136 @@
+import atexit
+import os
+import queue
+import threading
+
+from dotenv import load_dotenv
+from sqlalchemy import insert, select, update
+
+from db.database import SessionLocal
+from db.models import RefreshToken, Session
+
+load_dotenv()
+
+# sync writes the session row in the login transaction, write_behind group-commits it
+# (per process; a logout on another worker is caught up by the flush, see below)
+SESSION_WRITE_MODE = os.getenv("SESSION_WRITE_MODE", "sync")
+SESSION_FLUSH_INTERVAL_MS = int(os.getenv("SESSION_FLUSH_INTERVAL_MS", "50"))
+SESSION_FLUSH_BATCH = int(os.getenv("SESSION_FLUSH_BATCH", "500"))
+
+
+def revoke_logged_out(session_ids):
+    """Revoke rows in the batch whose refresh token is already revoked.
+
+    The queue is per process, so a logout handled by another gunicorn worker
+    can't flush it and may commit before the row lands; without this the late
+    insert would bring the session back as active.
+    """
+    revoked = select(RefreshToken.token).where(
+        RefreshToken.token.in_(session_ids), RefreshToken.revoked == 1
+    )
+    return (
+        update(Session)
+        .where(Session.session_id.in_(session_ids), Session.session_id.in_(revoked))
+        .values(revoked=1)
+    )
+
+
+class SessionWriteBehind:
+    """Queues session audit rows and inserts them in batches from a background thread.
+
+    Every ``interval_ms`` the queue is drained and written with one executemany
+    insert and one commit per ``batch_size`` rows. The thread starts on the first
+    enqueue, so importing this module (or forking workers) starts nothing.
+    ``mode`` says whether logins use it at all ("write_behind") or write their
+    session row themselves ("sync").
+    """
+
+    def __init__(
+        self,
+        mode=SESSION_WRITE_MODE,
+        interval_ms=SESSION_FLUSH_INTERVAL_MS,
+        batch_size=SESSION_FLUSH_BATCH,
+        session_factory=SessionLocal,
+    ):
+        self.mode = mode
+        self.interval = interval_ms / 1000
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.flushed = 0
+        self.dropped = 0
+        self._queue = queue.Queue()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def write_behind(self):
+        return self.mode == "write_behind"
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="session-write-behind", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.flush()
+
+    def enqueue(self, values):
+        self._ensure_started()
+        self._queue.put(values)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _drain(self):
+        rows = []
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def flush(self):
+        """Write everything queued so far, returns the number of rows inserted."""
+        written = 0
+        with self._flush_lock:
+            rows = self._drain()
+            while rows:
+                session = self.session_factory()
+                try:
+                    session.execute(insert(Session), rows)
+                    # same transaction, so no reader sees the row active in between
+                    session.execute(
+                        revoke_logged_out([row["session_id"] for row in rows])
+                    )
+                    session.commit()
+                    written += len(rows)
+                except Exception as e:
+                    session.rollback()
+                    self.dropped += len(rows)
+                    print("Session write-behind error, dropped rows: ", len(rows), e)
+                finally:
+                    session.close()
+                rows = self._drain()
+            self.flushed += written
+        return written
+
+    def stop(self):
+        self._stopped.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+
+
+session_writer = SessionWriteBehind()
@@ -0,0 +1,139 @@
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import func, select
+
+from db.database import db
+from db.models import AuthUser, Lease, Room, Tenant
+from resource.auth import roles_required
+from resource.pagination import decode_cursor, keyset_after, page_of, parse_limit
+
+# === BLUEPRINT DECLARATION ===
+tenants_blueprint = Blueprint("tenants", __name__, url_prefix="/tenants")
+
+TENANT_STATUSES = ("prospect", "active", "past")
+LEASE_STATES = ("active", "none")
+# directory order, backed by idx_tenants_full_name (full_name, user_id)
+DIRECTORY_ORDER = [(Tenant.full_name, False), (Tenant.user_id, False)]
+
+# === HELPER FUNCTIONS ===
+
+
+def parse_directory_filters(args):
+    statuses = [s for s in args.get("status", "").split(",") if s]
+    if any(s not in TENANT_STATUSES for s in statuses):
+        raise ValueError("invalid status filter")
+    floor = args.get("floor")
+    if floor is not None:
+        try:
+            floor = int(floor)
+        except ValueError:
+            raise ValueError("floor must be an integer")
+    lease = args.get("lease")
+    if lease is not None and lease not in LEASE_STATES:
+        raise ValueError("invalid lease filter")
+    search = (args.get("q") or "").strip()
+    return {"statuses": statuses, "floor": floor, "lease": lease, "search": search}
+
+
+def current_lease_id():
+    """The newest active lease of the tenant on the outer row, one per tenant.
+
+    Joining every active lease would repeat a tenant once per lease and the
+    (full_name, user_id) keyset could then skip or repeat cards across pages.
+    """
+    return (
+        select(func.max(Lease.id))
+        .where(Lease.tenant_id == Tenant.user_id, Lease.is_active == 1)
+        .correlate(Tenant)
+        .scalar_subquery()
+    )
+
+
+def directory_query(filters, after=None, limit=None):
+    """Only the columns a directory card shows, never whole ORM objects."""
+    stmt = (
+        select(
+            Tenant.user_id,
+            Tenant.full_name,
+            Tenant.phone,
+            Tenant.status,
+            AuthUser.email,
+            Room.room_number,
+            Room.floor,
+            Lease.end_date,
+        )
+        .join(AuthUser, AuthUser.id == Tenant.user_id)
+        .outerjoin(Lease, Lease.id == current_lease_id())
+        .outerjoin(Room, Room.id == Lease.room_id)
+    )
+    if filters["statuses"]:
+        stmt = stmt.where(Tenant.status.in_(filters["statuses"]))
+    if filters["floor"] is not None:
+        stmt = stmt.where(Room.floor == filters["floor"])
+    if filters["lease"] == "active":
+        stmt = stmt.where(Lease.id.is_not(None))
+    elif filters["lease"] == "none":
+        stmt = stmt.where(Lease.id.is_(None))
+    if filters["search"]:
+        # prefix match so the full_name index still applies
+        stmt = stmt.where(
+            Tenant.full_name.startswith(filters["search"], autoescape=True)
+        )
+    if after is not None:
+        stmt = stmt.where(keyset_after(DIRECTORY_ORDER, after))
+    stmt = stmt.order_by(*(column for column, _ in DIRECTORY_ORDER))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def iso_date(value):
+    # DATE columns come back as date from MySQL, datetime from other drivers
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+def tenant_card(row):
+    return {
+        "id": row.user_id,
+        "full_name": row.full_name,
+        "phone": row.phone,
+        "status": row.status,
+        "email": row.email,
+        "room_number": row.room_number,
+        "floor": row.floor,
+        "lease_end": iso_date(row.end_date),
+    }
+
+
+# === ROUTES ===
+
+
+@tenants_blueprint.route("", methods=["GET"])
+@roles_required("admin", "staff")
+def list_tenants():
+    try:
+        limit = parse_limit(request.args)
+        filters = parse_directory_filters(request.args)
+        cursor = request.args.get("cursor")
+        after = decode_cursor(cursor, len(DIRECTORY_ORDER)) if cursor else None
+        # one extra row tells us whether there is a next page without a COUNT(*)
+        rows = db.execute(directory_query(filters, after, limit + 1)).all()
+        rows, next_cursor, has_more = page_of(
+            rows, limit, lambda row: (row.full_name, row.user_id)
+        )
+        return jsonify(
+            {
+                "tenants": [tenant_card(row) for row in rows],
+                "next_cursor": next_cursor,
+                "has_more": has_more,
+            }
+        )
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from flask import current_app
+from flask_jwt_extended import create_access_token, create_refresh_token
+
+
+class MintedTokens(NamedTuple):
+    access_token: str
+    refresh_token: str
+    jti: str
+    expires_at: datetime
+
+
+def refresh_expires_delta():
+    delta = current_app.config.get("JWT_REFRESH_TOKEN_EXPIRES", timedelta(days=30))
+    if type(delta) is int:
+        delta = timedelta(seconds=delta)
+    if not isinstance(delta, timedelta):
+        raise ValueError("Refresh tokens must expire to be stored")
+    return delta
+
+
+def mint_tokens(identity, additional_claims=None):
+    """Create an access/refresh pair with the refresh jti and expiry decided up front.
+
+    The jti and exp are passed into the encoder as claim overrides, so callers get
+    them back as values instead of decoding the token they just signed.
+    """
+    claims = additional_claims or {}
+    jti = str(uuid.uuid4())
+    # whole seconds, exactly what ends up in the token's exp claim
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    expires_at = now + refresh_expires_delta()
+    access_token = create_access_token(identity=identity, additional_claims=claims)
+    refresh_token = create_refresh_token(
+        identity=identity,
+        additional_claims={**claims, "jti": jti, "exp": expires_at},
+    )
+    return MintedTokens(access_token, refresh_token, jti, expires_at)
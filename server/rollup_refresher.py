@@ -0,0 +1,87 @@
+"""Refresh payment_rollups from the payments written since the last run.
+
+Usage:
+    python rollup_refresher.py              # one incremental pass
+    python rollup_refresher.py --full       # rebuild every partition
+    python rollup_refresher.py --every 60   # keep running, one pass a minute
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from db.database import get_engine
+from reaper import acquire_lock, release_lock
+from resource.rollups import refresh
+
+load_dotenv()
+
+# 0 keeps the refresher out of the API process, run the CLI from cron instead
+ROLLUP_INTERVAL_SECONDS = int(os.getenv("ROLLUP_INTERVAL_SECONDS", "0"))
+ROLLUP_LOCK_NAME = "qualisync_rollups"
+
+
+def run_once(bind=None, full=False):
+    """One pass, returns {grain: rows written}, or None if another replica has it."""
+    bind = bind or get_engine()
+    with bind.connect() as connection:
+        if not acquire_lock(connection, ROLLUP_LOCK_NAME):
+            return None
+        try:
+            return refresh(connection, full=full)
+        finally:
+            release_lock(connection, ROLLUP_LOCK_NAME)
+
+
+def report(written, elapsed):
+    if written is None:
+        return "rollups: skipped, another replica holds the lock"
+    counts = " ".join(f"{grain}={count}" for grain, count in written.items())
+    return f"rollups: {counts} ({elapsed:.2f}s)"
+
+
+def run_and_report(full=False):
+    started = time.perf_counter()
+    try:
+        written = run_once(full=full)
+    except Exception as e:
+        print("Rollup refresh failed: ", e)
+        return None
+    print(report(written, time.perf_counter() - started))
+    return written
+
+
+def start_in_background(interval=ROLLUP_INTERVAL_SECONDS):
+    """Refresh inside the API process every interval seconds (0 disables it)."""
+    if interval <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            run_and_report()
+
+    thread = threading.Thread(target=loop, name="rollup-refresher", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument(
+        "--every", type=int, default=0, help="seconds between runs, 0 runs once"
+    )
+    args = parser.parse_args()
+
+    run_and_report(args.full)
+    while args.every > 0:
+        time.sleep(args.every)
+        run_and_report()
+
+
+if __name__ == "__main__":
+    main()
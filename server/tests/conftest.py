@@ -0,0 +1,4 @@
+import os
+
+# a route over its @query_budget or running N+1 SQL fails the test instead of logging
+os.environ.setdefault("QUERY_BUDGET_MODE", "raise")
@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import pytest
 from db.models import AuthUser
 from main import app
@@ -201,3 +204,90 @@ def test_session_endpoint(client):
         response_no_cookie.get_json(),
     )
     assert response_no_cookie.status_code in (401, 422)
+
+
+def test_me_endpoint(client):
+    # Arrange: register and login, access token goes in the Authorization header
+    _, email, username, password = register_user(client, password="pw123")
+    login_resp = login_user(client, email, "pw123")
+    assert login_resp.status_code == 200
+    headers = {"Authorization": f"Bearer {login_resp.json['access_token']}"}
+    response = client.get("/auth/me", headers=headers)
+    print("Me response:", response.get_json())
+    assert response.status_code == 200
+    assert response.json["email"] == email
+    assert response.json["username"] == username
+    assert response.json["role"] == "tenant"
+
+    # --- Strict mode answers the same from the DB ---
+    app.config["AUTH_STRICT_IDENTITY"] = True
+    try:
+        response_strict = client.get("/auth/me", headers=headers)
+    finally:
+        app.config["AUTH_STRICT_IDENTITY"] = False
+    assert response_strict.status_code == 200
+    assert response_strict.json == response.json
+
+    # --- Whoami only carries id and role ---
+    response_whoami = client.get("/auth/whoami", headers=headers)
+    assert response_whoami.status_code == 200
+    assert response_whoami.json == {
+        "id": response.json["id"],
+        "role": "tenant",
+    }
+
+    # --- Failure: no access token ---
+    response_no_token = client.get("/auth/me")
+    assert response_no_token.status_code == 401
+
+
+def test_revoked_refresh_token_rejected(client):
+    # Arrange: login, keep a copy of the refresh cookie, then logout
+    _, email, username, password = register_user(client, password="pw123")
+    login_resp = login_user(client, email, "pw123")
+    assert login_resp.status_code == 200
+    refresh_cookie = client.get_cookie("refresh_token_cookie").value
+    assert client.post("/auth/logout").status_code == 200
+
+    # --- Failure: replaying the revoked refresh token ---
+    client.set_cookie("refresh_token_cookie", refresh_cookie)
+    response_refresh = client.post("/auth/refresh")
+    print("Revoked refresh:", response_refresh.status_code, response_refresh.json)
+    assert response_refresh.status_code == 401
+    response_session = client.get("/auth/session")
+    assert response_session.status_code == 401
+
+
+# another gunicorn worker: its own process, its own in-memory denylist
+LOGOUT_IN_OTHER_PROCESS = """
+import sys
+from main import app
+app.config["JWT_COOKIE_CSRF_PROTECT"] = False
+client = app.test_client()
+client.set_cookie("refresh_token_cookie", sys.argv[1])
+print(client.post("/auth/logout").status_code)
+"""
+
+
+def test_logout_in_another_process_revokes_here(client):
+    # Arrange: login in this process
+    _, email, username, password = register_user(client, password="pw123")
+    assert login_user(client, email, "pw123").status_code == 200
+    refresh_cookie = client.get_cookie("refresh_token_cookie").value
+    assert client.post("/auth/refresh").status_code == 200
+
+    # Act: the logout is served by a different process
+    server_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", LOGOUT_IN_OTHER_PROCESS, refresh_cookie],
+        cwd=server_dir,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.stdout.strip().endswith("200"), result.stderr
+
+    # --- Failure: this process never saw the logout, the DB check catches it ---
+    response_refresh = client.post("/auth/refresh")
+    assert response_refresh.status_code == 401
+    assert client.get("/auth/session").status_code == 401
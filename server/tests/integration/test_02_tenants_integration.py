@@ -0,0 +1,76 @@
+import pytest
+from db.models import AuthUser, Tenant
+from main import app
+from db.database import db
+from tests.integration.test_01_auth_integration import login_user, register_user
+
+
+# --- PyTest Fixtures ---
+@pytest.fixture
+def client():
+    app.config["JWT_COOKIE_CSRF_PROTECT"] = False
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def reset_db():
+    yield
+    try:
+        db.rollback()
+    except Exception:
+        pass
+    try:
+        db.close()
+    except Exception:
+        pass
+
+
+# --- Test Helpers ---
+def auth_headers(client, role):
+    _, email, _, password = register_user(client, role=role, password="pw123")
+    token = login_user(client, email, password).json["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_tenants(client, count):
+    ids = []
+    for _ in range(count):
+        _, email, _, _ = register_user(client)
+        user = db.query(AuthUser).filter_by(email=email).first()
+        db.add(Tenant(user_id=user.id, full_name=f"Directory {user.id:06d}"))
+        # commit now, the next request's teardown drops this thread's session
+        db.commit()
+        ids.append(user.id)
+    return ids
+
+
+# --- Test Endpoints ---
+def test_tenant_directory_endpoint(client):
+    # Arrange
+    created = create_tenants(client, 3)
+    headers = auth_headers(client, "admin")
+
+    # --- Success: walk every page with the cursor ---
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "q": "Directory"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/tenants", query_string=params, headers=headers)
+        assert response.status_code == 200
+        print("Directory page:", response.json)
+        seen += [card["id"] for card in response.json["tenants"]]
+        cursor = response.json["next_cursor"]
+        if not response.json["has_more"]:
+            break
+    assert set(created) <= set(seen)
+    assert len(seen) == len(set(seen))
+
+    # --- Failure: bad cursor ---
+    response_bad = client.get("/tenants?cursor=nope", headers=headers)
+    assert response_bad.status_code == 400
+
+    # --- Failure: tenants can't browse the directory ---
+    response_tenant = client.get("/tenants", headers=auth_headers(client, "tenant"))
+    assert response_tenant.status_code == 403
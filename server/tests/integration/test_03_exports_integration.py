@@ -0,0 +1,86 @@
+import csv
+import gzip
+import io
+import pytest
+import resource.exports as exports
+from main import app
+from resource.events import StreamSlots
+from db.database import db
+from tests.integration.test_02_tenants_integration import auth_headers, create_tenants
+
+
+# --- PyTest Fixtures ---
+@pytest.fixture
+def client():
+    app.config["JWT_COOKIE_CSRF_PROTECT"] = False
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def reset_db():
+    yield
+    try:
+        db.rollback()
+    except Exception:
+        pass
+    try:
+        db.close()
+    except Exception:
+        pass
+
+
+# --- Test Endpoints ---
+def test_tenants_export_endpoint(client):
+    # Arrange
+    created = create_tenants(client, 2)
+    headers = auth_headers(client, "admin")
+
+    # --- Success: plain CSV, one row per tenant ---
+    response = client.get("/exports/tenants.csv?q=Directory", headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0][0] == "id"
+    assert {int(row[0]) for row in rows[1:]} >= set(created)
+
+    # --- Success: gzip on the fly ---
+    response_gz = client.get("/exports/tenants.csv?q=Directory&gzip=1", headers=headers)
+    assert response_gz.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response_gz.data) == response.data
+
+    # --- Success: empty payments export still has a header ---
+    response_payments = client.get(
+        "/exports/payments.csv?from=1999-01-01&to=1999-01-02", headers=headers
+    )
+    assert response_payments.status_code == 200
+    assert response_payments.get_data(as_text=True).startswith("id,lease_id")
+
+    # --- Failure: bad date range ---
+    response_bad = client.get("/exports/payments.csv?from=nope", headers=headers)
+    assert response_bad.status_code == 400
+
+
+def test_export_holds_a_stream_slot_until_done(client, monkeypatch):
+    # Arrange: room for one long-lived response
+    headers = auth_headers(client, "admin")
+    slots = StreamSlots(size=1)
+    monkeypatch.setattr(exports, "stream_slots", slots)
+
+    # --- Success: the download holds the slot, closing it gives it back ---
+    response = client.get("/exports/leases.csv", headers=headers, buffered=False)
+    assert response.status_code == 200
+    assert slots.in_use() == 1
+
+    # --- Failure: no thread left for a second export ---
+    response_busy = client.get("/exports/leases.csv", headers=headers)
+    assert response_busy.status_code == 503
+    assert response_busy.headers["Retry-After"] == "5"
+    response.close()
+    assert slots.in_use() == 0
+
+    # --- Failure: tenants can't export ---
+    response_tenant = client.get(
+        "/exports/leases.csv", headers=auth_headers(client, "tenant")
+    )
+    assert response_tenant.status_code == 403
@@ -0,0 +1,60 @@
+import pytest
+from main import app
+from db.database import db
+from tests.integration.test_02_tenants_integration import auth_headers
+
+
+# --- PyTest Fixtures ---
+@pytest.fixture
+def client():
+    app.config["JWT_COOKIE_CSRF_PROTECT"] = False
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def reset_db():
+    yield
+    try:
+        db.rollback()
+    except Exception:
+        pass
+    try:
+        db.close()
+    except Exception:
+        pass
+
+
+# --- Test Endpoints ---
+def test_analytics_endpoints(client):
+    # Arrange
+    headers = auth_headers(client, "staff")
+
+    # --- Success: columnar revenue series with derived columns ---
+    response = client.get(
+        "/analytics/revenue?granularity=month&from=2020-01-01&to=2020-06-30"
+        "&derive=rolling,delta&window=2",
+        headers=headers,
+    )
+    assert response.status_code == 200
+    body = response.json
+    assert body["granularity"] == "month"
+    assert len(body["period"]) == 6
+    for column in ("due", "paid", "count", "paid_rolling", "paid_delta"):
+        assert len(body[column]) == 6
+
+    # --- Success: by type and overdue ---
+    assert client.get("/analytics/revenue/by-type", headers=headers).status_code == 200
+    overdue = client.get("/analytics/overdue", headers=headers)
+    assert overdue.status_code == 200
+    assert overdue.json["bucket"] == ["0-30", "31-60", "61-90", "90+"]
+
+    # --- Failure: bad granularity ---
+    response_bad = client.get("/analytics/revenue?granularity=day", headers=headers)
+    assert response_bad.status_code == 400
+
+    # --- Failure: tenants can't see finance ---
+    response_tenant = client.get(
+        "/analytics/overdue", headers=auth_headers(client, "tenant")
+    )
+    assert response_tenant.status_code == 403
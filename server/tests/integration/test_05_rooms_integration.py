@@ -0,0 +1,85 @@
+import pytest
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from db.models import Lease, Room
+from main import app
+from db.database import db
+from tests.integration.test_02_tenants_integration import auth_headers
+
+
+# --- PyTest Fixtures ---
+@pytest.fixture
+def client():
+    app.config["JWT_COOKIE_CSRF_PROTECT"] = False
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def reset_db():
+    yield
+    try:
+        db.rollback()
+    except Exception:
+        pass
+    try:
+        db.close()
+    except Exception:
+        pass
+
+
+# --- Test Endpoints ---
+def test_room_availability_endpoint(client):
+    # Arrange: a cheap commercial room, leased for March
+    headers = auth_headers(client, "staff")
+    room = Room(
+        room_number=uuid.uuid4().hex[:10], floor=99, type="commercial", base_rent=1
+    )
+    db.add(room)
+    db.commit()
+    room_id = room.id
+    db.add(
+        Lease(
+            tenant_id=1,
+            room_id=room_id,
+            start_date=datetime(2030, 3, 1),
+            end_date=datetime(2030, 3, 31),
+            rent_amount=Decimal("1.00"),
+        )
+    )
+    db.commit()
+    params = {"type": "commercial", "floor": 99, "max_rent": "1"}
+
+    # --- Success: free in April, the committed lease is already indexed ---
+    response = client.get(
+        "/rooms/availability",
+        query_string=params | {"start": "2030-04-01", "end": "2030-04-30"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert room_id in [r["id"] for r in response.json["rooms"]]
+
+    # --- Success: taken in March ---
+    response_march = client.get(
+        "/rooms/availability",
+        query_string=params | {"start": "2030-03-15", "end": "2030-04-15"},
+        headers=headers,
+    )
+    assert room_id not in [r["id"] for r in response_march.json["rooms"]]
+
+    # --- Failure: bad dates ---
+    response_bad = client.get(
+        "/rooms/availability?start=2030-04-02&end=2030-04-01", headers=headers
+    )
+    assert response_bad.status_code == 400
+
+    # --- Failure: a max_rent that can't be compared ---
+    april = {"start": "2030-04-01", "end": "2030-04-30"}
+    for max_rent in ("nan", "Infinity"):
+        response_nan = client.get(
+            "/rooms/availability",
+            query_string=april | {"max_rent": max_rent},
+            headers=headers,
+        )
+        assert response_nan.status_code == 400
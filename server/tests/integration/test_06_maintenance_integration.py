@@ -0,0 +1,99 @@
+import pytest
+import uuid
+from db.models import MaintenanceRequest, Room
+from main import app
+from db.database import db
+from tests.integration.test_02_tenants_integration import auth_headers, create_tenants
+
+
+# --- PyTest Fixtures ---
+@pytest.fixture
+def client():
+    app.config["JWT_COOKIE_CSRF_PROTECT"] = False
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def reset_db():
+    yield
+    try:
+        db.rollback()
+    except Exception:
+        pass
+    try:
+        db.close()
+    except Exception:
+        pass
+
+
+# --- Test Endpoints ---
+def test_maintenance_triage_and_emergency_stream(client):
+    # Arrange: close anything earlier tests left open, so triage starts empty
+    db.query(MaintenanceRequest).update({"status": "closed"})
+    db.commit()
+    (tenant_id,) = create_tenants(client, 1)
+    room = Room(room_number=uuid.uuid4().hex[:10], floor=1, type="studio", base_rent=1)
+    db.add(room)
+    db.commit()
+    room_id = room.id
+    headers = auth_headers(client, "staff")
+    stream = client.get(
+        "/maintenance/emergencies/stream", headers=headers, buffered=False
+    )
+    frames = iter(stream.response)
+
+    # --- Success: file requests, the emergency is pushed to the stream ---
+    filed = {}
+    for priority in ("low", "emergency", "high"):
+        response = client.post(
+            "/maintenance",
+            json={
+                "tenant_id": tenant_id,
+                "room_id": room_id,
+                "description": f"{priority} issue",
+                "priority": priority,
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201
+        filed[priority] = response.json["id"]
+    assert stream.mimetype == "text/event-stream"
+    assert next(frames) == b": connected\n\n"
+    frame = next(frames).decode()
+    assert "event: maintenance.emergency" in frame
+    assert f'"id": {filed["emergency"]}' in frame
+    stream.close()
+
+    # --- Success: triage walks most urgent first, one row per page ---
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 1} | ({"cursor": cursor} if cursor else {})
+        response = client.get(
+            "/maintenance/triage", query_string=params, headers=headers
+        )
+        assert response.status_code == 200
+        seen += [r["id"] for r in response.json["requests"]]
+        cursor = response.json["next_cursor"]
+        if not response.json["has_more"]:
+            break
+    assert seen == [filed["emergency"], filed["high"], filed["low"]]
+
+    # --- Success: closing stamps the resolution date ---
+    response = client.patch(
+        f"/maintenance/{filed['high']}", json={"status": "closed"}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json["resolved_date"] is not None
+
+    # --- Failure: bad input, unknown request, tenants can't triage ---
+    response_bad = client.get("/maintenance/triage?status=closed", headers=headers)
+    assert response_bad.status_code == 400
+    response_missing = client.patch(
+        "/maintenance/999999", json={"status": "closed"}, headers=headers
+    )
+    assert response_missing.status_code == 404
+    response_tenant = client.get(
+        "/maintenance/triage", headers=auth_headers(client, "tenant")
+    )
+    assert response_tenant.status_code == 403
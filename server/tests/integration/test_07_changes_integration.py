@@ -0,0 +1,191 @@
+import http.client
+import os
+import pytest
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from db.models import Room
+from main import app
+from db.database import db
+from tests.integration.test_02_tenants_integration import auth_headers, create_tenants
+
+
+# --- PyTest Fixtures ---
+@pytest.fixture
+def client():
+    app.config["JWT_COOKIE_CSRF_PROTECT"] = False
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def reset_db():
+    yield
+    try:
+        db.rollback()
+    except Exception:
+        pass
+    try:
+        db.close()
+    except Exception:
+        pass
+
+
+@pytest.fixture
+def gunicorn_port():
+    """A real gthread worker: 4 threads, 2 of them kept away from streams."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = os.environ | {
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_WORKERS": "1",
+        "GUNICORN_THREADS": "4",
+        "STREAM_RESERVED_THREADS": "2",
+        # asks for more than the threads allow, the cap still applies
+        "EVENT_MAX_SUBSCRIBERS": "100",
+        # closed streams notice quickly, so the worker can stop
+        "SSE_HEARTBEAT_SECONDS": "1",
+        "GUNICORN_GRACEFUL_TIMEOUT": "5",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while get(port, "/healthz") != 200:
+            assert server.poll() is None and time.monotonic() < deadline
+            time.sleep(0.2)
+        yield port
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def get(port, path, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request("GET", path, headers=headers or {})
+        return conn.getresponse().status
+    except OSError:
+        return None
+    finally:
+        conn.close()
+
+
+# --- Test Endpoints ---
+def test_change_stream_endpoint(client):
+    # Arrange
+    (tenant_id,) = create_tenants(client, 1)
+    room = Room(room_number=uuid.uuid4().hex[:10], floor=1, type="studio", base_rent=1)
+    db.add(room)
+    db.commit()
+    room_id = room.id
+    headers = auth_headers(client, "staff")
+    stream = client.get(
+        "/events/stream?topics=maintenance.filed", headers=headers, buffered=False
+    )
+    frames = iter(stream.response)
+
+    # --- Success: a committed write reaches the open stream ---
+    response = client.post(
+        "/maintenance",
+        json={"tenant_id": tenant_id, "room_id": room_id, "description": "door"},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    assert next(frames) == b": connected\n\n"
+    frame = next(frames).decode()
+    assert frame.startswith("id: ")
+    assert "event: maintenance.filed" in frame
+    assert f'"id": {response.json["id"]}' in frame
+    stream.close()
+
+    # --- Success: reconnecting with Last-Event-ID replays what was missed ---
+    last_id = frame.split("\n")[0].removeprefix("id: ")
+    client.post(
+        "/maintenance",
+        json={"tenant_id": tenant_id, "room_id": room_id, "description": "window"},
+        headers=headers,
+    )
+    resumed = client.get(
+        "/events/stream?topics=maintenance.filed",
+        headers=headers | {"Last-Event-ID": last_id},
+        buffered=False,
+    )
+    frames = iter(resumed.response)
+    next(frames)
+    assert "event: maintenance.filed" in next(frames).decode()
+    resumed.close()
+
+    # --- Failure: unknown topic, tenants can't subscribe ---
+    response_bad = client.get("/events/stream?topics=rooms.painted", headers=headers)
+    assert response_bad.status_code == 400
+    response_tenant = client.get(
+        "/events/stream", headers=auth_headers(client, "tenant")
+    )
+    assert response_tenant.status_code == 403
+
+
+def test_streams_take_a_stream_token_in_the_url(client):
+    # Arrange: what a dashboard does before new EventSource(url)
+    headers = auth_headers(client, "staff")
+    minted = client.post("/auth/stream-token", headers=headers)
+    token = minted.json["stream_token"]
+
+    # --- Success: both streams open with the token in the query string ---
+    assert minted.status_code == 200
+    for path in ("/events/stream", "/maintenance/emergencies/stream"):
+        stream = client.get(path, query_string={"jwt": token}, buffered=False)
+        assert stream.status_code == 200
+        assert next(iter(stream.response)) == b": connected\n\n"
+        stream.close()
+
+    # --- Failure: a regular access token doesn't belong in a URL ---
+    access_token = headers["Authorization"].removeprefix("Bearer ")
+    response_access = client.get("/events/stream", query_string={"jwt": access_token})
+    assert response_access.status_code == 401
+
+    # --- Failure: a stream token opens streams only, and can't renew itself ---
+    stream_headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/maintenance/triage", headers=stream_headers).status_code == 401
+    assert client.post("/auth/stream-token", headers=stream_headers).status_code == 401
+
+    # --- Failure: tenants still can't subscribe ---
+    tenant = client.post("/auth/stream-token", headers=auth_headers(client, "tenant"))
+    response_tenant = client.get(
+        "/events/stream", query_string={"jwt": tenant.json["stream_token"]}
+    )
+    assert response_tenant.status_code == 403
+
+
+def test_streams_leave_threads_for_other_requests(client, gunicorn_port):
+    # Arrange
+    headers = auth_headers(client, "staff")
+    streams, statuses = [], []
+
+    # Act: ask for more streams than the worker has threads
+    for _ in range(6):
+        conn = http.client.HTTPConnection("127.0.0.1", gunicorn_port, timeout=10)
+        conn.request("GET", "/events/stream", headers=headers)
+        response = conn.getresponse()
+        statuses.append((response.status, response.getheader("Retry-After")))
+        if response.status == 200:
+            streams.append(conn)
+        else:
+            response.read()
+            conn.close()
+
+    # --- Success: two streams open, the rest turned away with a retry hint ---
+    assert statuses == [(200, None)] * 2 + [(503, "5")] * 4
+
+    # --- Success: ordinary requests are still served while they stay open ---
+    assert get(gunicorn_port, "/healthz") == 200
+    for conn in streams:
+        conn.close()
@@ -0,0 +1,66 @@
+import pytest
+import resource.instrumentation as instrumentation
+from main import app
+from db.database import db
+from tests.integration.test_01_auth_integration import login_user, register_user
+
+SCRAPE = {"Authorization": "Bearer scrape-me"}
+
+
+# --- PyTest Fixtures ---
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(instrumentation, "METRICS_TOKEN", "scrape-me")
+    app.config["JWT_COOKIE_CSRF_PROTECT"] = False
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def reset_db():
+    yield
+    try:
+        db.rollback()
+    except Exception:
+        pass
+    try:
+        db.close()
+    except Exception:
+        pass
+
+
+# --- Test Endpoints ---
+def test_login_timing_and_metrics_endpoint(client):
+    # Arrange
+    _, email, _, password = register_user(client, password="pw123")
+
+    # --- Success: login says where its time went ---
+    response = login_user(client, email, password)
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert "db;dur=" in timing
+    assert "hash;dur=" in timing
+
+    # --- Success: the same request shows up in the Prometheus histograms ---
+    metrics = client.get("/metrics", headers=SCRAPE)
+    assert metrics.status_code == 200
+    body = metrics.get_data(as_text=True)
+    assert 'route="/auth/login",status="200"' in body
+    assert "# TYPE http_request_queries histogram" in body
+
+
+def test_auth_me_stays_within_query_budget(client):
+    # Arrange
+    _, email, _, password = register_user(client, password="pw123")
+    token = login_user(client, email, password).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # --- Success: /auth/me answers from the token claims, budget is 1 ---
+    response = client.get("/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert 'desc="0 queries"' in response.headers["Server-Timing"]
+
+    # --- Success: slow statements (if any) are listed with their plans ---
+    slow = client.get("/metrics/slow-queries", headers=SCRAPE)
+    assert slow.status_code == 200
+    assert isinstance(slow.get_json()["queries"], list)
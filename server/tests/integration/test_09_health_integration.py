@@ -0,0 +1,33 @@
+import pytest
+from main import app
+from resource.health import db_probe
+
+
+# --- PyTest Fixtures ---
+@pytest.fixture
+def client():
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def reset_probe():
+    db_probe.reset()
+    yield
+
+
+# --- Test Endpoints ---
+def test_health_and_readiness(client):
+    # --- Success: liveness answers without touching the DB ---
+    response = client.get("/healthz")
+    assert response.status_code == 200
+    assert 'desc="0 queries"' in response.headers["Server-Timing"]
+
+    # --- Success: readiness pings the DB once, then serves the cached result ---
+    first = client.get("/readyz")
+    assert first.status_code == 200
+    assert first.get_json()["checks"]["db"]["ok"] is True
+    assert 'desc="1 queries"' in first.headers["Server-Timing"]
+    second = client.get("/readyz")
+    assert second.status_code == 200
+    assert 'desc="0 queries"' in second.headers["Server-Timing"]
@@ -1,5 +1,7 @@
 import pytest
+from datetime import datetime
 from unittest.mock import Mock, patch
+from flask import Flask
 from db.models import AuthUser, RefreshToken, Session
 from resource.auth import (
     hash_password,
@@ -7,13 +9,18 @@ from resource.auth import (
     revoke_jti,
     find_by_jti,
     create_session,
+    record_login,
     revoke_session,
     unpack_register_payload,
     unpack_login_payload,
     validate_register,
     validate_login,
     generate_tokens_and_claims,
+    identity_from_claims,
+    identity_from_db,
 )
+from resource.roles import role_registry
+from resource.tokens import MintedTokens
 
 # === Mock Layer ===
 mock_user_payload = {
@@ -84,7 +91,8 @@ def test_verify_password():
 
 
 @patch("resource.auth.db", mock_db)
-def test_revoke_jti():
+@patch("resource.auth.token_denylist")
+def test_revoke_jti(mock_denylist):
     # Arrange
     jti = "mockjti"
     token = mock_refresh_token
@@ -94,6 +102,7 @@ def test_revoke_jti():
     result = revoke_jti(jti)
     assert result is True
     assert token.revoked == 1
+    mock_denylist.add.assert_called_once_with(jti, token.expires_at)
     # Negative: token not found
     mock_query.filter_by.return_value.first.return_value = None
     result = revoke_jti(jti)
@@ -136,6 +145,41 @@ def test_create_session():
         create_session(None, session_id, user_agent, ip_address, expires_at)
 
 
+@patch("resource.auth.db", mock_db)
+def test_record_login():
+    # Arrange
+    args = (1, "mockjti", "Mozilla/5.0", "127.0.0.1", "2026-02-24 12:00:00")
+    mock_db.add.reset_mock()
+    mock_db.commit.reset_mock()
+    mock_db.rollback.reset_mock()
+    # Act: refresh token and session are added, then committed once
+    record_login(*args)
+    # Assert
+    added = [call.args[0] for call in mock_db.add.call_args_list]
+    assert [type(row) for row in added] == [RefreshToken, Session]
+    mock_db.commit.assert_called_once()
+    # Write-behind: only the token is committed, the session row is queued
+    mock_db.add.reset_mock()
+    mock_db.commit.reset_mock()
+    mock_writer = Mock(write_behind=True)
+    record_login(*args, writer=mock_writer)
+    added = [call.args[0] for call in mock_db.add.call_args_list]
+    assert [type(row) for row in added] == [RefreshToken]
+    mock_db.commit.assert_called_once()
+    assert mock_writer.enqueue.call_args.args[0]["session_id"] == "mockjti"
+    # Negative: a failed commit rolls back both rows
+    mock_db.commit.side_effect = Exception("deadlock")
+    with pytest.raises(Exception, match="deadlock"):
+        record_login(*args)
+    mock_db.rollback.assert_called_once()
+    mock_db.commit.side_effect = None
+    # Negative: invalid session data writes nothing
+    mock_db.add.reset_mock()
+    with pytest.raises(ValueError):
+        record_login(1, "mockjti", "", "127.0.0.1", "2026-02-24 12:00:00")
+    mock_db.add.assert_not_called()
+
+
 @patch("resource.auth.db", mock_db)
 def test_revoke_session():
     # Arrange
@@ -248,53 +292,100 @@ def test_validate_login():
 
 
 def test_generate_tokens_and_claims():
+    app = Flask(__name__)
     # Arrange & happy path: valid user, valid role
-    with patch("resource.auth.db", mock_db):
-        with patch("resource.auth.create_access_token", return_value="access"), patch(
-            "resource.auth.create_refresh_token", return_value="refresh"
-        ), patch(
-            "resource.auth.decode_token", return_value={"jti": "jti", "exp": 9999999999}
-        ):
-            mock_db.query.return_value.filter_by.return_value.first.return_value = (
-                mock_role_admin
+    with app.app_context(), patch("resource.auth.db", mock_db):
+        with patch("resource.tokens.create_access_token", return_value="access"), patch(
+            "resource.tokens.create_refresh_token", return_value="refresh"
+        ) as mock_create_refresh:
+            role_registry.set_roles(
+                [
+                    (mock_role_admin.id, mock_role_admin.name),
+                    (mock_role_tenant.id, mock_role_tenant.name),
+                ]
             )
             result = generate_tokens_and_claims(mock_user)
-            access_token, refresh_token, jti, expires_at, expires_at_str = result
+            access_token, refresh_token, jti, expires_at = result
             assert access_token == "access"
             assert refresh_token == "refresh"
-            assert jti == "jti"
-            assert isinstance(expires_at_str, str)
-            assert isinstance(result, tuple) and len(result) == 5
+            assert isinstance(result, MintedTokens)
+            assert isinstance(expires_at, datetime)
+            # jti and exp are decided up front and handed to the encoder
+            claims = mock_create_refresh.call_args.kwargs["additional_claims"]
+            assert claims["jti"] == jti
+            assert claims["exp"] == expires_at
+            assert claims["role"] == "admin"
+            assert claims["username"] == mock_user.username
     # Happy path: valid user, role not found
-    with patch("resource.auth.db", mock_db):
-        with patch("resource.auth.create_access_token", return_value="access"), patch(
-            "resource.auth.create_refresh_token", return_value="refresh"
-        ), patch(
-            "resource.auth.decode_token", return_value={"jti": "jti", "exp": 9999999999}
-        ):
-            mock_db.query.return_value.filter_by.return_value.first.return_value = None
+    with app.app_context(), patch("resource.auth.db", mock_db):
+        with patch("resource.tokens.create_access_token", return_value="access"), patch(
+            "resource.tokens.create_refresh_token", return_value="refresh"
+        ) as mock_create_refresh:
+            role_registry.set_roles([])
             result = generate_tokens_and_claims(mock_user)
-            access_token, refresh_token, jti, expires_at, expires_at_str = result
+            access_token, refresh_token, jti, expires_at = result
             assert access_token == "access"
             assert refresh_token == "refresh"
-            assert jti == "jti"
-            assert isinstance(expires_at_str, str)
-            assert isinstance(result, tuple) and len(result) == 5
+            assert jti
+            assert isinstance(result, tuple) and len(result) == 4
+            claims = mock_create_refresh.call_args.kwargs["additional_claims"]
+            assert claims["role"] == "tenant"
     # Negative: invalid user object
     with patch("resource.auth.db", mock_db):
         with pytest.raises(ValueError, match="Invalid user object"):
             generate_tokens_and_claims(None)
     # Negative: missing values in token generation
-    with patch("resource.auth.db", mock_db):
-        with patch("resource.auth.create_access_token", return_value=None), patch(
-            "resource.auth.create_refresh_token", return_value=None
-        ), patch("resource.auth.decode_token", return_value={"jti": None, "exp": None}):
+    with app.app_context(), patch("resource.auth.db", mock_db):
+        with patch("resource.tokens.create_access_token", return_value=None), patch(
+            "resource.tokens.create_refresh_token", return_value=None
+        ):
             with pytest.raises(
                 ValueError, match="Token generation failed: missing values"
             ):
                 generate_tokens_and_claims(mock_user)
     # Negative: exception in token generation
-    with patch("resource.auth.db", mock_db):
-        with patch("resource.auth.create_access_token", side_effect=Exception("fail")):
+    with app.app_context(), patch("resource.auth.db", mock_db):
+        with patch(
+            "resource.tokens.create_access_token", side_effect=Exception("fail")
+        ):
             with pytest.raises(ValueError, match="Token generation failed: fail"):
                 generate_tokens_and_claims(mock_user)
+
+
+def test_identity_from_claims():
+    # Arrange
+    app = Flask(__name__)
+    claims = {"email": "a@b.com", "username": "user", "role": "tenant"}
+    with app.app_context():
+        # Act & Assert: happy path, everything comes from the token
+        profile = identity_from_claims("7", claims)
+        assert profile == {"id": 7, **claims}
+        # Subset of fields is enough for callers that only need the role
+        assert identity_from_claims("7", {"role": "admin"}, fields=("role",)) == {
+            "id": 7,
+            "role": "admin",
+        }
+        # Negative: missing claim means the caller has to hit the DB
+        assert identity_from_claims("7", {"email": "a@b.com", "role": "x"}) is None
+        # Negative: strict mode never trusts the claims
+        app.config["AUTH_STRICT_IDENTITY"] = True
+        assert identity_from_claims("7", claims) is None
+
+
+@patch("resource.auth.db", mock_db)
+def test_identity_from_db():
+    # Arrange
+    role_registry.set_roles([(mock_role_admin.id, mock_role_admin.name)])
+    mock_query.filter_by.return_value.first.return_value = mock_user
+    # Act
+    profile = identity_from_db("999")
+    # Assert
+    assert profile == {
+        "id": mock_user.id,
+        "email": mock_user.email,
+        "username": mock_user.username,
+        "role": "admin",
+    }
+    # Negative: user no longer exists
+    mock_query.filter_by.return_value.first.return_value = None
+    assert identity_from_db("999") is None
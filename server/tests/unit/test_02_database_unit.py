@@ -0,0 +1,55 @@
+import pytest
+from unittest.mock import Mock, patch
+from flask import Flask
+from sqlalchemy import exc
+from db.database import PoolMetrics, TimedQueuePool, init_app, pool_metrics
+
+
+# === Test Layer ===
+def test_pool_metrics_observe_and_snapshot():
+    # Arrange
+    metrics = PoolMetrics()
+    # Act
+    metrics.observe(0.002)
+    metrics.observe(0.010)
+    metrics.observe(0.5, timed_out=True)
+    stats = metrics.snapshot()
+    # Assert
+    assert stats["checkouts"] == 3
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] == 0.5
+    assert stats["wait_seconds_total"] == pytest.approx(0.512)
+    # Reset clears everything
+    metrics.reset()
+    assert metrics.snapshot()["checkouts"] == 0
+
+
+def test_timed_queue_pool_records_checkout_wait():
+    # Arrange: one connection, no overflow, so the second checkout must time out
+    pool = TimedQueuePool(creator=Mock, pool_size=1, max_overflow=0, timeout=0.05)
+    pool_metrics.reset()
+    # Act
+    conn = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    stats = pool_metrics.snapshot(pool)
+    # Assert
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+    assert stats["checked_out"] == 1
+    # Returning the connection frees the slot again
+    conn.close()
+    pool.connect().close()
+    assert pool_metrics.snapshot(pool)["checked_out"] == 0
+
+
+def test_init_app_removes_session_on_teardown():
+    # Arrange
+    app = Flask(__name__)
+    init_app(app)
+    # Act & Assert
+    with patch("db.database.db") as mock_db:
+        with app.app_context():
+            pass
+        mock_db.remove.assert_called_once()
@@ -0,0 +1,77 @@
+import threading
+import pytest
+from flask import Flask
+from resource.auth import hashing_busy_response
+from resource.hashing import HashingPool, HashingQueueFull, _checkpw, _hashpw
+
+# === Mock Layer ===
+release = threading.Event()
+started = threading.Event()
+
+
+def blocking_task():
+    started.set()
+    release.wait(timeout=5)
+    return "done"
+
+
+# === Test Layer ===
+def test_hashpw_honours_cost_factor():
+    # Arrange & Act
+    hashed = _hashpw("pw", 4)
+    # Assert
+    assert hashed.startswith("$2b$04$")
+    assert _checkpw(hashed, "pw")
+    assert not _checkpw(hashed, "wrong")
+
+
+def test_inline_pool_runs_on_caller_thread():
+    # Arrange
+    pool = HashingPool(workers=0, queue_depth=0)
+    # Act & Assert
+    assert pool.run(threading.get_ident) == threading.get_ident()
+
+
+def test_pool_rejects_when_queue_is_full():
+    # Arrange: one worker, no waiting room
+    pool = HashingPool(workers=1, queue_depth=0, kind="thread")
+    release.clear()
+    started.clear()
+    holder = threading.Thread(target=pool.run, args=(blocking_task,))
+    holder.start()
+    started.wait(timeout=5)
+    try:
+        # Act & Assert: second call is shed immediately
+        assert pool.depth() == 1
+        with pytest.raises(HashingQueueFull) as excinfo:
+            pool.run(blocking_task)
+        assert excinfo.value.retry_after >= 0
+    finally:
+        release.set()
+        holder.join()
+    # Slot is released once the first call finishes
+    assert pool.depth() == 0
+    assert pool.run(lambda: "ok") == "ok"
+    pool.shutdown()
+
+
+def test_hashing_busy_response():
+    # Arrange
+    app = Flask(__name__)
+    with app.app_context():
+        # Act
+        resp = hashing_busy_response(HashingQueueFull(retry_after=3))
+        # Assert
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "3"
+        assert "error" in resp.get_json()
+
+
+def test_warm_starts_every_worker_before_first_use():
+    # Arrange
+    pool = HashingPool(workers=2, queue_depth=0, kind="thread")
+    # Act
+    pool.warm()
+    # Assert: both threads exist, no caller waits for them to start
+    assert len(pool._executor._threads) == 2
+    pool.shutdown()
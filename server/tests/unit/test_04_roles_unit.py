@@ -0,0 +1,138 @@
+import pytest
+from unittest.mock import Mock
+from flask import Flask, jsonify
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import resource.instrumentation as instrumentation
+from db.models import Role
+from resource.instrumentation import instrumentation_blueprint, query_budget
+from resource.roles import RoleRegistry
+
+# === Mock Layer ===
+mock_rows = [(1, "admin"), (2, "tenant"), (3, "staff")]
+
+
+def make_session_factory(rows):
+    session = Mock()
+    session.query.return_value.all.return_value = rows
+    return Mock(return_value=session), session
+
+
+# === Test Layer ===
+def test_role_registry_lookups():
+    # Arrange
+    factory, session = make_session_factory(mock_rows)
+    registry = RoleRegistry(ttl=300, session_factory=factory)
+    # Act & Assert: first lookup loads, later lookups are served from memory
+    assert registry.name_for(1) == "admin"
+    assert registry.id_for("tenant") == 2
+    assert registry.name_for(3) == "staff"
+    assert factory.call_count == 1
+    session.close.assert_called_once()
+    # Unknown keys fall back to the default
+    assert registry.name_for(42) is None
+    assert registry.name_for(42, "tenant") == "tenant"
+    assert registry.id_for("landlord", 1) == 1
+
+
+def test_role_registry_invalidate_and_ttl():
+    # Arrange
+    factory, session = make_session_factory(mock_rows)
+    registry = RoleRegistry(ttl=300, session_factory=factory)
+    registry.load()
+    # Act: invalidation forces a reload on next access
+    session.query.return_value.all.return_value = [(1, "admin"), (4, "owner")]
+    registry.invalidate()
+    # Assert
+    assert registry.is_stale()
+    assert registry.id_for("owner") == 4
+    assert registry.name_for(2) is None
+    # An already-expired TTL means every lookup refreshes
+    registry.ttl = -1
+    registry.name_for(1)
+    registry.name_for(1)
+    assert factory.call_count == 4
+
+
+def test_role_registry_serves_stale_when_refresh_fails():
+    # Arrange
+    factory, session = make_session_factory(mock_rows)
+    registry = RoleRegistry(ttl=300, session_factory=factory)
+    registry.load()
+    registry.invalidate()
+    session.query.side_effect = Exception("db down")
+    # Act & Assert: stale data beats an error
+    assert registry.name_for(1) == "admin"
+    # Negative: nothing cached yet, the error propagates
+    cold = RoleRegistry(ttl=300, session_factory=factory)
+    with pytest.raises(Exception, match="db down"):
+        cold.name_for(1)
+    # Warm-up swallows the error
+    cold.warm()
+
+
+def test_role_registry_backs_off_after_a_failed_refresh():
+    # Arrange
+    factory, session = make_session_factory(mock_rows)
+    registry = RoleRegistry(ttl=300, session_factory=factory, retry=5)
+    registry.load()
+    registry.invalidate()
+    session.query.side_effect = Exception("db down")
+    # Act: a burst of lookups during the outage
+    names = [registry.name_for(1) for _ in range(3)]
+    # Assert: one failed try, then stale roles until the retry delay is up
+    assert names == ["admin"] * 3
+    assert factory.call_count == 2
+    assert not registry.is_stale()
+    # the delay doubles while the DB stays down
+    registry._loaded_at -= 5
+    registry.name_for(1)
+    assert factory.call_count == 3
+    registry._loaded_at -= 5
+    assert not registry.is_stale()
+    registry._loaded_at -= 5
+    assert registry.is_stale()
+
+
+def test_role_registry_refreshes_on_one_thread():
+    # Arrange: the TTL ran out while another thread is already reloading
+    factory, _ = make_session_factory(mock_rows)
+    registry = RoleRegistry(ttl=300, session_factory=factory)
+    registry.load()
+    registry.invalidate()
+    # Act
+    with registry._refresh_lock:
+        name = registry.name_for(1)
+    # Assert: the current map is served, no second reload is started
+    assert name == "admin"
+    assert factory.call_count == 1
+
+
+def test_role_registry_refresh_is_outside_the_query_budget(monkeypatch):
+    # Arrange: a stale registry over a real database, and a route allowed no SQL
+    monkeypatch.setattr(instrumentation, "QUERY_BUDGET_MODE", "raise")
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Role.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as session:
+        session.add(Role(id=1, name="admin"))
+        session.commit()
+    registry = RoleRegistry(ttl=300, session_factory=session_factory)
+    app = Flask(__name__)
+    app.register_blueprint(instrumentation_blueprint)
+
+    @app.route("/whoami")
+    @query_budget(0)
+    def whoami():
+        return jsonify({"role": registry.name_for(1)})
+
+    # Act: this request happens to be the one that refreshes the cache
+    response = app.test_client().get("/whoami")
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json() == {"role": "admin"}
@@ -0,0 +1,40 @@
+import pytest
+from datetime import timedelta
+from flask import Flask
+from flask_jwt_extended import JWTManager, decode_token
+from resource.tokens import mint_tokens, refresh_expires_delta
+
+# === Mock Layer ===
+app = Flask(__name__)
+app.config["JWT_SECRET_KEY"] = "unit-test-secret-key-with-32-chars!"
+JWTManager(app)
+
+
+# === Test Layer ===
+def test_mint_tokens_matches_encoded_claims():
+    with app.app_context():
+        # Arrange & Act
+        tokens = mint_tokens("7", {"role": "tenant"})
+        decoded = decode_token(tokens.refresh_token)
+        # Assert: what we return is exactly what the token says, no re-decode needed
+        assert decoded["jti"] == tokens.jti
+        assert decoded["exp"] == int(tokens.expires_at.timestamp())
+        assert decoded["sub"] == "7"
+        assert decoded["role"] == "tenant"
+        assert decode_token(tokens.access_token)["role"] == "tenant"
+        # Every login gets its own jti
+        assert mint_tokens("7").jti != tokens.jti
+
+
+def test_refresh_expires_delta():
+    with app.app_context():
+        # Arrange & Act & Assert: timedelta and int seconds are both accepted
+        app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(hours=1)
+        assert refresh_expires_delta() == timedelta(hours=1)
+        app.config["JWT_REFRESH_TOKEN_EXPIRES"] = 60
+        assert refresh_expires_delta() == timedelta(seconds=60)
+        # Negative: non-expiring refresh tokens can't be stored
+        app.config["JWT_REFRESH_TOKEN_EXPIRES"] = False
+        with pytest.raises(ValueError):
+            refresh_expires_delta()
+        app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=30)
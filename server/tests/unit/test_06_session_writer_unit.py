@@ -0,0 +1,99 @@
+from datetime import datetime
+from unittest.mock import Mock
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from db.models import Base, RefreshToken, Session
+from resource.session_writer import SessionWriteBehind
+
+
+# === Mock Layer ===
+def make_row(i):
+    return {"user_id": 1, "session_id": f"jti-{i}", "revoked": 0}
+
+
+def make_session_factory():
+    session = Mock()
+    return Mock(return_value=session), session
+
+
+# === Test Layer ===
+def test_flush_group_commits_in_batches():
+    # Arrange: write-behind with a long interval so only explicit flushes run
+    factory, session = make_session_factory()
+    writer = SessionWriteBehind(
+        interval_ms=60_000, batch_size=2, session_factory=factory
+    )
+    for i in range(5):
+        writer.enqueue(make_row(i))
+    assert writer.pending() == 5
+    # Act
+    written = writer.flush()
+    # Assert: 5 rows in batches of 2, one commit per batch
+    assert written == 5
+    assert writer.pending() == 0
+    inserts = [call for call in session.execute.call_args_list if len(call.args) == 2]
+    assert session.commit.call_count == 3
+    assert [len(call.args[1]) for call in inserts] == [2, 2, 1]
+    # Nothing queued means nothing written
+    assert writer.flush() == 0
+    writer.stop()
+
+
+def test_flush_drops_failed_batch():
+    # Arrange
+    factory, session = make_session_factory()
+    session.commit.side_effect = Exception("db down")
+    writer = SessionWriteBehind(
+        interval_ms=60_000, batch_size=10, session_factory=factory
+    )
+    writer.enqueue(make_row(1))
+    # Act
+    written = writer.flush()
+    # Assert
+    assert written == 0
+    assert writer.dropped == 1
+    session.rollback.assert_called_once()
+    session.close.assert_called_once()
+    writer.stop()
+
+
+def test_background_thread_flushes_on_interval():
+    # Arrange
+    factory, session = make_session_factory()
+    writer = SessionWriteBehind(interval_ms=10, batch_size=10, session_factory=factory)
+    # Act
+    writer.enqueue(make_row(1))
+    writer.stop()
+    # Assert: stop() drains whatever the thread hadn't written yet
+    assert writer.flushed == 1
+    assert writer.pending() == 0
+
+
+def test_flush_revokes_sessions_logged_out_elsewhere():
+    # Arrange: another worker revoked the refresh token while the row was queued
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[RefreshToken.__table__, Session.__table__])
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        session.add_all(
+            [
+                RefreshToken(user_id=1, token="jti-1", expires_at=datetime.now()),
+                RefreshToken(
+                    user_id=1, token="jti-2", expires_at=datetime.now(), revoked=1
+                ),
+            ]
+        )
+        session.commit()
+    writer = SessionWriteBehind(
+        mode="write_behind", interval_ms=60_000, session_factory=factory
+    )
+    writer.enqueue(make_row(1))
+    writer.enqueue(make_row(2))
+    # Act
+    writer.flush()
+    # Assert: the logged-out session lands revoked, the other one stays active
+    with factory() as session:
+        rows = session.execute(select(Session.session_id, Session.revoked)).all()
+    assert sorted(rows) == [("jti-1", 0), ("jti-2", 1)]
+    assert writer.write_behind
+    writer.stop()
@@ -0,0 +1,100 @@
+import math
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+from resource.denylist import LocalChannel, TokenDenylist, to_timestamp
+
+# === Mock Layer ===
+now = [1_000_000.0]
+
+
+def clock():
+    return now[0]
+
+
+# === Test Layer ===
+def test_to_timestamp():
+    # Arrange
+    aware = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    naive = datetime(2026, 1, 1)
+    # Act & Assert: naive DB values are treated as UTC
+    assert to_timestamp(aware) == to_timestamp(naive) == aware.timestamp()
+    assert to_timestamp(12.5) == 12.5
+    assert to_timestamp(None) == math.inf
+
+
+def test_denylist_revokes_until_expiry():
+    # Arrange
+    denylist = TokenDenylist(clock=clock)
+    # Act
+    denylist.add("jti-1", now[0] + 60)
+    denylist.add("jti-forever")
+    # Assert
+    assert denylist.is_revoked("jti-1")
+    assert denylist.is_revoked("jti-forever")
+    assert not denylist.is_revoked("jti-unknown")
+    assert not denylist.is_revoked(None)
+    # Once the token would have expired the entry is evicted on lookup
+    now[0] += 120
+    assert not denylist.is_revoked("jti-1")
+    assert len(denylist) == 1
+
+
+def test_denylist_sweeps_expired_entries():
+    # Arrange: sweep on every 3rd add
+    denylist = TokenDenylist(clock=clock, sweep_every=3)
+    denylist.add("old-1", now[0] - 1)
+    denylist.add("old-2", now[0] - 1)
+    # Act
+    denylist.add("live", now[0] + 60)
+    # Assert
+    assert len(denylist) == 1
+    assert denylist.evict_expired() == 0
+
+
+def test_denylist_channel_propagates_revocations():
+    # Arrange: two "replicas" sharing the local stand-in channel
+    channel = LocalChannel()
+    replica_a = TokenDenylist(channel=channel, clock=clock)
+    replica_b = TokenDenylist(channel=channel, clock=clock)
+    # Act
+    replica_a.add("jti-1", now[0] + 60)
+    # Assert
+    assert replica_a.is_revoked("jti-1")
+    assert replica_b.is_revoked("jti-1")
+    assert len(replica_a) == len(replica_b) == 1
+
+
+def test_denylist_load_from_db():
+    # Arrange
+    expires = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=1)
+    session = Mock()
+    session.query.return_value.filter.return_value.all.side_effect = [
+        [("revoked-jti", expires)],
+        [("blacklisted-jti", None)],
+    ]
+    denylist = TokenDenylist()
+    # Act
+    loaded = denylist.load(session_factory=Mock(return_value=session))
+    # Assert
+    assert loaded == 2
+    assert denylist.is_revoked("revoked-jti")
+    assert denylist.is_revoked("blacklisted-jti")
+    session.close.assert_called_once()
+
+
+def test_denylist_asks_db_for_revocations_from_other_workers():
+    # Arrange: this process never saw the logout, the DB did
+    expires = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=1)
+    session = Mock()
+    lookup = session.query.return_value.filter_by.return_value.first
+    lookup.return_value = Mock(revoked=1, expires_at=expires)
+    denylist = TokenDenylist()
+    # Act / Assert: revoked in the DB, remembered locally from then on
+    assert denylist.is_revoked_in_db("jti-9", session=session)
+    assert denylist.is_revoked("jti-9")
+    # a live or unknown token is not cached
+    lookup.return_value = Mock(revoked=0, expires_at=expires)
+    assert not denylist.is_revoked_in_db("jti-10", session=session)
+    lookup.return_value = None
+    assert not denylist.is_revoked_in_db("jti-11", session=session)
+    assert len(denylist) == 1
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, func, select
+from db.models import Base, RefreshToken, Session
+from reaper import purge_expired, report, run_once
+
+# === Mock Layer ===
+cutoff = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def make_engine(expired=5, live=3):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        rows = [
+            {"user_id": 1, "token": f"old-{i}", "expires_at": cutoff - timedelta(1)}
+            for i in range(expired)
+        ] + [
+            {"user_id": 1, "token": f"new-{i}", "expires_at": cutoff + timedelta(1)}
+            for i in range(live)
+        ]
+        conn.execute(RefreshToken.__table__.insert(), rows)
+        conn.execute(
+            Session.__table__.insert(),
+            [
+                {
+                    "user_id": 1,
+                    "session_id": "s-old",
+                    "expires_at": cutoff - timedelta(1),
+                }
+            ],
+        )
+    return engine
+
+
+def count(engine, table):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+# === Test Layer ===
+def test_purge_expired_in_batches():
+    # Arrange
+    engine = make_engine(expired=5, live=3)
+    table = RefreshToken.__table__
+    # Act: batches of 2 still purge every expired row
+    with engine.connect() as conn:
+        purged = purge_expired(conn, table, cutoff, batch_size=2)
+    # Assert
+    assert purged == 5
+    assert count(engine, table) == 3
+
+
+def test_run_once_reports_per_table():
+    # Arrange
+    engine = make_engine(expired=2, live=1)
+    # Act
+    purged = run_once(bind=engine, batch_size=100, cutoff=cutoff)
+    # Assert
+    assert purged == {"refresh_tokens": 2, "sessions": 1, "jwt_blacklist": 0}
+    assert count(engine, Session.__table__) == 0
+    # A second run is a no-op
+    assert run_once(bind=engine, cutoff=cutoff)["refresh_tokens"] == 0
+
+
+def test_report():
+    assert report(None, 0.1).startswith("reaper: skipped")
+    assert report({"sessions": 4}, 0.5) == "reaper: sessions=4 (0.50s)"
@@ -0,0 +1,46 @@
+from unittest.mock import Mock
+from db.explain_check import HOT_QUERIES, find_full_scans, run_checks
+
+# === Mock Layer ===
+index_plan = [
+    {"table": "payments", "type": "ref", "possible_keys": "idx", "key": "idx"}
+]
+tiny_table_plan = [
+    {"table": "payments", "type": "ALL", "possible_keys": "idx", "key": None}
+]
+no_index_plan = [{"table": "payments", "type": "ALL", "possible_keys": None}]
+
+
+def make_connection(plan):
+    row = Mock()
+    row._mapping = plan[0]
+    connection = Mock()
+    connection.execute.return_value = [row]
+    return connection
+
+
+# === Test Layer ===
+def test_find_full_scans():
+    # Index lookups are fine
+    assert find_full_scans(index_plan) == []
+    # Full scan with a candidate index only fails in strict mode
+    assert find_full_scans(tiny_table_plan) == []
+    assert find_full_scans(tiny_table_plan, strict=True) == ["payments"]
+    # Full scan with no usable index always fails
+    assert find_full_scans(no_index_plan) == ["payments"]
+
+
+def test_run_checks():
+    # Arrange
+    queries = {"lease_ledger": HOT_QUERIES["lease_ledger"]}
+    # Act & Assert: happy path
+    assert run_checks(make_connection(index_plan), queries) == {}
+    # Negative: a hot query lost its index
+    failures = run_checks(make_connection(no_index_plan), queries)
+    assert failures == {"lease_ledger": ["payments"]}
+    # Every hot query is sent through EXPLAIN
+    connection = make_connection(index_plan)
+    run_checks(connection)
+    assert connection.execute.call_count == len(HOT_QUERIES)
+    sql = str(connection.execute.call_args.args[0])
+    assert sql.startswith("EXPLAIN SELECT")
@@ -0,0 +1,63 @@
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from db.models import Base, Lease, Payment, Room
+
+
+# === Mock Layer ===
+def make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+# === Test Layer ===
+def test_money_columns_are_decimal():
+    # Arrange
+    session = make_session()
+    session.add(Room(room_number="101", base_rent=Decimal("12500.50")))
+    session.add(
+        Lease(
+            tenant_id=1,
+            room_id=1,
+            start_date=datetime(2026, 1, 1),
+            end_date=datetime(2026, 12, 31),
+            rent_amount=Decimal("12500.50"),
+        )
+    )
+    session.commit()
+    # Act
+    room = session.query(Room).one()
+    lease = session.query(Lease).one()
+    # Assert: values come back as Decimal, defaults included
+    assert room.base_rent == Decimal("12500.50")
+    assert isinstance(lease.rent_amount, Decimal)
+    assert lease.deposit_amount == Decimal("0.00")
+
+
+def test_balance_aggregates_in_sql():
+    # Arrange
+    session = make_session()
+    session.add_all(
+        [
+            Payment(
+                lease_id=1,
+                amount_due=Decimal("100.10"),
+                amount_paid=Decimal("100.10"),
+                due_date=datetime(2026, 1, 1),
+            ),
+            Payment(
+                lease_id=1, amount_due=Decimal("100.20"), due_date=datetime(2026, 2, 1)
+            ),
+        ]
+    )
+    session.commit()
+    # Act: Balance = SUM(amount_due) - SUM(amount_paid), computed by the database
+    balance = session.execute(
+        select(func.sum(Payment.amount_due) - func.sum(Payment.amount_paid)).where(
+            Payment.lease_id == 1
+        )
+    ).scalar()
+    # Assert
+    assert Decimal(balance) == Decimal("100.20")
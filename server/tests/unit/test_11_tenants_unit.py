@@ -0,0 +1,136 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from db.models import AuthUser, Base, Lease, Room, Tenant
+from resource.pagination import decode_cursor, encode_cursor, parse_limit
+from resource.tenants import directory_query, parse_directory_filters, tenant_card
+
+# === Mock Layer ===
+names = ["Ana", "Ben", "Ben", "Cara", "Dan", "Eve", "Finn"]
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for i, name in enumerate(names, start=1):
+        session.add(
+            AuthUser(
+                id=i, username=f"u{i}", email=f"{i}@x.com", password_hash="x", role_id=1
+            )
+        )
+        session.add(
+            Tenant(user_id=i, full_name=name, status="active" if i % 2 else "past")
+        )
+    session.add(Room(id=1, room_number="301", floor=3, base_rent=100))
+    session.add(
+        Lease(
+            tenant_id=2,
+            room_id=1,
+            start_date=datetime(2026, 1, 1),
+            end_date=datetime(2026, 12, 31),
+            rent_amount=100,
+        )
+    )
+    session.commit()
+    return session
+
+
+def walk(session, filters, limit):
+    pages, after = [], None
+    while True:
+        rows = session.execute(directory_query(filters, after, limit + 1)).all()
+        pages.append([row.user_id for row in rows[:limit]])
+        if len(rows) <= limit:
+            return pages
+        last = rows[limit - 1]
+        after = decode_cursor(encode_cursor([last.full_name, last.user_id]), 2)
+
+
+# === Test Layer ===
+def test_cursor_roundtrip():
+    # Arrange & Act
+    cursor = encode_cursor(["Ben", 3, datetime(2026, 1, 2, 3, 4)])
+    # Assert
+    assert decode_cursor(cursor, 3) == ["Ben", 3, datetime(2026, 1, 2, 3, 4)]
+    # Negative: garbage and wrong arity
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("not-a-cursor", 2)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, 2)
+
+
+def test_parse_limit():
+    assert parse_limit({}) == 25
+    assert parse_limit({"limit": "10"}) == 10
+    with pytest.raises(ValueError):
+        parse_limit({"limit": "0"})
+    with pytest.raises(ValueError):
+        parse_limit({"limit": "abc"})
+
+
+def test_parse_directory_filters():
+    # Happy path
+    filters = parse_directory_filters({"status": "active,past", "floor": "3"})
+    assert filters["statuses"] == ["active", "past"]
+    assert filters["floor"] == 3
+    # Negative: invalid values
+    with pytest.raises(ValueError):
+        parse_directory_filters({"status": "evicted"})
+    with pytest.raises(ValueError):
+        parse_directory_filters({"floor": "third"})
+    with pytest.raises(ValueError):
+        parse_directory_filters({"lease": "expired-ish"})
+
+
+def test_directory_keyset_pages():
+    # Arrange
+    session = make_session()
+    filters = parse_directory_filters({})
+    # Act: walk the whole directory two cards at a time
+    pages = walk(session, filters, limit=2)
+    # Assert: alphabetical, duplicate names split by id, no row seen twice
+    assert pages == [[1, 2], [3, 4], [5, 6], [7]]
+
+
+def test_directory_filters():
+    # Arrange
+    session = make_session()
+    # Act & Assert: status
+    rows = session.execute(
+        directory_query(parse_directory_filters({"status": "past"}))
+    ).all()
+    assert [row.user_id for row in rows] == [2, 4, 6]
+    # Floor and lease state both go through the active lease
+    rows = session.execute(directory_query(parse_directory_filters({"floor": "3"})))
+    cards = [tenant_card(row) for row in rows]
+    assert [card["room_number"] for card in cards] == ["301"]
+    assert cards[0]["lease_end"] == "2026-12-31"
+    rows = session.execute(directory_query(parse_directory_filters({"lease": "none"})))
+    assert len(rows.all()) == len(names) - 1
+    # Prefix search
+    rows = session.execute(directory_query(parse_directory_filters({"q": "Be"})))
+    assert [row.user_id for row in rows] == [2, 3]
+
+
+def test_directory_lists_a_tenant_with_two_active_leases_once():
+    # Arrange: tenant 2 also rents a second room
+    session = make_session()
+    session.add(Room(id=2, room_number="402", floor=4, base_rent=100))
+    session.add(
+        Lease(
+            tenant_id=2,
+            room_id=2,
+            start_date=datetime(2026, 2, 1),
+            end_date=datetime(2027, 1, 31),
+            rent_amount=100,
+        )
+    )
+    session.commit()
+    # Act
+    pages = walk(session, parse_directory_filters({}), limit=2)
+    rows = session.execute(directory_query(parse_directory_filters({"q": "Ben"})))
+    # Assert: one card per tenant, showing the newest lease
+    assert pages == [[1, 2], [3, 4], [5, 6], [7]]
+    assert [(row.user_id, row.room_number) for row in rows] == [(2, "402"), (3, None)]
@@ -0,0 +1,168 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+import resource.analytics as analytics
+from db.models import Base, Payment
+from resource.analytics import (
+    analytics_range,
+    deltas,
+    overdue_stats,
+    parse_derive,
+    period_keys,
+    revenue_by_type,
+    revenue_series,
+    rolling_mean,
+)
+
+
+# === Mock Layer ===
+def make_session(payments):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    for due_date, amount_due, amount_paid, payment_type, status in payments:
+        session.add(
+            Payment(
+                lease_id=1,
+                amount_due=Decimal(amount_due),
+                amount_paid=Decimal(amount_paid),
+                due_date=due_date,
+                payment_type=payment_type,
+                status=status,
+            )
+        )
+    session.commit()
+    return session
+
+
+PAYMENTS = [
+    (datetime(2026, 1, 5), "100.00", "100.00", "cash", "paid"),
+    (datetime(2026, 1, 20), "100.00", "50.25", "bank_transfer", "partial"),
+    (datetime(2026, 3, 1), "200.00", "0.00", "cash", "pending"),
+    (datetime(2025, 12, 31), "999.00", "999.00", "cash", "paid"),  # out of range
+]
+
+
+# === Test Layer ===
+def test_revenue_series_groups_by_month_and_fills_gaps():
+    # Arrange
+    session = make_session(PAYMENTS)
+    # Act
+    series = revenue_series(
+        session, datetime(2026, 1, 1), datetime(2026, 4, 1), "month"
+    )
+    # Assert: columnar, February present as zeros
+    assert series["period"] == ["2026-01", "2026-02", "2026-03"]
+    assert series["due"] == [200.0, 0.0, 200.0]
+    assert series["paid"] == [150.25, 0.0, 0.0]
+    assert series["count"] == [2, 0, 1]
+
+
+def test_revenue_series_weeks_start_on_monday():
+    # Arrange
+    session = make_session(PAYMENTS)
+    # Act
+    series = revenue_series(
+        session, datetime(2026, 1, 5), datetime(2026, 1, 26), "week"
+    )
+    # Assert: 2026-01-05 is a Monday, the 20th falls in the week of the 19th
+    assert series["period"] == ["2026-01-05", "2026-01-12", "2026-01-19"]
+    assert series["count"] == [1, 0, 1]
+
+
+def test_revenue_by_type():
+    # Arrange
+    session = make_session(PAYMENTS)
+    # Act
+    result = revenue_by_type(session, datetime(2026, 1, 1), datetime(2027, 1, 1))
+    # Assert
+    assert result == {
+        "payment_type": ["bank_transfer", "cash"],
+        "due": [100.0, 300.0],
+        "paid": [50.25, 100.0],
+        "count": [1, 2],
+    }
+
+
+def test_overdue_stats_ages_open_payments():
+    # Arrange
+    session = make_session(PAYMENTS)
+    # Act
+    stats = overdue_stats(session, datetime(2026, 3, 15))
+    # Assert: the partial from Jan 20 is 54 days late, the pending one 14
+    assert stats["bucket"] == ["0-30", "31-60", "61-90", "90+"]
+    assert stats["count"] == [1, 1, 0, 0]
+    assert stats["outstanding"] == [200.0, 49.75, 0.0, 0.0]
+    assert stats["total_outstanding"] == 249.75
+
+
+def test_period_keys():
+    # Assert: half-open range, the end boundary is excluded
+    assert period_keys(datetime(2025, 11, 15), datetime(2026, 2, 1), "month") == [
+        "2025-11",
+        "2025-12",
+        "2026-01",
+    ]
+    assert period_keys(datetime(2021, 6, 1), datetime(2026, 6, 1), "year") == [
+        "2021",
+        "2022",
+        "2023",
+        "2024",
+        "2025",
+        "2026",
+    ]
+
+
+def test_analytics_range_defaults_and_validation():
+    # Act
+    start, end = analytics_range({}, "month", now=datetime(2026, 10, 18, 13, 5))
+    # Assert
+    assert end == datetime(2026, 10, 19)
+    assert (end - start).days == 365
+    with pytest.raises(ValueError):
+        analytics_range({"from": "2026-02-01", "to": "2026-01-01"})
+
+
+def test_analytics_range_includes_the_to_day():
+    # Act: the same bounds the payments export gets
+    start, end = analytics_range({"from": "2026-01-01", "to": "2026-01-31"})
+    single_day = analytics_range({"from": "2026-01-31", "to": "2026-01-31"})
+    # Assert: all of Jan 31 is in, as in /exports/payments.csv
+    assert (start, end) == (datetime(2026, 1, 1), datetime(2026, 2, 1))
+    assert single_day == (datetime(2026, 1, 31), datetime(2026, 2, 1))
+
+
+def test_parse_derive_rejects_unknown_series():
+    # Assert
+    assert parse_derive({"derive": "rolling,delta", "window": "2"}) == (
+        ["rolling", "delta"],
+        2,
+    )
+    with pytest.raises(ValueError):
+        parse_derive({"derive": "median"})
+    with pytest.raises(ValueError):
+        parse_derive({"window": "0"})
+
+
+def test_derived_series_pure_python(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(analytics, "np", None)
+    # Act / Assert
+    assert rolling_mean([1.0, 2.0, 3.0, 4.0], 2) == [None, 1.5, 2.5, 3.5]
+    assert rolling_mean([1.0], 3) == [None]
+    assert deltas([10.0, 12.5, 7.0]) == [None, 2.5, -5.5]
+    assert deltas([]) == []
+
+
+def test_derived_series_numpy_matches_pure_python(monkeypatch):
+    # Arrange
+    numpy = pytest.importorskip("numpy")
+    values = [3.0, 1.0, 4.0, 1.0, 5.0, 9.0]
+    monkeypatch.setattr(analytics, "np", None)
+    expected = (rolling_mean(values, 3), deltas(values))
+    # Act
+    monkeypatch.setattr(analytics, "np", numpy)
+    # Assert
+    assert (rolling_mean(values, 3), deltas(values)) == expected
@@ -0,0 +1,228 @@
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import create_engine, delete, func, select, update
+from sqlalchemy.orm import Session
+import resource.rollups as rollups
+from db.models import Base, Payment, PaymentRollup, PaymentTombstone
+from resource.analytics import lease_ledger, revenue_by_type, revenue_series
+from resource.rollups import (
+    LEASE_MONTH,
+    TYPE_DAY,
+    high_water_mark,
+    refresh,
+    touched_partitions,
+)
+from rollup_refresher import report, run_once
+
+# === Mock Layer ===
+earlier = datetime(2026, 3, 1, 11, 0, 0)
+written_at = datetime(2026, 3, 1, 12, 0, 0)
+later = datetime(2026, 3, 1, 13, 0, 0)
+much_later = datetime(2100, 1, 1)
+START, END = datetime(2026, 1, 1), datetime(2026, 4, 1)
+
+
+def make_engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            Payment.__table__.insert(),
+            [
+                payment(1, "100.00", "100.00", datetime(2026, 1, 5), "cash"),
+                payment(1, "100.00", "40.00", datetime(2026, 2, 5), "cash"),
+                payment(2, "300.00", "300.00", datetime(2026, 2, 5), "check"),
+                payment(2, "300.00", "0.00", datetime(2026, 3, 5), None, written_at),
+            ],
+        )
+    return engine
+
+
+def payment(lease_id, due, paid, due_date, payment_type, changed_at=earlier):
+    return {
+        "lease_id": lease_id,
+        "amount_due": Decimal(due),
+        "amount_paid": Decimal(paid),
+        "due_date": due_date,
+        "payment_type": payment_type,
+        "status": "paid",
+        "rollup_changed_at": changed_at,
+    }
+
+
+def rollup_count(engine, grain):
+    with engine.connect() as conn:
+        return conn.execute(
+            select(func.count()).where(PaymentRollup.grain == grain)
+        ).scalar()
+
+
+def refreshed(engine, full=False):
+    with engine.connect() as conn:
+        return refresh(conn, full=full, now=later)
+
+
+# === Test Layer ===
+def test_full_refresh_builds_both_grains():
+    # Arrange
+    engine = make_engine()
+    # Act
+    written = refreshed(engine)
+    # Assert: 4 (lease, month) partitions, 4 (type, day) partitions
+    assert written == {LEASE_MONTH: 4, TYPE_DAY: 4}
+    assert rollup_count(engine, TYPE_DAY) == 4
+    with engine.connect() as conn:
+        assert high_water_mark(conn) == written_at
+
+
+def test_rollup_reads_match_live_reads():
+    # Arrange
+    engine = make_engine()
+    with Session(engine) as session:
+        live = (
+            revenue_series(session, START, END, "month"),
+            revenue_by_type(session, START, END),
+            lease_ledger(session, 2),
+        )
+    refreshed(engine)
+    # Act
+    with Session(engine) as session:
+        from_rollups = (
+            revenue_series(session, START, END, "month"),
+            revenue_by_type(session, START, END),
+            lease_ledger(session, 2),
+        )
+    # Assert
+    assert from_rollups == live
+    assert live[0]["paid"] == [100.0, 340.0, 0.0]
+    assert live[1]["payment_type"] == ["cash", "check", "unknown"]
+    assert live[2]["balance"] == [0.0, 300.0]
+
+
+def test_writes_after_refresh_are_merged_live():
+    # Arrange: rollups built, then a payment is paid and a new one added
+    engine = make_engine()
+    refreshed(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            update(Payment)
+            .where(Payment.amount_paid == Decimal("40.00"))
+            .values(amount_paid=Decimal("100.00"))
+        )
+        conn.execute(
+            Payment.__table__.insert(),
+            [payment(1, "50.00", "50.00", datetime(2026, 2, 20), "cash", later)],
+        )
+    # Act
+    with Session(engine) as session:
+        series = revenue_series(session, START, END, "month")
+        ledger = lease_ledger(session, 1)
+    # Assert: the stale February partitions are swapped, not double counted
+    assert series["paid"] == [100.0, 450.0, 0.0]
+    assert series["count"] == [1, 3, 1]
+    assert ledger["paid"] == [100.0, 150.0]
+
+
+def test_incremental_refresh_rewrites_only_touched_partitions():
+    # Arrange
+    engine = make_engine()
+    refreshed(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            Payment.__table__.insert(),
+            [payment(3, "10.00", "10.00", datetime(2026, 3, 9), "cash", later)],
+        )
+    # Act
+    written = refreshed(engine)
+    # Assert: the new payment's partitions, plus the ones of the payment sitting
+    # on the old high-water mark, which the lag window re-reads
+    assert written == {LEASE_MONTH: 2, TYPE_DAY: 2}
+    assert rollup_count(engine, LEASE_MONTH) == 5
+    with engine.connect() as conn:
+        row = conn.execute(
+            select(PaymentRollup).where(
+                PaymentRollup.grain == TYPE_DAY,
+                PaymentRollup.period == date(2026, 3, 9),
+            )
+        ).one()
+        assert high_water_mark(conn) == later
+    assert row.payment_count == 1
+
+
+def test_deleted_and_moved_payments_leave_their_partitions():
+    # Arrange: rollups built, then January's payment is deleted and lease 2's
+    # February payment moves to March
+    engine = make_engine()
+    refreshed(engine)
+    with engine.begin() as conn:
+        conn.execute(delete(Payment).where(Payment.due_date == datetime(2026, 1, 5)))
+        conn.execute(
+            update(Payment)
+            .where(Payment.lease_id == 2, Payment.due_date == datetime(2026, 2, 5))
+            .values(due_date=datetime(2026, 3, 6))
+        )
+    # Act
+    with Session(engine) as session:
+        live = revenue_series(session, START, END, "month")
+    refreshed(engine)
+    with Session(engine) as session:
+        rolled_up = revenue_series(session, START, END, "month")
+        ledger = lease_ledger(session, 1)
+    # Assert: both reads drop the deleted payment and count the moved one once
+    assert live["count"] == rolled_up["count"] == [0, 1, 2]
+    assert live["paid"] == rolled_up["paid"] == [0.0, 40.0, 300.0]
+    assert ledger["paid"] == [40.0]
+    assert rollup_count(engine, LEASE_MONTH) == 2
+    # applied tombstones are pruned once the high-water mark moves past them
+    with engine.begin() as conn:
+        conn.execute(
+            Payment.__table__.insert(),
+            [payment(3, "10.00", "0.00", datetime(2026, 3, 9), "cash", much_later)],
+        )
+    refreshed(engine)
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count(PaymentTombstone.id))).scalar() == 0
+
+
+def test_status_only_writes_leave_the_partitions_alone():
+    # Arrange: rollups built, then the overdue job flips every status
+    engine = make_engine()
+    refreshed(engine)
+    since = later
+    with engine.begin() as conn:
+        conn.execute(update(Payment).values(status="overdue"))
+        # Act
+        after_status_flip = touched_partitions(conn, LEASE_MONTH, since)
+        conn.execute(
+            update(Payment)
+            .where(Payment.amount_paid == Decimal("40.00"))
+            .values(amount_paid=Decimal("100.00"))
+        )
+        after_payment = touched_partitions(conn, LEASE_MONTH, since)
+    # Assert: only a change to a total marks its partition
+    assert after_status_flip == set()
+    assert after_payment == {(1, "", date(2026, 2, 1))}
+
+
+def test_big_backlog_falls_back_to_live(monkeypatch):
+    # Arrange: everything counts as unrefreshed and the limit is tiny
+    engine = make_engine()
+    refreshed(engine)
+    monkeypatch.setattr(rollups, "ROLLUP_LAG_SECONDS", 10**6)
+    monkeypatch.setattr(rollups, "ROLLUP_MAX_LIVE_ROWS", 2)
+    # Act
+    with Session(engine) as session:
+        series = revenue_series(session, START, END, "month")
+    # Assert
+    assert series["count"] == [1, 2, 1]
+
+
+def test_run_once_and_report():
+    # Arrange
+    engine = make_engine()
+    # Act
+    written = run_once(bind=engine)
+    # Assert
+    assert written == {LEASE_MONTH: 4, TYPE_DAY: 4}
+    assert report(written, 0.5) == "rollups: lease_month=4 type_day=4 (0.50s)"
+    assert "skipped" in report(None, 0.0)
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import create_engine, event, select
+from db.models import Base, Payment
+from overdue_job import mark_overdue, nearing_deadline, report, run_once
+
+# === Mock Layer ===
+today = datetime(2026, 3, 1)
+
+
+def make_engine(rows):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            Payment.__table__.insert(),
+            [
+                {
+                    "lease_id": lease_id,
+                    "amount_due": Decimal("100.00"),
+                    "due_date": today + timedelta(days=offset),
+                    "status": status,
+                }
+                for lease_id, offset, status in rows
+            ],
+        )
+    return engine
+
+
+def statuses(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(Payment.status).order_by(Payment.id)).scalars().all()
+
+
+ROWS = [
+    (1, -40, "pending"),
+    (1, -10, "partial"),
+    (2, -1, "pending"),
+    (3, -5, "paid"),
+    (4, 0, "pending"),  # due today, not late yet
+    (5, 3, "partial"),
+    (6, 30, "pending"),
+]
+
+
+# === Test Layer ===
+def test_mark_overdue_in_batches():
+    # Arrange
+    engine = make_engine(ROWS)
+    # Act: batches of 2 still reach every late row
+    with engine.connect() as conn:
+        marked, lease_ids = mark_overdue(conn, today, batch_size=2)
+    # Assert
+    assert marked == 3
+    assert lease_ids == {1, 2}
+    assert statuses(engine) == [
+        "overdue",
+        "overdue",
+        "overdue",
+        "paid",
+        "pending",
+        "partial",
+        "pending",
+    ]
+
+
+def test_mark_overdue_reports_only_rows_it_flipped():
+    # Arrange: the first batch (lease 1) is settled between the SELECT and UPDATE
+    engine = make_engine(ROWS)
+    settled = []
+
+    def settle_first_batch(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE payments") and not settled:
+            settled.append(True)
+            cursor.execute("UPDATE payments SET status = 'paid' WHERE id IN (1, 2)")
+
+    event.listen(engine, "before_cursor_execute", settle_first_batch)
+    # Act
+    with engine.connect() as conn:
+        marked, lease_ids = mark_overdue(conn, today, batch_size=2)
+    # Assert: the empty batch didn't end the pass, and lease 1 isn't reported
+    assert (marked, lease_ids) == (1, {2})
+    assert statuses(engine)[:3] == ["paid", "paid", "overdue"]
+
+
+def test_mark_overdue_walks_the_status_due_index_in_order():
+    # Arrange: due dates out of id order, and a tie on the batch boundary
+    engine = make_engine(
+        [
+            (1, -1, "pending"),
+            (2, -9, "pending"),
+            (3, -9, "pending"),
+            (4, -9, "pending"),
+            (5, -20, "partial"),
+        ]
+    )
+    selects = []
+
+    def capture(conn, cursor, statement, parameters, *args):
+        if statement.startswith("SELECT payments.id, payments.due_date"):
+            selects.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    # Act
+    with engine.connect() as conn:
+        marked, lease_ids = mark_overdue(conn, today, batch_size=2)
+    # Assert: one status at a time, in (due_date, id) order, nothing skipped
+    assert (marked, lease_ids) == (5, {1, 2, 3, 4, 5})
+    assert all("payments.status = ?" in sql for sql in selects)
+    assert all("ORDER BY payments.due_date, payments.id" in sql for sql in selects)
+    assert len(selects) == 4
+
+
+def test_mark_overdue_is_idempotent():
+    # Arrange
+    engine = make_engine(ROWS)
+    with engine.connect() as conn:
+        mark_overdue(conn, today)
+        # Act
+        marked, lease_ids = mark_overdue(conn, today)
+    # Assert
+    assert (marked, lease_ids) == (0, set())
+
+
+def test_nearing_deadline():
+    # Arrange
+    engine = make_engine(ROWS)
+    # Act
+    with engine.connect() as conn:
+        lease_ids = nearing_deadline(conn, today, days=7)
+    # Assert: due today and in 3 days, not the one in 30
+    assert lease_ids == [4, 5]
+
+
+def test_run_once_and_report():
+    # Arrange
+    engine = make_engine(ROWS)
+    # Act
+    summary = run_once(bind=engine, today=today)
+    # Assert
+    assert summary == {
+        "marked": 3,
+        "overdue_lease_ids": [1, 2],
+        "nearing_deadline_lease_ids": [4, 5],
+    }
+    assert report(summary, 0.25) == (
+        "overdue: marked=3 leases=[1, 2] nearing=[4, 5] (0.25s)"
+    )
+    assert "skipped" in report(None, 0.0)
@@ -0,0 +1,192 @@
+import json
+import pytest
+from decimal import Decimal
+from sqlalchemy import create_engine, func, select
+import bulk_import
+import resource.hashing as hashing
+from db.models import AuthUser, Base, Lease, Role, Room, Tenant
+from bulk_import import read_rows, report, run_import, validate_lease, validate_room
+
+
+# === Mock Layer ===
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Role.__table__.insert(), [{"name": "tenant"}, {"name": "admin"}])
+        conn.execute(
+            Room.__table__.insert(),
+            [{"room_number": "101", "base_rent": Decimal("500.00")}],
+        )
+    return engine
+
+
+@pytest.fixture(autouse=True)
+def fast_hashes(monkeypatch):
+    monkeypatch.setattr(hashing, "BCRYPT_ROUNDS", 4)
+
+
+def count(engine, model):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model)).scalar()
+
+
+def rejects_of(summary):
+    with open(summary["rejects_file"]) as f:
+        return [json.loads(line) for line in f]
+
+
+# === Test Layer ===
+def test_import_rooms_csv_in_chunks(engine, tmp_path):
+    # Arrange: row 3 is a duplicate in the file, row 4 exists in the db
+    path = tmp_path / "rooms.csv"
+    path.write_text(
+        "room_number,floor,type,base_rent\n"
+        "201,2,1BR,750.5\n"
+        "202,2,,800\n"
+        "201,2,1BR,750\n"
+        "101,1,studio,500\n"
+        "203,x,studio,500\n"
+        "204,2,studio,900\n"
+    )
+    # Act
+    summary = run_import("rooms", str(path), bind=engine, chunk_size=2, workers=0)
+    # Assert: validation rejects stream out ahead of the chunk's db check
+    assert summary["inserted"] == 3
+    assert summary["rejected"] == 3
+    errors = {r["line"]: r["error"] for r in rejects_of(summary)}
+    assert sorted(errors) == [4, 5, 6]
+    assert errors[4] == "duplicate room_number in file: 201"
+    assert errors[5] == "room_number already exists"
+    assert errors[6] == "invalid floor: 'x'"
+    assert count(engine, Room) == 4
+    assert summary["stages"]["insert"]["rows"] == 3
+
+
+def test_import_tenants_jsonl_hashes_and_links(engine, tmp_path):
+    # Arrange
+    path = tmp_path / "tenants.jsonl"
+    rows = [
+        {"email": "a@x.com", "password": "pw", "full_name": "A"},
+        {"email": "b@x.com", "password": "pw", "full_name": "B", "status": "active"},
+        {"email": "c@x.com", "full_name": "C"},
+        "not json",
+    ]
+    path.write_text(
+        "\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows) + "\n"
+    )
+    # Act
+    summary = run_import("tenants", str(path), bind=engine, workers=0)
+    # Assert
+    assert (summary["inserted"], summary["rejected"]) == (2, 2)
+    assert summary["stages"]["hash"]["rows"] == 2
+    with engine.connect() as conn:
+        linked = conn.execute(
+            select(AuthUser.email, AuthUser.password_hash, Tenant.status)
+            .join(Tenant, Tenant.user_id == AuthUser.id)
+            .order_by(AuthUser.email)
+        ).all()
+    assert [(r.email, r.status) for r in linked] == [
+        ("a@x.com", "prospect"),
+        ("b@x.com", "active"),
+    ]
+    assert linked[0].password_hash.startswith("$2b$04$")
+
+
+def test_malformed_rows_are_rejected_not_fatal(engine, tmp_path):
+    # Arrange: an extra CSV cell, and JSONL values that aren't strings
+    rooms = tmp_path / "rooms.csv"
+    rooms.write_text("room_number,base_rent\n301,500,oops\n302,600\n")
+    tenants = tmp_path / "tenants.jsonl"
+    rows = [
+        {"email": "a@x.com", "password": 1234, "full_name": "A"},
+        {"email": "b@x.com", "password": "pw", "full_name": ["B"]},
+        {"email": "c@x.com", "password": "pw", "full_name": "C"},
+    ]
+    tenants.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    # Act
+    room_summary = run_import("rooms", str(rooms), bind=engine, workers=0)
+    tenant_summary = run_import("tenants", str(tenants), bind=engine, workers=0)
+    # Assert: the bad rows are in the rejects file, the rest still load
+    assert (room_summary["inserted"], room_summary["rejected"]) == (1, 1)
+    assert rejects_of(room_summary) == [
+        {
+            "line": 2,
+            "row": {"room_number": "301", "base_rent": "500"},
+            "error": "row has 3 fields, the header has 2",
+        }
+    ]
+    assert (tenant_summary["inserted"], tenant_summary["rejected"]) == (1, 2)
+    errors = {r["line"]: r["error"] for r in rejects_of(tenant_summary)}
+    assert errors == {1: "password must be a string", 2: "invalid full_name: ['B']"}
+
+
+def test_import_tenants_with_thread_pool(engine, tmp_path, monkeypatch):
+    # Arrange: a thread pool stands in for the process pool
+    path = tmp_path / "tenants.csv"
+    rows = "".join(f"t{i}@x.com,pw,T {i}\n" for i in range(5))
+    path.write_text("email,password,full_name\n" + rows)
+    monkeypatch.setattr(
+        bulk_import, "new_executor", lambda workers: hashing.new_executor(2, "thread")
+    )
+    # Act
+    summary = run_import("tenants", str(path), bind=engine, chunk_size=2, workers=2)
+    # Assert
+    assert summary["inserted"] == 5
+    assert count(engine, Tenant) == 5
+
+
+def test_import_leases_resolves_references(engine, tmp_path):
+    # Arrange
+    tenants = tmp_path / "tenants.jsonl"
+    tenants.write_text(
+        json.dumps({"email": "l@x.com", "password": "pw", "full_name": "L"})
+    )
+    run_import("tenants", str(tenants), bind=engine, workers=0)
+    path = tmp_path / "leases.csv"
+    path.write_text(
+        "tenant_email,room_number,start_date,end_date,rent_amount\n"
+        "l@x.com,101,2026-01-01,2026-12-31,500\n"
+        "nobody@x.com,101,2026-01-01,2026-12-31,500\n"
+        "l@x.com,999,2026-01-01,2026-12-31,500\n"
+    )
+    # Act
+    summary = run_import("leases", str(path), bind=engine, workers=0)
+    # Assert
+    assert summary["inserted"] == 1
+    assert [r["error"] for r in rejects_of(summary)] == [
+        "tenant not found",
+        "room not found",
+    ]
+    assert count(engine, Lease) == 1
+    assert "import leases: inserted=1 rejected=2" in report(summary)
+
+
+def test_validators():
+    # Assert
+    with pytest.raises(ValueError):
+        validate_room({"room_number": "1", "base_rent": "-5"}, {})
+    with pytest.raises(ValueError):
+        validate_room({"room_number": "1", "base_rent": "5", "type": "castle"}, {})
+    with pytest.raises(ValueError):
+        validate_lease(
+            {
+                "tenant_id": "1",
+                "room_id": "1",
+                "start_date": "2026-02-01",
+                "end_date": "2026-01-01",
+                "rent_amount": "1",
+            },
+            {},
+        )
+
+
+def test_read_rows_csv_skips_empty_cells(tmp_path):
+    # Arrange
+    path = tmp_path / "rooms.csv"
+    path.write_text("room_number,floor\n 7 ,\n")
+    # Act
+    rows = list(read_rows(str(path)))
+    # Assert
+    assert rows == [(2, {"room_number": "7"}, None)]
@@ -0,0 +1,227 @@
+import random
+import pytest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import Mock
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+import resource.availability as availability
+from db.models import Base, Lease, Room
+from resource.availability import (
+    AvailabilityIndex,
+    calendar_of,
+    free_rooms_query,
+    overlaps,
+)
+
+
+# === Mock Layer ===
+@pytest.fixture
+def factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    session = factory()
+    session.add_all(
+        [
+            Room(id=1, room_number="101", floor=1, type="2BR", base_rent=900),
+            Room(id=2, room_number="102", floor=1, type="2BR", base_rent=700),
+            Room(id=3, room_number="201", floor=2, type="studio", base_rent=500),
+            Room(id=4, room_number="202", floor=2, type="2BR", base_rent=800),
+            Room(
+                id=5,
+                room_number="203",
+                floor=2,
+                type="2BR",
+                base_rent=600,
+                status="maintenance",
+            ),
+        ]
+    )
+    session.add_all(
+        [
+            lease(1, "2026-01-01", "2026-06-30"),
+            lease(2, "2026-03-01", "2026-03-31"),
+            lease(4, "2025-01-01", "2025-12-31"),
+            lease(4, "2026-09-01", "2027-08-31", is_active=0),
+        ]
+    )
+    session.commit()
+    session.close()
+    return factory
+
+
+def lease(room_id, start, end, is_active=1):
+    return Lease(
+        tenant_id=1,
+        room_id=room_id,
+        start_date=datetime.fromisoformat(start),
+        end_date=datetime.fromisoformat(end),
+        rent_amount=Decimal("1.00"),
+        is_active=is_active,
+    )
+
+
+def numbers(rooms):
+    return [room.room_number for room in rooms]
+
+
+# === Test Layer ===
+def test_overlaps_inclusive_dates():
+    # Arrange
+    calendar = calendar_of([(date(2026, 1, 10), date(2026, 1, 20))])
+    # Assert: touching either end counts as a clash
+    assert overlaps(calendar, date(2026, 1, 20), date(2026, 1, 25))
+    assert overlaps(calendar, date(2026, 1, 1), date(2026, 1, 10))
+    assert overlaps(calendar, date(2026, 1, 12), date(2026, 1, 13))
+    assert not overlaps(calendar, date(2026, 1, 21), date(2026, 2, 1))
+    assert not overlaps(calendar, date(2025, 12, 1), date(2026, 1, 9))
+    assert not overlaps(calendar_of([]), date(2026, 1, 1), date(2026, 1, 2))
+
+
+def test_overlaps_long_lease_hidden_behind_short_ones():
+    # Arrange: the running max of ends still sees the long first lease
+    calendar = calendar_of(
+        [
+            (date(2026, 1, 1), date(2026, 12, 31)),
+            (date(2026, 2, 1), date(2026, 2, 5)),
+        ]
+    )
+    # Assert
+    assert overlaps(calendar, date(2026, 6, 1), date(2026, 6, 2))
+
+
+def test_free_rooms_filters(factory):
+    # Arrange
+    index = AvailabilityIndex(ttl=300, session_factory=factory)
+    march = (date(2026, 3, 10), date(2026, 3, 20))
+    # Act & Assert: cheapest first, maintenance never shows up
+    assert numbers(index.free_rooms(*march)) == ["201", "202"]
+    assert numbers(index.free_rooms(*march, room_type="2BR")) == ["202"]
+    assert numbers(index.free_rooms(*march, max_rent=Decimal("600"))) == ["201"]
+    assert numbers(index.free_rooms(*march, floor=1)) == []
+    july = (date(2026, 7, 1), date(2026, 7, 31))
+    assert numbers(index.free_rooms(*july, room_type="2BR", limit=2)) == [
+        "102",
+        "202",
+    ]
+    assert index.is_free(1, *july)
+    assert not index.is_free(1, *march)
+
+
+def test_index_matches_sql(factory):
+    # Arrange
+    index = AvailabilityIndex(ttl=300, session_factory=factory)
+    session = factory()
+    rng = random.Random(7)
+    # Act & Assert
+    for _ in range(50):
+        start = date(2025, 1, 1) + timedelta(days=rng.randrange(900))
+        end = start + timedelta(days=rng.randrange(90))
+        room_type = rng.choice([None, "2BR", "studio"])
+        expected = session.execute(free_rooms_query(start, end, room_type)).all()
+        assert [r.id for r in index.free_rooms(start, end, room_type)] == [
+            r.id for r in expected
+        ]
+    session.close()
+
+
+def test_committed_lease_write_is_picked_up(factory, monkeypatch):
+    # Arrange
+    index = AvailabilityIndex(ttl=300, session_factory=factory)
+    monkeypatch.setattr(availability, "availability_index", index)
+    august = (date(2026, 8, 1), date(2026, 8, 31))
+    assert index.is_free(3, *august)
+    session = factory()
+    # Act: a rolled back write changes nothing, a committed one does
+    session.add(lease(3, "2026-08-15", "2027-08-14"))
+    session.flush()
+    session.rollback()
+    assert index.is_free(3, *august)
+    session.add(lease(3, "2026-08-15", "2027-08-14"))
+    session.commit()
+    session.close()
+    # Assert
+    assert not index.is_free(3, *august)
+
+
+def test_refresh_failure_serves_stale(factory):
+    # Arrange
+    index = AvailabilityIndex(ttl=300, session_factory=factory)
+    index.load()
+    index.session_factory = Mock(side_effect=RuntimeError("db down"))
+    index.invalidate()
+    # Act: the poller's rebuild fails
+    index.refresh()
+    # Assert
+    assert index.is_free(3, date(2026, 1, 1), date(2026, 1, 2))
+
+
+def test_write_from_another_process_is_picked_up(factory):
+    # Arrange: a Core insert skips the ORM hooks, like another worker would
+    index = AvailabilityIndex(ttl=300, session_factory=factory)
+    august = (date(2026, 8, 1), date(2026, 8, 31))
+    assert index.is_free(3, *august)
+    session = factory()
+    session.execute(
+        insert(Lease).values(
+            tenant_id=1,
+            room_id=3,
+            start_date=datetime(2026, 8, 15),
+            end_date=datetime(2027, 8, 14),
+            rent_amount=Decimal("1.00"),
+        )
+    )
+    session.commit()
+    session.close()
+    # Act & Assert: the next poller tick picks it up, long before the TTL
+    assert index.is_free(3, *august)
+    index.refresh()
+    assert not index.is_free(3, *august)
+
+
+def test_dirty_rooms_survive_a_failed_reload(factory, monkeypatch):
+    # Arrange: room 3 gets booked, but reloading it after the commit fails
+    index = AvailabilityIndex(ttl=300, session_factory=factory)
+    monkeypatch.setattr(availability, "availability_index", index)
+    index.load()
+    index.session_factory = Mock(side_effect=RuntimeError("db down"))
+    session = factory()
+    session.add(lease(3, "2026-08-15", "2027-08-14"))
+    session.commit()
+    session.close()
+    august = (date(2026, 8, 1), date(2026, 8, 31))
+    # Act
+    during_outage = index.is_free(3, *august)
+    index.session_factory = factory
+    index.refresh()
+    # Assert: still queued, so the next poller tick reloads it
+    assert during_outage
+    assert not index.is_free(3, *august)
+
+
+def test_lookups_do_no_io_once_loaded(factory):
+    # Arrange: the TTL ran out, and any database access would fail loudly
+    index = AvailabilityIndex(ttl=300, session_factory=factory)
+    index.load()
+    index.invalidate()
+    index.session_factory = Mock(side_effect=AssertionError("lookup hit the DB"))
+    # Act
+    free = index.is_free(3, date(2026, 1, 1), date(2026, 1, 2))
+    rooms = index.free_rooms(date(2026, 1, 1), date(2026, 1, 2))
+    # Assert: the rebuild is left to the poller
+    assert free and rooms
+    index.session_factory.assert_not_called()
+
+
+def test_one_thread_refreshes_at_a_time(factory):
+    # Arrange: the TTL ran out while another thread is already rebuilding
+    index = AvailabilityIndex(ttl=300, session_factory=factory)
+    index.load()
+    index.invalidate()
+    index.session_factory = Mock(side_effect=AssertionError("second rebuild"))
+    # Act
+    with index._refresh_lock:
+        index.refresh()
+    # Assert
+    index.session_factory.assert_not_called()
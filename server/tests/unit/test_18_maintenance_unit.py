@@ -0,0 +1,180 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from db.models import Base, Lease, MaintenanceRequest
+from resource.events import EventBus, sse_format, sse_stream
+from resource.maintenance import (
+    apply_update,
+    parse_new_request,
+    parse_triage_cursor,
+    triage_rows,
+)
+from resource.pagination import encode_cursor
+
+START = datetime(2026, 5, 1, 9, 0)
+
+
+# === Mock Layer ===
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    filed = [
+        ("low", "open", 0),
+        ("emergency", "open", 3),
+        ("medium", "open", 1),
+        ("emergency", "open", 2),
+        ("high", "open", 4),
+        ("emergency", "closed", 0),
+        ("medium", "open", 1),
+    ]
+    for i, (priority, status, hours) in enumerate(filed, start=1):
+        session.add(
+            MaintenanceRequest(
+                id=i,
+                tenant_id=1,
+                room_id=1,
+                description=f"request {i}",
+                priority=priority,
+                status=status,
+                request_date=START + timedelta(hours=hours),
+            )
+        )
+    session.add(
+        Lease(
+            tenant_id=7,
+            room_id=12,
+            start_date=START,
+            end_date=START + timedelta(days=365),
+            rent_amount=1,
+        )
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+def ids(rows):
+    return [row.id for row in rows]
+
+
+# === Test Layer ===
+def test_triage_rows_most_urgent_then_oldest(session):
+    # Act
+    rows = triage_rows(session, "open", 10)
+    # Assert: closed requests are out, ties on request_date fall back to id
+    assert ids(rows) == [4, 2, 5, 3, 7, 1]
+
+
+def test_triage_rows_keyset_walk_crosses_priorities(session):
+    # Act: pages of two, resuming after the last row of the previous page
+    pages, after = [], None
+    while True:
+        rows = triage_rows(session, "open", 2, after)
+        if not rows:
+            break
+        pages.append(ids(rows))
+        last = rows[-1]
+        after = [last.priority, last.request_date, last.id]
+    # Assert
+    assert pages == [[4, 2], [5, 3], [7, 1]]
+
+
+def test_triage_rows_stops_querying_once_page_is_full(session):
+    # Arrange
+    session.execute = Mock(wraps=session.execute)
+    # Act
+    rows = triage_rows(session, "open", 2)
+    # Assert: both rows came from the emergency bucket, one query
+    assert ids(rows) == [4, 2]
+    assert session.execute.call_count == 1
+
+
+def test_parse_triage_cursor_rejects_unknown_priority():
+    # Arrange
+    good = encode_cursor(["high", START, 5])
+    bad = encode_cursor(["urgent", START, 5])
+    # Act / Assert
+    assert parse_triage_cursor(good) == ["high", START, 5]
+    assert parse_triage_cursor(None) is None
+    with pytest.raises(ValueError):
+        parse_triage_cursor(bad)
+
+
+def test_parse_new_request_tenant_files_against_own_room(session):
+    # Act
+    values = parse_new_request({"description": " leak "}, "tenant", "7", session)
+    # Assert
+    assert values == {
+        "tenant_id": 7,
+        "room_id": 12,
+        "description": "leak",
+        "priority": "medium",
+    }
+    with pytest.raises(ValueError):
+        parse_new_request({"description": "x", "room_id": 3}, "tenant", "7", session)
+    with pytest.raises(ValueError):
+        parse_new_request({"description": "x"}, "tenant", "8", session)
+    with pytest.raises(ValueError):
+        parse_new_request({"description": "x"}, "staff", "1", session)
+    with pytest.raises(ValueError):
+        parse_new_request(
+            {"description": "x", "priority": "asap"}, "tenant", "7", session
+        )
+
+
+def test_apply_update_escalation_and_resolution():
+    # Arrange
+    maintenance_request = MaintenanceRequest(priority="high", status="open")
+    now = datetime(2026, 6, 1)
+    # Act / Assert: escalating an open request pages staff
+    assert apply_update(maintenance_request, {"priority": "emergency"}) is True
+    assert apply_update(maintenance_request, {"priority": "emergency"}) is False
+    # closing stamps resolved_date, reopening clears it
+    apply_update(maintenance_request, {"status": "closed"}, now=now)
+    assert maintenance_request.resolved_date == now
+    apply_update(maintenance_request, {"status": "in progress"})
+    assert maintenance_request.resolved_date is None
+    with pytest.raises(ValueError):
+        apply_update(maintenance_request, {"status": "done"})
+    with pytest.raises(ValueError):
+        apply_update(maintenance_request, {})
+
+
+def test_event_bus_routes_by_topic_and_drops_oldest():
+    # Arrange
+    bus = EventBus()
+    emergencies, _ = bus.subscribe(["maintenance.emergency"], maxsize=2)
+    others, _ = bus.subscribe(["payment.recorded"])
+    # Act
+    for i in range(3):
+        bus.publish("maintenance.emergency", {"n": i})
+    # Assert: publish never blocks, the slow client keeps the newest events
+    assert emergencies.take_dropped() == 1
+    assert [emergencies.get(0).data["n"] for _ in range(2)] == [1, 2]
+    assert emergencies.get(0) is None
+    assert others.get(0) is None
+    bus.unsubscribe(others)
+    assert bus.subscriber_count() == 1
+
+
+def test_sse_stream_frames_and_unsubscribes_on_close():
+    # Arrange
+    bus = EventBus()
+    subscription, _ = bus.subscribe(["maintenance.emergency"])
+    stream = sse_stream(bus, subscription, heartbeat=0.01)
+    # Act
+    connected = next(stream)
+    keep_alive = next(stream)
+    event = bus.publish("maintenance.emergency", {"id": 3})
+    frame = next(stream)
+    stream.close()
+    # Assert
+    assert connected == ": connected\n\n"
+    assert keep_alive == ": keep-alive\n\n"
+    assert frame == sse_format(event)
+    assert frame.startswith(f"id: {event.id}\nevent: maintenance.emergency\n")
+    assert bus.subscriber_count() == 0
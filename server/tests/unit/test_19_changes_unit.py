@@ -0,0 +1,179 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from db.models import Base, Lease, MaintenanceRequest, Payment
+from resource.changes import CHANGE_TOPICS, parse_topics
+from resource.events import (
+    EventBus,
+    LocalBroker,
+    StreamSlots,
+    TooManyStreams,
+    TooManySubscribers,
+    event_bus,
+    sse_stream,
+)
+
+
+# === Mock Layer ===
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def feed():
+    subscription, _ = event_bus.subscribe(CHANGE_TOPICS)
+    yield subscription
+    event_bus.unsubscribe(subscription)
+
+
+def drain(subscription):
+    events = []
+    while (event := subscription.get(0)) is not None:
+        events.append(event)
+    return events
+
+
+def payment(**overrides):
+    values = {
+        "lease_id": 1,
+        "amount_due": Decimal("100.00"),
+        "due_date": datetime(2026, 5, 1),
+    }
+    return Payment(**(values | overrides))
+
+
+# === Test Layer ===
+def test_parse_topics_defaults_to_everything():
+    # Act / Assert
+    assert parse_topics({}) == list(CHANGE_TOPICS)
+    assert parse_topics({"topics": "lease.created"}) == ["lease.created"]
+    with pytest.raises(ValueError):
+        parse_topics({"topics": "lease.created,room.painted"})
+
+
+def test_broker_fans_out_across_replicas_once():
+    # Arrange: two replicas sharing one broker
+    broker = LocalBroker()
+    first, second = EventBus(broker=broker), EventBus(broker=broker)
+    on_first, _ = first.subscribe(["lease.created"])
+    on_second, _ = second.subscribe(["lease.created"])
+    # Act
+    event = first.publish("lease.created", {"id": 9})
+    # Assert: same id on both sides, no echo back to the publisher
+    assert [e.id for e in drain(on_first)] == [event.id]
+    assert [e.id for e in drain(on_second)] == [event.id]
+
+
+def test_resume_replays_missed_events_from_history():
+    # Arrange
+    bus = EventBus(history_size=3)
+    seen = bus.publish("lease.created", {"id": 1})
+    for i in range(2, 4):
+        bus.publish("lease.created", {"id": i})
+    # Act
+    resumed_sub, resumed = bus.subscribe(["lease.created"], last_event_id=seen.id)
+    stale_sub, stale = bus.subscribe(["lease.created"], last_event_id="gone-1")
+    # Assert
+    assert resumed is True
+    assert [e.data["id"] for e in drain(resumed_sub)] == [2, 3]
+    assert stale is False
+    stream = sse_stream(bus, stale_sub, heartbeat=0.01, resumed=stale)
+    next(stream)
+    assert next(stream).startswith("event: resync\n")
+    stream.close()
+
+
+def test_overflow_reports_resync_with_drop_count():
+    # Arrange
+    bus = EventBus()
+    subscription, _ = bus.subscribe(["payment.recorded"], maxsize=1)
+    stream = sse_stream(bus, subscription, heartbeat=0.01)
+    next(stream)
+    # Act
+    for i in range(3):
+        bus.publish("payment.recorded", {"id": i})
+    resync, frame = next(stream), next(stream)
+    stream.close()
+    # Assert: the client learns it lost two events, then gets the newest
+    assert resync == 'event: resync\ndata: {"reason": "overflow", "dropped": 2}\n\n'
+    assert '"id": 2' in frame
+
+
+def test_subscriber_cap_rejects_new_streams():
+    # Arrange
+    bus = EventBus(max_subscribers=1)
+    bus.subscribe(["lease.created"])
+    # Act / Assert
+    with pytest.raises(TooManySubscribers):
+        bus.subscribe(["lease.created"])
+
+
+def test_streams_and_exports_share_the_thread_budget():
+    # Arrange: two threads for long-lived responses, one taken by an export
+    slots = StreamSlots(size=2)
+    bus = EventBus(max_subscribers=10, slots=slots)
+    slots.acquire("exports")
+    subscription, _ = bus.subscribe(["lease.created"])
+    # Act / Assert: the third long-lived response is refused, whatever it is
+    with pytest.raises(TooManySubscribers, match="Too many open event streams"):
+        bus.subscribe(["lease.created"])
+    with pytest.raises(TooManyStreams, match="Too many open exports"):
+        slots.acquire("exports")
+    # closing a stream twice gives its slot back once
+    bus.unsubscribe(subscription)
+    bus.unsubscribe(subscription)
+    assert slots.in_use() == 1
+
+
+def test_orm_writes_publish_only_after_commit(session, feed):
+    # Arrange
+    session.add_all(
+        [
+            payment(),
+            Lease(
+                tenant_id=1,
+                room_id=2,
+                start_date=datetime(2026, 5, 1),
+                end_date=datetime(2027, 4, 30),
+                rent_amount=Decimal("900.00"),
+            ),
+            MaintenanceRequest(tenant_id=1, room_id=2, description="leak"),
+        ]
+    )
+    # Act
+    session.flush()
+    before = drain(feed)
+    session.commit()
+    after = drain(feed)
+    # Assert
+    assert before == []
+    assert sorted(e.topic for e in after) == sorted(CHANGE_TOPICS)
+
+
+def test_rolled_back_and_status_only_writes_are_not_published(session, feed):
+    # Arrange
+    row = payment()
+    session.add(row)
+    session.commit()
+    drain(feed)
+    # Act: a rolled-back insert, then the overdue job's status flip
+    session.add(payment(lease_id=2))
+    session.flush()
+    session.rollback()
+    row.status = "overdue"
+    session.commit()
+    silent = drain(feed)
+    row.amount_paid = Decimal("40.00")
+    session.commit()
+    paid = drain(feed)
+    # Assert
+    assert silent == []
+    assert [e.topic for e in paid] == ["payment.recorded"]
+    assert paid[0].data["amount_paid"] == Decimal("40.00")
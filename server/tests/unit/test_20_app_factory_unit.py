@@ -0,0 +1,106 @@
+import os
+import runpy
+import pytest
+from unittest.mock import Mock
+import main
+from main import create_app, start_services
+
+CONF_PATH = os.path.join(os.path.dirname(main.__file__), "gunicorn.conf.py")
+
+
+# === Mock Layer ===
+@pytest.fixture
+def services(monkeypatch):
+    calls = []
+    for name in ("role_registry", "token_denylist", "availability_index"):
+        monkeypatch.setattr(f"main.{name}.warm", lambda n=name: calls.append(n))
+    for name in (
+        "start_reaper",
+        "start_rollup_refresher",
+        "start_overdue_job",
+        "start_availability_poller",
+    ):
+        monkeypatch.setattr(f"main.{name}", lambda n=name: calls.append(n))
+    return calls
+
+
+# === Test Layer ===
+def test_create_app_builds_independent_apps_without_side_effects(services):
+    # Act
+    first, second = create_app(), create_app()
+    # Assert: every blueprint is mounted, nothing was warmed or started
+    assert first is not second
+    assert {"auth", "tenants", "maintenance", "changes", "health"} <= set(
+        first.blueprints
+    )
+    assert "/metrics/pool" in {rule.rule for rule in first.url_map.iter_rules()}
+    assert services == []
+
+
+def test_create_app_requires_env(monkeypatch):
+    # Arrange
+    monkeypatch.delenv("JWT_SECRET_KEY")
+    # Act / Assert
+    with pytest.raises(ValueError, match="JWT_SECRET_KEY"):
+        create_app()
+
+
+def test_start_services_warms_before_starting_jobs(services):
+    # Act
+    start_services()
+    # Assert
+    assert services == [
+        "role_registry",
+        "token_denylist",
+        "availability_index",
+        "start_reaper",
+        "start_rollup_refresher",
+        "start_overdue_job",
+        "start_availability_poller",
+    ]
+
+
+def test_gunicorn_conf_reads_env_and_preloads(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("GUNICORN_WORKERS", "3")
+    monkeypatch.setenv("GUNICORN_THREADS", "2")
+    monkeypatch.setenv("GUNICORN_BIND", "127.0.0.1:9000")
+    # Act
+    conf = runpy.run_path(CONF_PATH)
+    # Assert
+    assert (conf["workers"], conf["threads"], conf["bind"]) == (3, 2, "127.0.0.1:9000")
+    assert conf["preload_app"] is True
+    assert conf["worker_class"] == "gthread"
+
+
+def test_gunicorn_conf_splits_hashing_workers_between_workers(monkeypatch):
+    # Arrange: HASH_WORKERS left unset
+    monkeypatch.setenv("GUNICORN_WORKERS", "2")
+    monkeypatch.setenv("HASH_WORKERS", "")
+    monkeypatch.setattr("multiprocessing.cpu_count", lambda: 8)
+    # Act
+    runpy.run_path(CONF_PATH)
+    # Assert: 8 cores shared by 2 workers, not 8 bcrypt processes each
+    assert os.environ["HASH_WORKERS"] == "4"
+
+
+def test_gunicorn_conf_keeps_explicit_hashing_workers(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("HASH_WORKERS", "3")
+    # Act
+    runpy.run_path(CONF_PATH)
+    # Assert
+    assert os.environ["HASH_WORKERS"] == "3"
+
+
+def test_post_fork_drops_inherited_pool_and_starts_jobs(monkeypatch):
+    # Arrange
+    engine, start_jobs = Mock(), Mock()
+    monkeypatch.setattr("db.database.get_engine", lambda: engine)
+    monkeypatch.setattr("main.start_background_jobs", start_jobs)
+    conf = runpy.run_path(CONF_PATH)
+    # Act
+    conf["post_fork"](Mock(), Mock())
+    # Assert
+    engine.dispose.assert_called_once_with(close=False)
+    start_jobs.assert_called_once_with()
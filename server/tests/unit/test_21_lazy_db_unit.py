@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import pytest
+from sqlalchemy import create_engine, inspect, select
+import db.database as database
+from db.create_schema import create_schema, schema_sql
+from db.database import SessionLocal, database_url, get_engine
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+
+# === Mock Layer ===
+@pytest.fixture
+def sqlite_engine(monkeypatch):
+    engine = create_engine("sqlite://")
+    monkeypatch.setattr(database, "_engine", engine)
+    return engine
+
+
+def run_python(code, **env):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SERVER_DIR,
+        env=os.environ | env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+# === Test Layer ===
+def test_importing_models_needs_no_db_env():
+    # Arrange: no DB settings at all
+    code = (
+        "import db.models, db.database as d; "
+        "assert d._engine is None, 'engine built at import'"
+    )
+    # Act
+    result = run_python(code, DB_HOST="", DB_USER="", DB_NAME="")
+    # Assert
+    assert result.returncode == 0, result.stderr
+
+
+def test_importing_main_does_not_connect():
+    # Arrange: an address that never answers, any connect would time out
+    code = "import main; print('imported')"
+    # Act
+    result = run_python(code, DB_HOST="192.0.2.1")
+    # Assert
+    assert result.returncode == 0, result.stderr
+    assert "imported" in result.stdout
+
+
+def test_database_url_reports_missing_env(monkeypatch):
+    # Arrange
+    monkeypatch.delenv("DB_HOST", raising=False)
+    # Act / Assert
+    with pytest.raises(RuntimeError, match="DB_HOST"):
+        database_url()
+
+
+def test_get_engine_is_built_once(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setenv("DB_HOST", "db.example")
+    monkeypatch.setenv("DB_USER", "api")
+    monkeypatch.setenv("DB_NAME", "qualisync")
+    # Act
+    engine = get_engine()
+    # Assert: same engine every time, still no connection made
+    assert get_engine() is engine
+    assert engine.url.host == "db.example"
+    assert engine.pool.checkedout() == 0
+
+
+def test_sessions_bind_lazily_on_first_use(sqlite_engine):
+    # Arrange
+    session = SessionLocal()
+    # Act
+    value = session.execute(select(1)).scalar()
+    # Assert
+    assert value == 1
+    assert session.bind is sqlite_engine
+    session.close()
+
+
+def test_create_schema_is_opt_in_and_idempotent(sqlite_engine):
+    # Arrange
+    assert inspect(sqlite_engine).get_table_names() == []
+    # Act
+    created = create_schema()
+    again = create_schema()
+    # Assert
+    assert "maintenance_requests" in created
+    assert again == []
+    assert any("CREATE TABLE payments" in ddl for ddl in schema_sql())
@@ -0,0 +1,123 @@
+import pytest
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+import resource.instrumentation as instrumentation
+from resource.hashing import HashingPool, hashing_pool
+from resource.instrumentation import (
+    HISTOGRAMS,
+    Histogram,
+    instrumentation_blueprint,
+    server_timing,
+    RequestStats,
+)
+
+
+# === Mock Layer ===
+@pytest.fixture
+def engine():
+    return create_engine("sqlite://", poolclass=QueuePool)
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    monkeypatch.setattr(instrumentation, "get_engine", lambda: engine)
+    # hash inline on the request thread, no worker processes in unit tests
+    monkeypatch.setattr(hashing_pool, "workers", 0)
+    for histogram in HISTOGRAMS:
+        histogram.reset()
+    app = Flask(__name__)
+    app.register_blueprint(instrumentation_blueprint)
+
+    @app.route("/items/<int:item_id>")
+    def item(item_id):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        hashing_pool.run(lambda: None)
+        return jsonify({"id": item_id})
+
+    with app.test_client() as client:
+        yield client
+
+
+# === Test Layer ===
+def test_histogram_renders_cumulative_buckets():
+    # Arrange
+    histogram = Histogram("latency_seconds", "Latency.", (0.1, 1.0), ("route",))
+    # Act
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, '/a"b')
+    lines = histogram.render()
+    # Assert: le is inclusive, +Inf counts everything, quotes are escaped
+    assert 'latency_seconds_bucket{route="/a\\"b",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a\\"b",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a\\"b"} 4' in lines
+    assert 'latency_seconds_sum{route="/a\\"b"} 3.650000' in lines
+
+
+def test_server_timing_lists_db_and_hash():
+    # Arrange
+    stats = RequestStats()
+    stats.db_seconds, stats.queries = 0.004, 3
+    # Act / Assert: hash only shows up when the request hashed something
+    assert server_timing(stats, 0.0125) == 'app;dur=12.5, db;dur=4.0;desc="3 queries"'
+    stats.hash_seconds = 0.2
+    assert server_timing(stats, 0.0125).endswith(", hash;dur=200.0")
+
+
+def test_hashing_pool_notifies_listeners():
+    # Arrange
+    pool, seen = HashingPool(workers=0), []
+    pool.add_listener(seen.append)
+    # Act
+    pool.run(lambda: None)
+    # Assert
+    assert len(seen) == 1 and seen[0] >= 0
+
+
+def test_request_gets_server_timing_and_metrics(client, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(instrumentation, "METRICS_TOKEN", "scrape-me")
+    # Act
+    response = client.get("/items/7")
+    metrics = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    body = metrics.get_data(as_text=True)
+    # Assert
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("app;dur=")
+    assert 'desc="2 queries"' in timing
+    assert "hash;dur=" in timing
+    assert metrics.status_code == 200
+    assert metrics.mimetype == "text/plain"
+    # one series per rule, not per path
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/items/<int:item_id>",status="200"} 1'
+    ) in body
+    assert 'http_request_queries_bucket{route="/items/<int:item_id>",le="2"} 1' in body
+    assert "password_hash_seconds_count 1" in body
+    assert "db_pool_checkouts" in body
+
+
+def test_metrics_token_required_when_configured(client, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(instrumentation, "METRICS_TOKEN", "scrape-me")
+    # Act
+    denied = client.get("/metrics")
+    allowed = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    # Assert
+    assert denied.status_code == 401
+    assert allowed.status_code == 200
+
+
+def test_metrics_are_off_without_a_token(client, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(instrumentation, "METRICS_TOKEN", "")
+    # Act
+    responses = [client.get("/metrics"), client.get("/metrics/slow-queries")]
+    # Assert: nothing about statements or plans leaks by default
+    assert [response.status_code for response in responses] == [404, 404]
+    assert "METRICS_TOKEN" in responses[0].get_json()["error"]
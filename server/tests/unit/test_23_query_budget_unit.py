@@ -0,0 +1,192 @@
+import pytest
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+import resource.instrumentation as instrumentation
+from resource.instrumentation import (
+    BUDGET_EXCEEDED,
+    QueryBudgetExceeded,
+    RequestStats,
+    SlowQueryLog,
+    instrumentation_blueprint,
+    off_budget,
+    query_budget,
+    query_problems,
+)
+
+
+# === Mock Layer ===
+@pytest.fixture
+def engine():
+    return create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+
+
+@pytest.fixture
+def app(engine, monkeypatch):
+    monkeypatch.setattr(instrumentation, "get_engine", lambda: engine)
+    monkeypatch.setattr(instrumentation, "N_PLUS_ONE_THRESHOLD", 5)
+    BUDGET_EXCEEDED.reset()
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+    app.register_blueprint(instrumentation_blueprint)
+
+    @app.route("/one")
+    @query_budget(1)
+    def one():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return jsonify({"ok": True})
+
+    @app.route("/two")
+    @query_budget(1)
+    def two():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return jsonify({"ok": True})
+
+    @app.route("/refresh")
+    @query_budget(1)
+    def refresh():
+        with engine.connect() as conn:
+            with off_budget():
+                conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return jsonify({"ok": True})
+
+    @app.route("/loop")
+    def loop():
+        with engine.connect() as conn:
+            for i in range(5):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return jsonify({"ok": True})
+
+    return app
+
+
+# === Test Layer ===
+def test_query_problems_reports_budget_and_repeats():
+    # Arrange
+    stats = RequestStats()
+    stats.queries = 4
+    stats.statements = {"SELECT * FROM leases WHERE id = ?": 3, "SELECT 1": 1}
+    # Act
+    problems = query_problems(stats, budget=2, threshold=3)
+    # Assert
+    assert problems[0] == "ran 4 queries, budget is 2"
+    assert problems[1] == "ran 3x (N+1?): SELECT * FROM leases WHERE id = ?"
+    assert query_problems(stats, budget=None, threshold=0) == []
+
+
+def test_route_within_budget_passes(app, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(instrumentation, "QUERY_BUDGET_MODE", "raise")
+    # Act
+    response = app.test_client().get("/one")
+    # Assert
+    assert response.status_code == 200
+
+
+def test_route_over_budget_raises_in_raise_mode(app, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(instrumentation, "QUERY_BUDGET_MODE", "raise")
+    # Act / Assert
+    with pytest.raises(QueryBudgetExceeded, match="GET /two ran 2 queries"):
+        app.test_client().get("/two")
+
+
+def test_route_over_budget_only_logs_in_log_mode(app, monkeypatch, capsys):
+    # Arrange
+    monkeypatch.setattr(instrumentation, "QUERY_BUDGET_MODE", "log")
+    # Act
+    response = app.test_client().get("/two")
+    # Assert
+    assert response.status_code == 200
+    assert "GET /two ran 2 queries, budget is 1" in capsys.readouterr().out
+    assert 'budget_exceeded_total{route="/two"} 1' in "\n".join(
+        BUDGET_EXCEEDED.render()
+    )
+
+
+def test_off_budget_statements_are_not_counted(app, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(instrumentation, "QUERY_BUDGET_MODE", "raise")
+    # Act: two statements on a budget of one, the first is a cache refresh
+    response = app.test_client().get("/refresh")
+    # Assert
+    assert response.status_code == 200
+    assert 'desc="1 queries"' in response.headers["Server-Timing"]
+
+
+def test_repeated_statement_is_flagged_as_n_plus_one(app, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(instrumentation, "QUERY_BUDGET_MODE", "raise")
+    # Act / Assert: no budget declared, the repeats alone trip it
+    with pytest.raises(QueryBudgetExceeded, match=r"ran 5x \(N\+1\?\): SELECT \?"):
+        app.test_client().get("/loop")
+
+
+def test_slow_query_is_logged_with_its_plan(app, engine, monkeypatch):
+    # Arrange
+    log = SlowQueryLog(size=5)
+    with engine.begin() as conn:
+        conn.execute(
+            text("CREATE TABLE leases (id INTEGER PRIMARY KEY, tenant_id INT)")
+        )
+    # Act
+    future = log.record(
+        engine, "SELECT * FROM leases WHERE tenant_id = ?", (1,), 0.5, "/x"
+    )
+    plan = future.result(timeout=5)
+    again = log.record(
+        engine, "SELECT * FROM leases WHERE tenant_id = ?", (2,), 0.6, "/x"
+    )
+    # Assert: explained once, later entries reuse the plan
+    assert "SCAN leases" in str(plan)
+    assert again is None
+    first, second = log.entries()
+    assert first["ms"] == 500.0 and first["route"] == "/x"
+    assert first["plan"] == plan and second["plan"] == plan
+
+
+def test_slow_query_plans_keep_only_the_most_recent_statements(engine):
+    # Arrange
+    log = SlowQueryLog(size=10, plans=2)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE leases (id INTEGER PRIMARY KEY)"))
+    statements = [
+        "SELECT * FROM leases WHERE id IN (" + ", ".join("?" * n) + ")"
+        for n in (1, 2, 3)
+    ]
+    # Act: the first is seen again before the third pushes one out
+    log.record(engine, statements[0], (1,), 0.5, "/x").result(timeout=5)
+    log.record(engine, statements[1], (1, 2), 0.5, "/x").result(timeout=5)
+    log.record(engine, statements[0], (1,), 0.5, "/x")
+    log.record(engine, statements[2], (1, 2, 3), 0.5, "/x").result(timeout=5)
+    # Assert: capped, and the least recently seen one is explained again
+    assert list(log._plans) == [statements[0], statements[2]]
+    assert log.record(engine, statements[0], (1,), 0.5, "/x") is None
+    assert log.record(engine, statements[1], (1, 2), 0.5, "/x") is not None
+
+
+def test_slow_queries_endpoint_lists_captures(app, monkeypatch):
+    # Arrange: every statement counts as slow
+    log = SlowQueryLog(size=5)
+    monkeypatch.setattr(instrumentation, "slow_query_log", log)
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 1e-9)
+    monkeypatch.setattr(instrumentation, "METRICS_TOKEN", "scrape-me")
+    client = app.test_client()
+    # Act
+    client.get("/one")
+    response = client.get(
+        "/metrics/slow-queries", headers={"Authorization": "Bearer scrape-me"}
+    )
+    # Assert
+    assert response.status_code == 200
+    queries = response.get_json()["queries"]
+    assert queries[0]["statement"] == "SELECT 1"
+    assert queries[0]["route"] == "/one"
@@ -0,0 +1,148 @@
+import threading
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+import resource.health as health
+from resource.hashing import HashingPool
+from resource.health import DbProbe, health_blueprint
+
+
+# === Mock Layer ===
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class PeekingProbe(DbProbe):
+    """Runs a probe on another thread every time a field is stored, mid-update."""
+
+    def __init__(self, **kwargs):
+        self.seen = None
+        super().__init__(**kwargs)
+        self.seen = []
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if self.seen is not None and name != "seen":
+            reader = threading.Thread(target=self.peek)
+            reader.start()
+            reader.join()
+
+    def peek(self):
+        try:
+            self.seen.append(self.check())
+        except Exception as e:
+            self.seen.append(e)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2)
+    monkeypatch.setattr(health, "get_engine", lambda: engine)
+    monkeypatch.setattr(health, "DB_MAX_OVERFLOW", 0)
+    return engine
+
+
+@pytest.fixture
+def pings(engine):
+    seen = []
+    event.listen(engine, "before_cursor_execute", lambda *args: seen.append(args[2]))
+    return seen
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(health, "db_probe", DbProbe(ttl=5, clock=clock))
+    return clock
+
+
+@pytest.fixture
+def client(engine, clock):
+    app = Flask(__name__)
+    app.register_blueprint(health_blueprint)
+    with app.test_client() as client:
+        yield client
+
+
+# === Test Layer ===
+def test_healthz_does_no_io(client, pings):
+    # Act
+    response = client.get("/healthz")
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ok"}
+    assert pings == []
+
+
+def test_readyz_caches_the_db_ping(client, pings, clock):
+    # Act
+    first = client.get("/readyz")
+    clock.now += 1
+    second = client.get("/readyz")
+    clock.now += 5
+    client.get("/readyz")
+    # Assert: three probes, two pings (the TTL ran out once)
+    assert first.status_code == 200
+    assert first.get_json()["status"] == "ready"
+    assert second.get_json()["checks"]["db"]["age"] == 1.0
+    assert pings == ["SELECT 1", "SELECT 1"]
+
+
+def test_readyz_503s_when_the_pool_is_saturated(client, engine, pings):
+    # Arrange: both connections of a size-2 pool are taken
+    held = [engine.connect(), engine.connect()]
+    # Act
+    response = client.get("/readyz")
+    # Assert: shed traffic, and don't queue a ping behind the busy pool
+    body = response.get_json()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert body["checks"]["pool"]["saturation"] == 1.0
+    assert "db" not in body["checks"]
+    assert pings == []
+    for conn in held:
+        conn.close()
+
+
+def test_readyz_503s_when_hashing_is_backed_up(client, monkeypatch):
+    # Arrange: every admission slot of the hashing pool is in use
+    pool = HashingPool(workers=1, queue_depth=1)
+    monkeypatch.setattr(health, "hashing_pool", pool)
+    monkeypatch.setattr(pool, "depth", lambda: 2)
+    # Act
+    response = client.get("/readyz")
+    # Assert
+    assert response.status_code == 503
+    assert response.get_json()["checks"]["hashing"] == {
+        "ok": False,
+        "in_flight": 2,
+        "capacity": 2,
+        "saturation": 1.0,
+    }
+
+
+def test_db_probe_reports_failures(monkeypatch, clock):
+    # Arrange
+    def unreachable():
+        raise RuntimeError("Missing DB_HOST")
+
+    monkeypatch.setattr(health, "get_engine", unreachable)
+    # Act
+    result = health.db_probe.check()
+    # Assert
+    assert result == {"ok": False, "error": "Missing DB_HOST", "age": 0.0}
+
+
+def test_db_probe_readers_never_see_half_a_result(engine, clock):
+    # Arrange
+    probe = PeekingProbe(ttl=5, clock=clock)
+    # Act: the first ping stores its result while other threads are probing
+    result = probe.check()
+    # Assert: they got the fresh result, never a torn one
+    assert result["ok"] is True
+    assert probe.seen == [dict(result, age=0.0)]
@@ -0,0 +1,78 @@
+import pytest
+from benchmarks.bench_auth import compare, percentile, summarize
+from db.database import database_url
+
+
+# === Mock Layer ===
+@pytest.fixture
+def baseline():
+    return {
+        "load_me": {"n": 100, "p50_ms": 10.0, "p95_ms": 20.0, "ops_per_sec": 100.0},
+        "load_login": {"n": 20, "p50_ms": 300.0, "p95_ms": 400.0, "ops_per_sec": 5.0},
+    }
+
+
+def stats(n, p50, p95, ops, errors=0):
+    return {
+        "n": n,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "ops_per_sec": ops,
+        "errors": errors,
+    }
+
+
+# === Test Layer ===
+def test_percentiles_use_nearest_rank():
+    # Arrange
+    samples = [i / 1000 for i in range(1, 101)]
+    # Act
+    result = summarize(samples, wall_seconds=2.0)
+    # Assert
+    assert percentile([1, 2, 3], 50) == 2
+    assert (result["p50_ms"], result["p95_ms"], result["p99_ms"]) == (50, 95, 99)
+    assert result["ops_per_sec"] == 50.0
+
+
+def test_compare_passes_within_tolerance_and_noise(baseline):
+    # Arrange: +25% on p50, and a p95 jump on too few samples to judge
+    results = {
+        "load_me": stats(100, 12.5, 24.0, 90.0),
+        "load_login": stats(20, 310.0, 900.0, 5.0),
+    }
+    # Act / Assert
+    assert compare(results, baseline, tolerance=0.3) == []
+
+
+def test_compare_flags_slower_latency_and_lower_throughput(baseline):
+    # Arrange
+    results = {
+        "load_me": stats(100, 10.0, 40.0, 60.0),
+        "load_login": stats(20, 450.0, 400.0, 5.0, errors=2),
+    }
+    # Act
+    regressions = compare(results, baseline, tolerance=0.3)
+    # Assert
+    assert regressions == [
+        "load_me: p95_ms 40.0 vs baseline 20.0",
+        "load_me: 60.0/s vs baseline 100.0/s",
+        "load_login: p50_ms 450.0 vs baseline 300.0",
+        "load_login: 2 failed requests",
+    ]
+
+
+def test_compare_ignores_differences_below_the_noise_floor():
+    # Arrange: 3x slower, but only by 2 ms
+    baseline = {"json": {"n": 2000, "p50_ms": 1.0, "p95_ms": 1.0, "ops_per_sec": 1.0}}
+    results = {"json": stats(2000, 3.0, 3.0, 1.0)}
+    # Act / Assert
+    assert compare(results, baseline, tolerance=0.3, noise_ms=5.0) == []
+    assert compare(results, baseline, tolerance=0.3, noise_ms=0.0) != []
+
+
+def test_database_url_override_wins(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///bench.db")
+    monkeypatch.delenv("DB_HOST", raising=False)
+    # Act / Assert
+    assert database_url() == "sqlite:///bench.db"
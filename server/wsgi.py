@@ -0,0 +1,15 @@
+"""WSGI entry point for production serving.
+
+Usage: gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py preloads this module in the master, so the imports (bcrypt,
+SQLAlchemy, every blueprint) and the cache warm-up happen once and the workers
+share those pages copy-on-write instead of each repeating them.
+"""
+
+from db.database import get_engine
+from main import app, warm_caches  # noqa: F401 (gunicorn loads wsgi:app)
+
+warm_caches()
+# the warm-up's pooled connections must not be shared by the forked workers
+get_engine().dispose()